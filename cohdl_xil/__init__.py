@@ -1 +1 @@
-from ._common import ip_block
+from ._common import ip_block, xpm_block
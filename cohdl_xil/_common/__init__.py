@@ -8,3 +8,4 @@ from .fpga import (
 )
 
 from .ip_block import ip_block, IpBase
+from .xpm_block import xpm_block
@@ -30,6 +30,8 @@ def ip_block(
 
         module_name = f"{module_name}_{cnt}"
 
+    _used_module_names.append(module_name)
+
     for port_name, value in ports.items():
         if value.name() is None:
             value._name = port_name
@@ -1,6 +1,7 @@
 from .tcl_writer import TclWriter
 from cohdl.utility import MakeTarget
 
+import json
 import os
 from pathlib import Path
 import shutil
@@ -36,6 +37,9 @@ class VivadoProject:
     def read_xdc(self, path: str):
         self.tcl.write_cmd("read_xdc", path)
 
+    def auto_detect_xpm(self):
+        self.tcl.write_cmd("auto_detect_xpm")
+
     def synth_design(self, top_entity: str):
         self.tcl.write_cmd("synth_design", "-top", top_entity)
 
@@ -138,6 +142,9 @@ class Project:
             self.project_tcl = f"{build_dir}/generated/project.tcl"
             self.project_constraints = f"{build_dir}/generated/constraints/project.xdc"
             self.program_tcl = f"{build_dir}/generated/program.tcl"
+            self.ila_probes = f"{build_dir}/generated/ila_probes.json"
+            self.capture_tcl = f"{build_dir}/generated/capture_ila.tcl"
+            self.dir_output_ila = f"{build_dir}/output/ila"
             self.vivado_log = f"{build_dir}/output/build_log/vivado.log"
             self.vivado_journal = f"{build_dir}/output/build_log/vivado.jou"
             self.vivado_programmer_log = (
@@ -146,6 +153,10 @@ class Project:
             self.vivado_programmer_journal = (
                 f"{build_dir}/output/build_log/vivado_programmer.jou"
             )
+            self.vivado_capture_log = f"{build_dir}/output/build_log/vivado_capture.log"
+            self.vivado_capture_journal = (
+                f"{build_dir}/output/build_log/vivado_capture.jou"
+            )
 
         def create_dirs(self):
             for path in [
@@ -207,6 +218,8 @@ class Project:
         self._dep_files = []
 
         self._write_debug_probes = False
+        self._ila_cores: list[dict] = []
+        self._use_xpm = False
 
         proj_tcl = self.paths.relative_to_build(self.paths.project_tcl)
         paths = self.paths
@@ -260,6 +273,22 @@ class Project:
     def write_debug_probes(self):
         self._write_debug_probes = True
 
+    def add_ila(self, layout: dict) -> int:
+        """
+        Records the probe layout of an ila core. All layouts are written
+        to `generated/ila_probes.json` (in the order of this call)
+        so captures can be decoded on the host.
+
+        Returns the index of the core in the layout file.
+        """
+
+        self.write_debug_probes()
+        self._ila_cores.append(layout)
+        return len(self._ila_cores) - 1
+
+    def use_xpm(self):
+        self._use_xpm = True
+
     def write(self):
         paths = self.paths
 
@@ -277,10 +306,31 @@ class Project:
             phony=True,
         )
 
+        extra_targets = []
+
+        if self._ila_cores:
+            # additional arguments are passed using
+            # make capture CAPTURE_ARGS="..." (see capture_ila.tcl)
+            capture_tcl = self.paths.relative_to_build(self.paths.capture_tcl)
+            extra_targets.append(
+                MakeTarget(
+                    "capture",
+                    [
+                        f"vivado -mode batch -source {capture_tcl} -journal {paths.relative('vivado_capture_journal')} -log {paths.relative('vivado_capture_log')} -tclargs $(CAPTURE_ARGS)"
+                    ],
+                    phony=True,
+                )
+            )
+
         self.root_target.generate_makefile(
-            program_target, bitstream_target, path=paths.makefile
+            program_target, bitstream_target, *extra_targets, path=paths.makefile
         )
 
+        if self._ila_cores:
+            write_file_if_changed(
+                paths.ila_probes, json.dumps({"ila": self._ila_cores}, indent=2)
+            )
+
         util_file = f"{os.path.dirname(__file__)}/cohdl_make_util.py"
         shutil.copy(util_file, f"{paths.dir_build}/cohdl_make_util.py")
 
@@ -310,6 +360,9 @@ class Project:
         for ip_path in self._ip_files:
             vivado.read_ip(paths.relative_to_build(ip_path))
 
+        if self._use_xpm:
+            vivado.auto_detect_xpm()
+
         vivado.write_line()
         vivado.write_comment("synthesize design")
 
@@ -403,6 +456,115 @@ class Project:
         with open(paths.program_tcl, "w") as file:
             programmer.write_tcl(file)
 
+        if self._ila_cores:
+            with open(paths.capture_tcl, "w") as file:
+                self._capture_script().write_tcl(file)
+
+    def _capture_script(self) -> VivadoProject:
+        # hardware manager script that arms an ila core and writes
+        # the captured samples to csv files (used by cohdl_xil.host.ila)
+        paths = self.paths
+        probes_path = paths.relative_to_build(
+            f"{paths.dir_output_impl}/{self._proj_name}.ltx"
+        )
+        first_nets = " ".join(core["ports"][0]["net"] for core in self._ila_cores)
+
+        capture = VivadoProject()
+
+        capture.write_comment(
+            [
+                "auto generated file",
+                "do not edit manually",
+                "",
+                "arms an ila core, waits for the trigger and writes the captured",
+                "samples to csv files, all arguments are optional:",
+                "",
+                "  -tclargs <ila> <out_dir> <captures> <trigger_position> <timeout> [<port> <compare>]...",
+                "",
+                "  ila               index of the core in generated/ila_probes.json (default 0)",
+                f"  out_dir           output directory (default {paths.relative('dir_output_ila')})",
+                "  captures          number of captures (default 1)",
+                "  trigger_position  sample index of the trigger (default 0)",
+                "  timeout           minutes to wait for each trigger (default 1)",
+                "  port, compare     probe port number and trigger compare value",
+                "                    (for example 0 eq16'h00FF), unset ports are don't care",
+            ]
+        )
+
+        capture.write_line()
+        capture.write_line("proc arg {nr default} {")
+        capture.write_line("    global argv")
+        capture.write_line(
+            "    if {[llength $argv] > $nr} { return [lindex $argv $nr] }"
+        )
+        capture.write_line("    return $default")
+        capture.write_line("}")
+
+        capture.write_line()
+        capture.write_line("set ila_index [arg 0 0]")
+        capture.write_line(f"set out_dir [arg 1 {paths.relative('dir_output_ila')}]")
+        capture.write_line("set captures [arg 2 1]")
+        capture.write_line("set trigger_position [arg 3 0]")
+        capture.write_line("set timeout [arg 4 1]")
+
+        capture.write_line()
+        capture.write_comment("nets connected to the first probe port of each ila core")
+        capture.write_line(f"set ila_nets {{{first_nets}}}")
+
+        capture.write_line()
+        capture.open_hw_manager()
+        capture.connect_hw_server(allow_non_jtag=True)
+        capture.open_hw_target()
+        capture.current_hw_device("[lindex [get_hw_devices] 0]")
+        capture.set_property("PROBES.FILE", probes_path, "[current_hw_device]")
+        capture.set_property("FULL_PROBES.FILE", probes_path, "[current_hw_device]")
+        capture.refresh_hw_device("[current_hw_device]")
+
+        capture.write_line()
+        capture.write_comment("locate the core by the name of its first probe,")
+        capture.write_comment("fall back to the instantiation order")
+        capture.write_line(
+            "set ila [lindex [get_hw_ilas -of_objects [current_hw_device]] $ila_index]"
+        )
+        capture.write_line("set net [lindex $ila_nets $ila_index]")
+        capture.write_line(
+            "foreach candidate [get_hw_ilas -of_objects [current_hw_device]] {"
+        )
+        capture.write_line("    foreach probe [get_hw_probes -of_objects $candidate] {")
+        capture.write_line(
+            '        if {[regexp "(^|/)${net}(\\\\\\[|$)" [get_property NAME $probe]]} { set ila $candidate }'
+        )
+        capture.write_line("    }")
+        capture.write_line("}")
+
+        capture.write_line()
+        capture.write_comment("setup trigger")
+        capture.write_line("foreach probe [get_hw_probes -of_objects $ila] {")
+        capture.write_line("    set width [get_property WIDTH $probe]")
+        capture.write_line(
+            '    set_property TRIGGER_COMPARE_VALUE "eq${width}\'b[string repeat X $width]" $probe'
+        )
+        capture.write_line("}")
+        capture.write_line("foreach {port compare} [lrange $argv 5 end] {")
+        capture.write_line(
+            '    set_property TRIGGER_COMPARE_VALUE $compare [get_hw_probes -of_objects $ila -filter "PROBE_PORT == $port"]'
+        )
+        capture.write_line("}")
+        capture.set_property("CONTROL.TRIGGER_POSITION", "$trigger_position", "$ila")
+
+        capture.write_line()
+        capture.write_comment("capture")
+        capture.write_line("file mkdir $out_dir")
+        capture.write_line("for {set nr 0} {$nr < $captures} {incr nr} {")
+        capture.write_line("    run_hw_ila $ila")
+        capture.write_line("    wait_on_hw_ila -timeout $timeout $ila")
+        capture.write_line(
+            '    write_hw_ila_data -force -csv_file [format "%s/capture_%05d.csv" $out_dir $nr] [upload_hw_ila_data $ila]'
+        )
+        capture.write_line("}")
+
+        return capture
+
 
 _active_project: None | Project = None
 
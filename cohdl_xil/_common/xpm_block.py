@@ -0,0 +1,119 @@
+import cohdl
+
+from cohdl_xil._common.vivado_project import get_active_project, write_file_if_changed
+
+_used_module_names = []
+
+
+def _vhdl_type(port: cohdl.Port):
+    if issubclass(port.type, cohdl.Bit):
+        return "std_logic"
+
+    return f"std_logic_vector({port.width - 1} downto 0)"
+
+
+def _vhdl_generic(value):
+    if isinstance(value, bool):
+        return "true" if value else "false"
+    if isinstance(value, int):
+        return str(value)
+    return f'"{value}"'
+
+
+def xpm_block(
+    macro,
+    module_name,
+    generics: dict[str, str | int],
+    ports: dict[str, cohdl.Port],
+    fixed_inputs: dict[str, str] | None = None,
+) -> type[cohdl.Entity]:
+    """
+    Creates a VHDL wrapper around the Xilinx parameterized macro `macro`
+    (for example `xpm_fifo_sync`) and returns it as an extern entity.
+
+    CoHDL cannot instantiate entities with generics so the wrapper
+    forwards `ports` to the macro ports of the same name and sets
+    the macro generics to the values given in `generics`.
+    Macro inputs, that should be tied to a constant value, are listed in
+    `fixed_inputs` (mapping the port name to a VHDL literal).
+    Unused macro outputs are left open.
+
+    In contrast to `ip_block` no IP generation is required,
+    the macro is synthesized together with the design.
+    """
+
+    if fixed_inputs is None:
+        fixed_inputs = {}
+
+    if module_name in _used_module_names:
+        cnt = 1
+        while f"{module_name}_{cnt}" in _used_module_names:
+            cnt += 1
+
+        module_name = f"{module_name}_{cnt}"
+
+    _used_module_names.append(module_name)
+
+    for port_name, value in ports.items():
+        if value.name() is None:
+            value._name = port_name
+
+    port_decl = ";\n".join(
+        f"    {name} : {'in' if port.is_input() else 'out'} {_vhdl_type(port)}"
+        for name, port in ports.items()
+    )
+
+    generic_map = ",\n".join(
+        f"      {name} => {_vhdl_generic(value)}" for name, value in generics.items()
+    )
+
+    port_map = ",\n".join(
+        [f"      {name} => {name}" for name in ports]
+        + [f"      {name} => {value}" for name, value in fixed_inputs.items()]
+    )
+
+    vhdl = f"""-- auto generated file
+-- do not edit manually
+
+library ieee;
+use ieee.std_logic_1164.all;
+
+library xpm;
+use xpm.vcomponents.all;
+
+entity {module_name} is
+  port (
+{port_decl}
+  );
+end entity;
+
+architecture arch of {module_name} is
+begin
+
+  inst : {macro}
+    generic map (
+{generic_map}
+    )
+    port map (
+{port_map}
+    );
+
+end architecture;
+"""
+
+    active_project = get_active_project()
+    paths = active_project.paths
+
+    vhdl_path = f"{paths.dir_generated_dep}/{module_name}.vhd"
+    write_file_if_changed(vhdl_path, vhdl)
+
+    active_project.add_vhdl(vhdl_path)
+    active_project.use_xpm()
+
+    return type(
+        module_name,
+        (cohdl.Entity,),
+        ports,
+        extern=True,
+        attributes={"vhdl_library": "work"},
+    )
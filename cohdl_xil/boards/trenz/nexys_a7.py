@@ -4,9 +4,17 @@ from dataclasses import dataclass
 from typing import Any
 
 import cohdl
-from cohdl import Signal, Bit, BitVector, Port, Null
+from cohdl import Signal, Bit, BitVector, Unsigned, Port, Null
 from cohdl_xil.fpgas.artix.artix_7 import Artix7
 from cohdl_xil._common.fpga import Direction, IoStandard, PortConfiguration
+from cohdl_xil.ip.mig import MigProject, MigAxiParameters, PhyRatio
+from cohdl_xil.ip.fifo import (
+    CommonClkFifo,
+    IndependentClkFifo,
+    Backend,
+    Implementation,
+)
+from cohdl_xil.ip.axi_stream import AxiStream, fifo_input_stream, fifo_output_stream
 
 from cohdl import std
 
@@ -168,6 +176,374 @@ class DDR2_UserInterface:
         signals.app_en <<= False
 
 
+class Ddr2AxiMemory:
+    """
+    DDR2 memory accessed through the AXI4 slave port of the MIG.
+    `axi` is clocked by `ui_ctx`, `init_calib_complete` is set
+    once the memory is ready.
+
+    `read_data` and `write_data` access single lines with the same
+    arguments as `DDR2_UserInterface`. `request_stream`, `read_stream`
+    and `write_response_stream` map the channels of `axi` to streams
+    that transfer one request or response per clock cycle.
+    The streams and the coroutines (or other users of `axi`)
+    must not be combined.
+    """
+
+    def __init__(self, axi, ui_ctx: std.SequentialContext, init_calib_complete):
+        self.axi = axi
+        self.ui_ctx = ui_ctx
+        self.init_calib_complete = init_calib_complete
+
+        self._streams = None
+
+    @staticmethod
+    def _line_addr(addr):
+        return addr.msb(rest=4) @ std.zeros(4)
+
+    async def read_data(self, addr) -> BitVector[128]:
+        data, _ = await self.axi.read_word(self._line_addr(addr))
+        return data
+
+    async def write_data(self, addr, data: BitVector[128], mask=Null):
+        """
+        Writes `data` to the line containing `addr` and waits for the
+        write response. Bytes with a set `mask` bit are not written.
+        """
+
+        assert data.width == 128
+        strb = std.ones(16) if mask is Null else ~mask
+        await self.axi.write_word(self._line_addr(addr), data, strb)
+
+    def _init_streams(self):
+        axi = self.axi
+        clk = self.ui_ctx.clk()
+        reset = self.ui_ctx.reset()
+        addr_width = axi.addr_width()
+
+        def stream(data_width, prefix):
+            return AxiStream.signal(
+                clk,
+                reset,
+                data_width,
+                has_last=False,
+                has_keep=False,
+                prefix=prefix,
+            )
+
+        with std.prefix("ddr2axi"):
+            n = std.name
+
+            # [is_write][addr][mask][data]
+            requests = stream(1 + addr_width + 16 + 128, n("req_"))
+            reads = stream(128, n("rd_"))
+            write_responses = stream(2, n("wr_resp_"))
+
+            # set when the address/data of the current write request was
+            # accepted while the other channel of the write was not ready
+            aw_done = Signal[Bit](False, name=n("aw_done"))
+            w_done = Signal[Bit](False, name=n("w_done"))
+            aw_ok = Signal[Bit](name=n("aw_ok"))
+            w_ok = Signal[Bit](name=n("w_ok"))
+
+        req_is_write = requests.data.msb()
+        req_addr = requests.data.lsb(rest=1).msb(addr_width)
+        req_mask = requests.data.lsb(16 + 128).msb(16)
+        req_data = requests.data.lsb(128)
+
+        @std.concurrent
+        def proc_requests():
+            write_valid = requests.valid & req_is_write
+
+            axi.set_addr_fields(axi.rdaddr, self._line_addr(req_addr).unsigned, 1)
+            axi.set_addr_fields(axi.wraddr, self._line_addr(req_addr).unsigned, 1)
+
+            axi.rdaddr.valid <<= requests.valid & ~req_is_write
+            axi.wraddr.valid <<= write_valid & ~aw_done
+            axi.wrdata.valid <<= write_valid & ~w_done
+            axi.wrdata.wdata <<= req_data
+            axi.wrdata.wstrb <<= ~req_mask
+            axi.wrdata.wlast <<= True
+
+            aw_ok.next = aw_done | axi.wraddr.ready
+            w_ok.next = w_done | axi.wrdata.ready
+
+            requests.ready <<= (aw_ok & w_ok) if req_is_write else axi.rdaddr.ready
+
+        @self.ui_ctx
+        def proc_write_fork():
+            # both channels of a write must be accepted before the
+            # next request, the accepted one waits for the other
+            if requests.valid and req_is_write and not (aw_ok and w_ok):
+                aw_done.next = aw_ok
+                w_done.next = w_ok
+            else:
+                aw_done.next = False
+                w_done.next = False
+
+        @std.concurrent
+        def proc_responses():
+            reads.valid <<= axi.rddata.valid
+            reads.data <<= axi.rddata.rdata
+            axi.rddata.ready <<= reads.ready
+
+            write_responses.valid <<= axi.wrresp.valid
+            write_responses.data <<= axi.wrresp.bresp
+            axi.wrresp.ready <<= write_responses.ready
+
+        self._streams = (requests, reads, write_responses)
+
+    def request_stream(self):
+        """
+        Stream of line requests, each transfer contains
+        `[is_write][addr][mask][data]` (mask and data are ignored for reads).
+        Requests are accepted once their AXI channels are ready.
+        """
+
+        if self._streams is None:
+            self._init_streams()
+        return self._streams[0]
+
+    def read_stream(self):
+        """
+        Read data of the requests (128 bit) in request order.
+        """
+
+        if self._streams is None:
+            self._init_streams()
+        return self._streams[1]
+
+    def write_response_stream(self):
+        """
+        AXI write responses (2 bit) of the write requests in request order.
+        """
+
+        if self._streams is None:
+            self._init_streams()
+        return self._streams[2]
+
+
+class PipelinedMemoryInterface:
+    """
+    Front end for the MIG user interface that keeps multiple requests in flight.
+
+    Requests are collected in a command fifo and issued to the MIG
+    whenever `app_rdy` is set, so reads can be issued back-to-back.
+    Read responses are returned in request order through a response fifo,
+    the number of outstanding reads is limited to its depth because
+    the MIG cannot be stalled once read data is returned.
+    Write data is passed to the MIG independently of the write commands,
+    a write command is only issued once its data was accepted.
+
+    All requests must be issued from a single coroutine in `ui_ctx` and this
+    class must be the only user of the wrapped `DDR2_UserInterface`.
+    """
+
+    def __init__(
+        self,
+        interface: DDR2_UserInterface,
+        *,
+        command_depth: int = 16,
+        response_depth: int = 64,
+    ):
+        signals = interface.signals
+        ctx = interface.ui_ctx
+        addr_width = signals.app_addr.width
+
+        self.interface = interface
+        self.ui_ctx = ctx
+
+        def fifo(data_width, depth, implementation):
+            return CommonClkFifo(
+                reset=ctx.reset(),
+                clk=ctx.clk(),
+                data_width=data_width,
+                depth=depth,
+                backend=Backend.XPM,
+                implementation=implementation,
+            )
+
+        # [is_write][addr]
+        self.commands = fifo(
+            1 + addr_width, command_depth, Implementation.DISTRIBUTED_RAM
+        )
+        # [mask][data]
+        self.write_buffer = fifo(
+            16 + 128, command_depth, Implementation.DISTRIBUTED_RAM
+        )
+        self.responses = fifo(128, response_depth, Implementation.BLOCK_RAM)
+
+        # created by request_stream/read_stream
+        self._request_stream = None
+        self._read_stream = None
+
+        # keep some margin to the capacity of the response fifo
+        max_inflight = response_depth - 2
+
+        # reads issued to the MIG whose response was not yet popped
+        self._inflight = Signal[Unsigned.upto(max_inflight)](0, name="ddr2_inflight")
+        # write data accepted by the MIG without matching write command
+        self._wdata_ahead = Signal[Unsigned.upto(command_depth)](
+            0, name="ddr2_wdata_ahead"
+        )
+
+        commands = self.commands
+        write_buffer = self.write_buffer
+        responses = self.responses
+        inflight = self._inflight
+        wdata_ahead = self._wdata_ahead
+
+        cmd_is_write = commands.data_out.msb()
+        cmd_addr = commands.data_out.lsb(addr_width)
+
+        issue = Signal[Bit](name="ddr2_issue")
+        wdf_accept = Signal[Bit](name="ddr2_wdf_accept")
+
+        @std.concurrent
+        def proc_issue():
+            issue.next = not commands.empty and (
+                wdata_ahead != 0 if cmd_is_write else inflight != max_inflight
+            )
+
+            signals.app_en <<= issue
+            signals.app_addr <<= cmd_addr
+            signals.app_cmd <<= std.concat(std.zeros(2), ~cmd_is_write)
+            commands.rd_en <<= issue & signals.app_rdy
+
+        @std.concurrent
+        def proc_write_data():
+            wdf_accept.next = ~write_buffer.empty & signals.app_wdf_rdy
+
+            signals.app_wdf_wren <<= ~write_buffer.empty
+            signals.app_wdf_end <<= ~write_buffer.empty
+            signals.app_wdf_data <<= write_buffer.data_out.lsb(128)
+            signals.app_wdf_mask <<= write_buffer.data_out.msb(16)
+            write_buffer.rd_en <<= wdf_accept
+
+        @std.concurrent
+        def proc_read_data():
+            responses.wr_en <<= signals.app_rd_data_valid
+            responses.data_in <<= signals.app_rd_data
+
+        @ctx
+        def proc_count():
+            read_issued = issue & signals.app_rdy & ~cmd_is_write
+            write_issued = issue & signals.app_rdy & cmd_is_write
+
+            if read_issued and not responses.rd_en:
+                inflight.next = inflight + 1
+            elif responses.rd_en and not read_issued:
+                inflight.next = inflight - 1
+
+            if wdf_accept and not write_issued:
+                wdata_ahead.next = wdata_ahead + 1
+            elif write_issued and not wdf_accept:
+                wdata_ahead.next = wdata_ahead - 1
+
+    @staticmethod
+    def _line_addr(addr):
+        return addr.msb(rest=4) @ std.zeros(4)
+
+    def pending_reads(self):
+        """
+        Number of issued reads whose response has not been received.
+        """
+
+        return self._inflight
+
+    async def request_read(self, addr):
+        """
+        Queues a read of the 128 bit line containing `addr`.
+        The data is returned by `receive_read` in request order.
+        """
+
+        await self.commands.wait_and_push(std.concat(Bit(0), self._line_addr(addr)))
+
+    async def receive_read(self) -> BitVector[128]:
+        return await self.responses.wait_and_pop()
+
+    async def write_data(self, addr, data: BitVector[128], mask=Null):
+        """
+        Queues a write of `data` to the line containing `addr`
+        and returns without waiting for the MIG.
+        """
+
+        assert data.width == 128
+
+        cmd_buffer = Signal(std.concat(Bit(1), self._line_addr(addr)))
+        data_buffer = Signal(std.concat(std.zeros(16) if mask is Null else mask, data))
+
+        await cohdl.expr(not self.commands.full and not self.write_buffer.full)
+
+        self.commands.push_value(cmd_buffer)
+        self.write_buffer.push_value(data_buffer)
+
+    async def read_data(self, addr) -> BitVector[128]:
+        """
+        Same as `DDR2_UserInterface.read_data`. Only returns the data of
+        `addr` when no other reads are outstanding.
+        """
+
+        await self.request_read(addr)
+        return await self.receive_read()
+
+    def request_stream(self):
+        """
+        Returns a stream that queues one request per clock cycle, each
+        transfer contains `[is_write][addr][mask][data]` (mask and data
+        are ignored for reads). Must not be combined with the request
+        coroutines.
+        """
+
+        if self._request_stream is not None:
+            return self._request_stream
+
+        commands = self.commands
+        write_buffer = self.write_buffer
+        addr_width = self.interface.signals.app_addr.width
+
+        stream = AxiStream.signal(
+            self.ui_ctx.clk(),
+            self.ui_ctx.reset(),
+            1 + addr_width + 16 + 128,
+            has_last=False,
+            has_keep=False,
+            prefix="ddr2_req_",
+        )
+
+        is_write = stream.data.msb()
+        addr = stream.data.lsb(rest=1).msb(addr_width)
+
+        @std.concurrent
+        def proc_request_stream():
+            ready = ~commands.full & ~write_buffer.full
+
+            stream.ready <<= ready
+            commands.wr_en <<= stream.valid & ready
+            commands.data_in <<= std.concat(is_write, self._line_addr(addr))
+            write_buffer.wr_en <<= stream.valid & ready & is_write
+            write_buffer.data_in <<= stream.data.lsb(16 + 128)
+
+        self._request_stream = stream
+        return stream
+
+    def read_stream(self):
+        """
+        Returns a stream of the read responses (128 bit) in request order.
+        Must not be combined with `receive_read`.
+        """
+
+        if self._read_stream is None:
+            self._read_stream = fifo_output_stream(
+                self.responses,
+                self.ui_ctx.clk(),
+                self.ui_ctx.reset(),
+                prefix="ddr2_rd_",
+            )
+
+        return self._read_stream
+
+
 from cohdl.std.bitfield import Field, BitField
 
 
@@ -177,8 +553,21 @@ class SynchronizedMemoryInterface:
         interface: DDR2_UserInterface,
         sys_ctx: std.SequentialContext,
         request_ctx: std.SequentialContext | None = None,
+        *,
+        use_fifos: bool = False,
+        fifo_depth: int = 32,
     ):
-        from cohdl_xil.ip.fifo import IndependentClkFifo
+        """
+        Transfers memory requests from `request_ctx` (defaults to `sys_ctx`)
+        into the clock domain of the MIG user interface.
+
+        By default a single request is transferred at a time using mailboxes.
+        When `use_fifos` is set, requests and responses are passed through
+        asynchronous fifos with `fifo_depth` entries and executed by a
+        `PipelinedMemoryInterface`. In this mode multiple requests can be
+        in flight, use `request_read`/`receive_read` to issue reads
+        without waiting for their data.
+        """
 
         class Request(std.Record):
             is_write: Bit
@@ -195,6 +584,17 @@ class SynchronizedMemoryInterface:
 
         self.ADDR_WIDTH = interface.signals.app_addr.width
 
+        self._use_fifos = use_fifos
+        self._request_ctx = request_ctx
+
+        # created by request_stream/read_stream
+        self._request_stream = None
+        self._read_stream = None
+
+        if use_fifos:
+            self._init_fifos(request_ctx, fifo_depth)
+            return
+
         self.req_box = std.Mailbox[BitVector[128]](delay=3)
         self.resp_box = std.Mailbox[BitVector[128]](delay=3)
 
@@ -215,19 +615,141 @@ class SynchronizedMemoryInterface:
                 resp = await interface.read_data(req.addr)
                 self.resp_box.send(resp)
 
+    def _init_fifos(self, request_ctx, fifo_depth):
+        addr_width = self.ADDR_WIDTH
+        pipe = PipelinedMemoryInterface(self.interface)
+
+        # the reset of xpm_fifo_async must be synchronous to the write clock
+        def fifo(data_width, write_ctx: std.SequentialContext, clk_read):
+            return IndependentClkFifo(
+                reset=write_ctx.reset(),
+                clk_read=clk_read,
+                clk_write=write_ctx.clk(),
+                data_width=data_width,
+                depth=fifo_depth,
+                backend=Backend.XPM,
+                implementation=Implementation.BLOCK_RAM,
+            )
+
+        # [is_write][addr][mask][data]
+        self.req_fifo = fifo(1 + addr_width + 16 + 128, request_ctx, self.ui_ctx.clk())
+        self.resp_fifo = fifo(128, self.ui_ctx, request_ctx.clk())
+
+        req = self.req_fifo
+        resp = self.resp_fifo
+
+        req_is_write = req.data_out.msb()
+        req_addr = req.data_out.lsb(rest=1).msb(addr_width)
+        req_mask_data = req.data_out.lsb(16 + 128)
+
+        # move one request/response per ui_clk cycle
+        # between the asynchronous fifos and the pipelined interface
+
+        @std.concurrent
+        def proc_forward_requests():
+            forward = not req.empty and not (
+                pipe.commands.full or pipe.write_buffer.full
+            )
+
+            req.rd_en <<= forward
+            pipe.commands.wr_en <<= forward
+            pipe.commands.data_in <<= std.concat(
+                req_is_write, pipe._line_addr(req_addr)
+            )
+            pipe.write_buffer.wr_en <<= forward and req_is_write
+            pipe.write_buffer.data_in <<= req_mask_data
+
+        @std.concurrent
+        def proc_forward_responses():
+            forward = not pipe.responses.empty and not resp.full
+
+            pipe.responses.rd_en <<= forward
+            resp.wr_en <<= forward
+            resp.data_in <<= pipe.responses.data_out
+
     async def write(self, addr, data, mask):
-        req = self._Request(is_write=Bit(1), addr=addr, mask=mask)
-        data_buffer = Signal(data)
+        if self._use_fifos:
+            await self.req_fifo.wait_and_push(std.concat(Bit(1), addr, mask, data))
+        else:
+            req = self._Request(is_write=Bit(1), addr=addr, mask=mask)
+            data_buffer = Signal(data)
 
-        self.req_box.send(std.leftpad(std.to_bits(req), 128))
-        await self.req_box.is_clear()
-        self.req_box.send(data_buffer)
-        await self.req_box.is_clear()
+            self.req_box.send(std.leftpad(std.to_bits(req), 128))
+            await self.req_box.is_clear()
+            self.req_box.send(data_buffer)
+            await self.req_box.is_clear()
 
     async def read(self, addr):
-        req = self._Request(is_write=Bit(0), addr=addr, mask=Null)
-        self.req_box.send(std.leftpad(std.to_bits(req), 128))
-        return await self.resp_box.receive()
+        if self._use_fifos:
+            await self.request_read(addr)
+            return await self.receive_read()
+        else:
+            req = self._Request(is_write=Bit(0), addr=addr, mask=Null)
+            self.req_box.send(std.leftpad(std.to_bits(req), 128))
+            return await self.resp_box.receive()
+
+    async def request_read(self, addr):
+        """
+        Queues a read request (only available when `use_fifos` is set).
+        Responses are returned by `receive_read` in request order.
+        """
+
+        assert self._use_fifos, "request_read requires use_fifos=True"
+        await self.req_fifo.wait_and_push(std.concat(Bit(0), addr, std.zeros(16 + 128)))
+
+    async def receive_read(self):
+        assert self._use_fifos, "receive_read requires use_fifos=True"
+        return await self.resp_fifo.wait_and_pop()
+
+    async def write_data(self, addr, data: BitVector[128], mask=Null):
+        """
+        Same as `write` with an optional `mask`, so the class can be
+        used in place of a `PipelinedMemoryInterface`.
+        """
+
+        await self.write(addr, data, std.zeros(16) if mask is Null else mask)
+
+    async def read_data(self, addr) -> BitVector[128]:
+        return await self.read(addr)
+
+    def request_stream(self):
+        """
+        Returns a stream writing one request per clock cycle into the
+        request fifo (only available when `use_fifos` is set). Each transfer
+        contains `[is_write][addr][mask][data]` (mask and data are ignored
+        for reads). Must not be combined with the request coroutines.
+        """
+
+        assert self._use_fifos, "request_stream requires use_fifos=True"
+
+        if self._request_stream is None:
+            self._request_stream = fifo_input_stream(
+                self.req_fifo,
+                self._request_ctx.clk(),
+                self._request_ctx.reset(),
+                prefix="ddr2_sync_req_",
+            )
+
+        return self._request_stream
+
+    def read_stream(self):
+        """
+        Returns a stream of the read responses (128 bit) in request order
+        (only available when `use_fifos` is set). Must not be combined
+        with `receive_read`.
+        """
+
+        assert self._use_fifos, "read_stream requires use_fifos=True"
+
+        if self._read_stream is None:
+            self._read_stream = fifo_output_stream(
+                self.resp_fifo,
+                self._request_ctx.clk(),
+                self._request_ctx.reset(),
+                prefix="ddr2_sync_rd_",
+            )
+
+        return self._read_stream
 
 
 @dataclass
@@ -606,10 +1128,26 @@ class NexysA7:
             clk=self.fpga.reserve_port("eth_clk", cohdl.Bit, pm.clk),
         )
 
-    def ddr2_memory(self, ctx_system: std.SequentialContext, zero_unused_ports=True):
+    def _ddr2_mig(
+        self,
+        ctx_system: std.SequentialContext,
+        project: MigProject,
+        ports: dict[str, Port],
+        signals: dict[str, Signal],
+    ):
+        # instantiates the MIG with the DDR2 pins and the user interface
+        # given by `ports`/`signals`
         from cohdl import Port, Bit, BitVector
 
-        assert ctx_system.clk().frequency() == std.MHz(200)
+        controller = project.controller
+
+        assert (
+            abs(ctx_system.clk().frequency().megahertz() - controller.input_clk_freq)
+            < 0.1
+        ), "ctx_system must be clocked with the input clock frequency of the MIG project"
+        assert (
+            controller.phy_ratio is PhyRatio.RATIO_4_1 and controller.data_width == 16
+        ), "the DDR2 interface of the board requires a 4:1 PHY ratio and 16 bit memory"
 
         properties = {
             "CONFIG.ARESETN.INSERT_VIP": "0",
@@ -787,41 +1325,15 @@ class NexysA7:
             "ddr2_cs_n": Port.output(BitVector[1]),
             "ddr2_dm": Port.output(BitVector[2]),
             "ddr2_odt": Port.output(BitVector[1]),
-            "app_addr": Port.input(BitVector[27]),
-            "app_cmd": Port.input(BitVector[3]),
-            "app_en": Port.input(Bit),
-            "app_wdf_data": Port.input(BitVector[128]),
-            "app_wdf_end": Port.input(Bit),
-            "app_wdf_mask": Port.input(BitVector[16]),
-            "app_wdf_wren": Port.input(Bit),
-            "app_rd_data": Port.output(BitVector[128]),
-            "app_rd_data_end": Port.output(Bit),
-            "app_rd_data_valid": Port.output(Bit),
-            "app_rdy": Port.output(Bit),
-            "app_wdf_rdy": Port.output(Bit),
-            "app_sr_req": Port.input(Bit),
-            "app_ref_req": Port.input(Bit),
-            "app_zq_req": Port.input(Bit),
-            "app_sr_active": Port.output(Bit),
-            "app_ref_ack": Port.output(Bit),
-            "app_zq_ack": Port.output(Bit),
-            "ui_clk": Port.output(Bit),
-            "ui_clk_sync_rst": Port.output(Bit),
-            "init_calib_complete": Port.output(Bit),
-            "sys_clk_i": Port.input(Bit),
-            "sys_rst": Port.input(Bit),
+            **ports,
         }
 
         from cohdl_xil.ip.mig import mig
-        from pathlib import Path
-
-        with open(Path(__file__).parent / "nexys_a7_dep" / "default_mig.prj") as file:
-            prj_file_content = file.read()
 
         pins = PinMapping.ddr2_ports
         reserve = self.fpga.reserve_port
 
-        signals = {}
+        signals = {**signals}
 
         def reserve(name, type):
             config: Ddr2Memory = getattr(pins, name)
@@ -842,6 +1354,70 @@ class NexysA7:
         reserve("ddr2_dm", BitVector[2])
         reserve("ddr2_odt", BitVector[1])
 
+        mig(
+            project=project,
+            properties=properties,
+            ports=ports,
+            signals=signals,
+        )
+
+    @staticmethod
+    def default_mig_project() -> MigProject:
+        """
+        Returns the MIG configuration used by `ddr2_memory` and `ddr2_memory_axi`
+        when no project is specified. Use it as a starting point to tune
+        controller parameters, for example
+
+            board.default_mig_project().with_controller(
+                ordering=Ordering.NORMAL, bank_machines=8
+            )
+        """
+
+        from pathlib import Path
+
+        with open(Path(__file__).parent / "nexys_a7_dep" / "default_mig.prj") as file:
+            return MigProject.parse(file.read())
+
+    def ddr2_memory(
+        self,
+        ctx_system: std.SequentialContext,
+        zero_unused_ports=True,
+        *,
+        mig_project: MigProject | None = None,
+    ):
+        if mig_project is None:
+            mig_project = self.default_mig_project()
+
+        # the native interface is used independent of `mig_project`
+        mig_project = mig_project.with_controller(axi=None)
+        ui_frequency = std.MHz(mig_project.controller.ui_frequency())
+
+        ports = {
+            "app_addr": Port.input(BitVector[27]),
+            "app_cmd": Port.input(BitVector[3]),
+            "app_en": Port.input(Bit),
+            "app_wdf_data": Port.input(BitVector[128]),
+            "app_wdf_end": Port.input(Bit),
+            "app_wdf_mask": Port.input(BitVector[16]),
+            "app_wdf_wren": Port.input(Bit),
+            "app_rd_data": Port.output(BitVector[128]),
+            "app_rd_data_end": Port.output(Bit),
+            "app_rd_data_valid": Port.output(Bit),
+            "app_rdy": Port.output(Bit),
+            "app_wdf_rdy": Port.output(Bit),
+            "app_sr_req": Port.input(Bit),
+            "app_ref_req": Port.input(Bit),
+            "app_zq_req": Port.input(Bit),
+            "app_sr_active": Port.output(Bit),
+            "app_ref_ack": Port.output(Bit),
+            "app_zq_ack": Port.output(Bit),
+            "ui_clk": Port.output(Bit),
+            "ui_clk_sync_rst": Port.output(Bit),
+            "init_calib_complete": Port.output(Bit),
+            "sys_clk_i": Port.input(Bit),
+            "sys_rst": Port.input(Bit),
+        }
+
         with std.prefix("ddr2ui"):
             n = std.name
             interface = DDR2_UserInterfaceSignals(
@@ -870,16 +1446,9 @@ class NexysA7:
                 sys_rst=ctx_system.reset().active_low_signal(),
             )
 
-        signals.update(interface.__dict__)
+        self._ddr2_mig(ctx_system, mig_project, ports, interface.__dict__)
 
-        mig(
-            prj_file_content=prj_file_content,
-            properties=properties,
-            ports=ports,
-            signals=signals,
-        )
-
-        result = DDR2_UserInterface(interface, ui_frequency=std.MHz(75))
+        result = DDR2_UserInterface(interface, ui_frequency=ui_frequency)
 
         if zero_unused_ports:
             std.concurrent_assign(result.signals.app_sr_req, Null)
@@ -888,16 +1457,107 @@ class NexysA7:
 
         return result
 
+    def ddr2_memory_axi(
+        self,
+        ctx_system: std.SequentialContext,
+        *,
+        id_width: int = 4,
+        rd_wr_arbitration: str = "RD_PRI_REG",
+        mig_project: MigProject | None = None,
+    ):
+        """
+        Same as `ddr2_memory` but configures the MIG with its AXI4 slave
+        interface (128 bit data, bursts of up to 256 beats).
+        `rd_wr_arbitration` selects the MIG read/write arbitration
+        (TDM, ROUND_ROBIN, RD_PRI_REG, RD_PRI_REG_STARVE_LIMIT or WRITE_PRIORITY).
+        """
+
+        from cohdl_xil.ip.axi4 import Axi4
+
+        if mig_project is None:
+            mig_project = self.default_mig_project()
+
+        mig_project = mig_project.with_controller(
+            axi=MigAxiParameters(
+                addr_width=27,
+                data_width=128,
+                id_width=id_width,
+                rd_wr_arbitration=rd_wr_arbitration,
+            )
+        )
+
+        ui_frequency = std.MHz(mig_project.controller.ui_frequency())
+
+        with std.prefix("ddr2axi"):
+            n = std.name
+
+            ui_clk = Signal[Bit](name=n("ui_clk"))
+            ui_clk_sync_rst = Signal[Bit](name=n("ui_clk_sync_rst"))
+            aresetn = Signal[Bit](name=n("aresetn"))
+            init_calib_complete = Signal[Bit](name=n("init_calib_complete"))
+
+            ui_ctx = std.SequentialContext(
+                std.Clock(ui_clk, frequency=ui_frequency),
+                std.Reset(ui_clk_sync_rst, active_low=False),
+            )
+
+            axi = Axi4.signal(
+                ui_ctx.clk(),
+                ui_ctx.reset(),
+                addr_width=27,
+                data_width=128,
+                id_width=id_width,
+                prefix=n("s_axi_"),
+            )
+
+            control = {
+                "app_sr_req": (Port.input(Bit), Signal[Bit](name=n("sr_req"))),
+                "app_ref_req": (Port.input(Bit), Signal[Bit](name=n("ref_req"))),
+                "app_zq_req": (Port.input(Bit), Signal[Bit](name=n("zq_req"))),
+                "app_sr_active": (Port.output(Bit), Signal[Bit](name=n("sr_active"))),
+                "app_ref_ack": (Port.output(Bit), Signal[Bit](name=n("ref_ack"))),
+                "app_zq_ack": (Port.output(Bit), Signal[Bit](name=n("zq_ack"))),
+                "ui_clk": (Port.output(Bit), ui_clk),
+                "ui_clk_sync_rst": (Port.output(Bit), ui_clk_sync_rst),
+                "aresetn": (Port.input(Bit), aresetn),
+                "init_calib_complete": (Port.output(Bit), init_calib_complete),
+                "sys_clk_i": (Port.input(Bit), ctx_system.clk().signal()),
+                "sys_rst": (Port.input(Bit), ctx_system.reset().active_low_signal()),
+                **axi._ports("s_axi", master=False),
+            }
+
+        self._ddr2_mig(
+            ctx_system,
+            mig_project,
+            {name: port for name, (port, _) in control.items()},
+            {name: signal for name, (_, signal) in control.items()},
+        )
+
+        std.concurrent_assign(control["app_sr_req"][1], Null)
+        std.concurrent_assign(control["app_ref_req"][1], Null)
+        std.concurrent_assign(control["app_zq_req"][1], Null)
+
+        @std.concurrent
+        def proc_aresetn():
+            aresetn.next = not ui_clk_sync_rst
+
+        return Ddr2AxiMemory(axi, ui_ctx, init_calib_complete)
+
     def synchronized_dd2_access(
         self,
         system_ctx: std.SequentialContext,
         req_ctx: std.SequentialContext | None = None,
         zero_unused_ports=True,
+        *,
+        use_fifos: bool = False,
+        fifo_depth: int = 32,
     ):
         return SynchronizedMemoryInterface(
             self.ddr2_memory(system_ctx, zero_unused_ports=zero_unused_ports),
             system_ctx,
             req_ctx,
+            use_fifos=use_fifos,
+            fifo_depth=fifo_depth,
         )
 
     def architecture_impl(self, fn=None, *, build=True):
@@ -4,9 +4,13 @@ from dataclasses import dataclass
 from typing import Any
 
 import cohdl
-from cohdl import Signal, Bit, BitVector, Port, Null
+from cohdl import Signal, Bit, BitVector, Unsigned, Port, Null
 from cohdl_xil.fpgas.artix.artix_7 import Artix7
 from cohdl_xil._common.fpga import Direction, IoStandard, PortConfiguration
+from cohdl_xil.ip.fifo import CommonClkFifo
+from cohdl_xil.ip.axi4 import Axi4
+from cohdl_xil.ip.axi_stream import AxiStream
+from cohdl_xil.ip.mig import MigProject
 
 from cohdl import std
 
@@ -125,15 +129,63 @@ class DDR2_UserInterface:
     async def read_data(self, addr) -> BitVector[128]: ...
     async def write_data(self, addr, data: BitVector[128], mask=Null): ...
 
+class Ddr2AxiMemory:
+    def __init__(
+        self,
+        axi: Axi4,
+        ui_ctx: std.SequentialContext,
+        init_calib_complete: Signal[Bit],
+    ):
+        self.axi = axi
+        self.ui_ctx = ui_ctx
+        self.init_calib_complete = init_calib_complete
+
+    async def read_data(self, addr) -> BitVector[128]: ...
+    async def write_data(self, addr, data: BitVector[128], mask=Null): ...
+    def request_stream(self) -> AxiStream: ...
+    def read_stream(self) -> AxiStream: ...
+    def write_response_stream(self) -> AxiStream: ...
+
+class PipelinedMemoryInterface:
+    def __init__(
+        self,
+        interface: DDR2_UserInterface,
+        *,
+        command_depth: int = 16,
+        response_depth: int = 64,
+    ):
+        self.interface = interface
+        self.ui_ctx: std.SequentialContext
+        self.commands: CommonClkFifo
+        self.write_buffer: CommonClkFifo
+        self.responses: CommonClkFifo
+
+    def pending_reads(self) -> Signal[Unsigned]: ...
+    async def request_read(self, addr): ...
+    async def receive_read(self) -> BitVector[128]: ...
+    async def write_data(self, addr, data: BitVector[128], mask=Null): ...
+    async def read_data(self, addr) -> BitVector[128]: ...
+    def request_stream(self) -> AxiStream: ...
+    def read_stream(self) -> AxiStream: ...
+
 class SynchronizedMemoryInterface:
     def __init__(
         self,
         interface: DDR2_UserInterface,
         sys_ctx: std.SequentialContext,
         request_ctx: std.SequentialContext | None = None,
+        *,
+        use_fifos: bool = False,
+        fifo_depth: int = 32,
     ): ...
     async def write(self, addr, data, mask): ...
     async def read(self, addr) -> BitVector: ...
+    async def request_read(self, addr): ...
+    async def receive_read(self) -> BitVector[128]: ...
+    async def write_data(self, addr, data: BitVector[128], mask=Null): ...
+    async def read_data(self, addr) -> BitVector[128]: ...
+    def request_stream(self) -> AxiStream: ...
+    def read_stream(self) -> AxiStream: ...
 
 @dataclass
 class EthernetCon:
@@ -182,14 +234,31 @@ class NexysA7:
     def uart_out(self) -> Signal[Bit]: ...
     def accelerometer(self) -> Accelerometer: ...
     def ethernet(self) -> EthernetCon: ...
+    @staticmethod
+    def default_mig_project() -> MigProject: ...
     def ddr2_memory(
-        self, ctx_system: std.SequentialContext, zero_unused_ports=True
+        self,
+        ctx_system: std.SequentialContext,
+        zero_unused_ports=True,
+        *,
+        mig_project: MigProject | None = None,
     ) -> DDR2_UserInterface: ...
+    def ddr2_memory_axi(
+        self,
+        ctx_system: std.SequentialContext,
+        *,
+        id_width: int = 4,
+        rd_wr_arbitration: str = "RD_PRI_REG",
+        mig_project: MigProject | None = None,
+    ) -> Ddr2AxiMemory: ...
     def synchronized_dd2_access(
         self,
         system_ctx: std.SequentialContext,
         req_ctx: std.SequentialContext | None = None,
         zero_unused_ports=True,
+        *,
+        use_fifos: bool = False,
+        fifo_depth: int = 32,
     ) -> SynchronizedMemoryInterface: ...
     def architecture_impl(self, fn=None, *, build=True): ...
     def architecture(self, fn=None, *, build=True): ...
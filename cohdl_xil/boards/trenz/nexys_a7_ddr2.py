@@ -0,0 +1,1338 @@
+from __future__ import annotations
+
+from dataclasses import dataclass
+
+from cohdl import Signal, Bit, BitVector, Unsigned, Null, expr
+from cohdl import std
+
+from cohdl_xil.ip.fifo import (
+    CommonClkFifo,
+    IndependentClkFifo,
+    Backend,
+    Implementation,
+)
+from cohdl_xil.ip.axi_stream import fifo_input_stream, fifo_output_stream
+from cohdl_xil.boards.trenz.nexys_a7 import (
+    DDR2_UserInterface,
+    PipelinedMemoryInterface,
+)
+
+# address increment between two consecutive 128 bit lines,
+# same address format as `DDR2_UserInterface.read_data`
+LINE_STEP = 16
+
+# the default MIG configuration uses the BANK_ROW_COLUMN address map,
+# addresses with the same bits above the column address share a row
+ROW_LSB = 10
+
+
+def _fifo(
+    data_width,
+    depth,
+    read_ctx: std.SequentialContext,
+    write_ctx: std.SequentialContext,
+    implementation=Implementation.DISTRIBUTED_RAM,
+):
+    # XPM fifo between two (possibly identical) clock domains
+    if read_ctx is write_ctx:
+        return CommonClkFifo(
+            reset=read_ctx.reset(),
+            clk=read_ctx.clk(),
+            data_width=data_width,
+            depth=depth,
+            backend=Backend.XPM,
+            implementation=implementation,
+        )
+
+    return IndependentClkFifo(
+        reset=write_ctx.reset(),
+        clk_read=read_ctx.clk(),
+        clk_write=write_ctx.clk(),
+        data_width=data_width,
+        depth=depth,
+        backend=Backend.XPM,
+        implementation=implementation,
+    )
+
+
+class Ddr2Dma:
+    """
+    Moves contiguous address ranges between the DDR2 memory and fifos.
+
+    Memory reads (`to_memory = 0`) push one 128 bit line per ui_clk cycle
+    into `read_fifo`, memory writes pop their data from `write_fifo`.
+    Both fifos belong to the user, their DMA side must be clocked
+    by `interface.ui_ctx` and be 128 bits wide. The other side can use any
+    clock and width so the fifos also do the clock domain crossing.
+    `write_fifo` must use first word fall through mode.
+    One of the fifos can be omitted to create a single direction DMA,
+    descriptors for the missing direction are completed without
+    a transfer and set `error`.
+
+    Transfers are started by writing the descriptor registers `addr`,
+    `length` (in lines) and `to_memory` and setting `start` for one
+    clock cycle of `ctrl_ctx` (defaults to `ui_ctx`). Up to `queue_depth`
+    descriptors are queued while `ready` is set and executed in order.
+    `busy` stays set until all queued descriptors are completed.
+    Memory writes are completed once the last line was passed to the MIG.
+    `error` stays set until `clear_error` is set for one clock cycle.
+
+    The DMA creates its own `PipelinedMemoryInterface` and must be
+    the only user of `interface`.
+    """
+
+    def __init__(
+        self,
+        interface: DDR2_UserInterface,
+        *,
+        read_fifo: IndependentClkFifo | CommonClkFifo | None = None,
+        write_fifo: IndependentClkFifo | CommonClkFifo | None = None,
+        ctrl_ctx: std.SequentialContext | None = None,
+        length_width: int = 20,
+        queue_depth: int = 16,
+    ):
+        assert (
+            read_fifo is not None or write_fifo is not None
+        ), "at least one fifo required"
+
+        if read_fifo is not None:
+            assert read_fifo.write_width == 128, "read_fifo must accept 128 bit words"
+        if write_fifo is not None:
+            assert write_fifo.read_width == 128, "write_fifo must return 128 bit words"
+            assert (
+                write_fifo._config is None or write_fifo._config.fwft()
+            ), "write_fifo must use first word fall through mode"
+
+        ui_ctx = interface.ui_ctx
+        ctrl_ctx = ui_ctx if ctrl_ctx is None else ctrl_ctx
+
+        self.ui_ctx = ui_ctx
+        self.ctrl_ctx = ctrl_ctx
+        self.read_fifo = read_fifo
+        self.write_fifo = write_fifo
+        self.pipe = PipelinedMemoryInterface(interface)
+
+        addr_width = interface.signals.app_addr.width
+
+        with std.prefix("ddr2_dma"):
+            n = std.name
+
+            # descriptor registers
+            self.addr = Signal[BitVector[addr_width]](Null, name=n("addr"))
+            self.length = Signal[Unsigned[length_width]](0, name=n("length"))
+            self.to_memory = Signal[Bit](False, name=n("to_memory"))
+            self.start = Signal[Bit](False, name=n("start"))
+            self.clear_error = Signal[Bit](False, name=n("clear_error"))
+
+            # status registers
+            self.ready = Signal[Bit](name=n("ready"))
+            self.busy = Signal[Bit](name=n("busy"))
+            self.error = Signal[Bit](False, name=n("error"))
+
+            # [to_memory][addr][length]
+            self.descriptors = _fifo(
+                1 + addr_width + length_width, queue_depth, ui_ctx, ctrl_ctx
+            )
+            # one entry per descriptor, zero for rejected descriptors
+            self.completions = _fifo(1, queue_depth, ctrl_ctx, ui_ctx)
+
+            self._impl_ctrl(queue_depth)
+            self._impl_engine(addr_width, length_width)
+
+    def _impl_ctrl(self, queue_depth):
+        descriptors = self.descriptors
+        completions = self.completions
+        outstanding = Signal[Unsigned.upto(queue_depth)](0, name="ddr2_dma_outstanding")
+
+        @std.concurrent
+        def proc_submit():
+            self.ready <<= ~descriptors.full
+            self.busy <<= outstanding != 0
+
+            descriptors.wr_en <<= self.start & ~descriptors.full
+            descriptors.data_in <<= std.concat(self.to_memory, self.addr, self.length)
+
+            completions.rd_en <<= ~completions.empty
+
+        @self.ctrl_ctx
+        def proc_outstanding():
+            submitted = self.start & ~descriptors.full
+            completed = ~completions.empty
+
+            if submitted and not completed:
+                outstanding.next = outstanding + 1
+            elif completed and not submitted:
+                outstanding.next = outstanding - 1
+
+            if completed and not completions.data_out[0]:
+                self.error.next = True
+            elif self.clear_error:
+                self.error.next = False
+
+    def _impl_engine(self, addr_width, length_width):
+        pipe = self.pipe
+        read_fifo = self.read_fifo
+        write_fifo = self.write_fifo
+        descriptors = self.descriptors
+        completions = self.completions
+
+        desc_to_memory = descriptors.data_out.msb()
+        desc_addr = descriptors.data_out.lsb(rest=1).msb(addr_width)
+        desc_length = descriptors.data_out.lsb(length_width).unsigned
+
+        active = Signal[Bit](False, name="ddr2_dma_active")
+        cur_to_memory = Signal[Bit](False, name="ddr2_dma_cur_to_memory")
+        cur_addr = Signal[Unsigned[addr_width]](0, name="ddr2_dma_cur_addr")
+        # lines not yet passed to the pipelined interface
+        remaining_issue = Signal[Unsigned[length_width]](0, name="ddr2_dma_issue_cnt")
+        # read lines not yet pushed into `read_fifo`
+        remaining_data = Signal[Unsigned[length_width]](0, name="ddr2_dma_data_cnt")
+
+        issue_read = Signal[Bit](name="ddr2_dma_issue_read")
+        issue_write = Signal[Bit](name="ddr2_dma_issue_write")
+        forward = Signal[Bit](name="ddr2_dma_forward")
+
+        def direction_supported():
+            # descriptors for a missing fifo are rejected
+            if read_fifo is None:
+                return desc_to_memory
+            if write_fifo is None:
+                return not desc_to_memory
+            return True
+
+        @std.concurrent
+        def proc_issue():
+            issue_read.next = (
+                active
+                and not cur_to_memory
+                and remaining_issue != 0
+                and not pipe.commands.full
+            )
+
+            pipe.commands.wr_en <<= issue_read | issue_write
+            pipe.commands.data_in <<= std.concat(
+                cur_to_memory, pipe._line_addr(cur_addr.bitvector)
+            )
+
+        if write_fifo is None:
+            std.concurrent_assign(issue_write, False)
+        else:
+
+            @std.concurrent
+            def proc_issue_write():
+                issue_write.next = (
+                    active
+                    and cur_to_memory
+                    and remaining_issue != 0
+                    and not (
+                        pipe.commands.full or pipe.write_buffer.full or write_fifo.empty
+                    )
+                )
+
+                write_fifo.rd_en <<= issue_write
+                pipe.write_buffer.wr_en <<= issue_write
+                pipe.write_buffer.data_in <<= std.concat(
+                    std.zeros(16), write_fifo.data_out
+                )
+
+        if read_fifo is None:
+            std.concurrent_assign(forward, False)
+        else:
+
+            @std.concurrent
+            def proc_forward():
+                forward.next = not pipe.responses.empty and not read_fifo.full
+
+                pipe.responses.rd_en <<= forward
+                read_fifo.wr_en <<= forward
+                read_fifo.data_in <<= pipe.responses.data_out
+
+        @self.ui_ctx
+        def proc_engine():
+            if not active:
+                # rd_en is registered, a rejected descriptor is still
+                # visible in the cycle after it was taken
+                if not descriptors.empty and not descriptors.rd_en:
+                    descriptors.rd_en ^= True
+
+                    if direction_supported():
+                        active.next = True
+                        cur_to_memory.next = desc_to_memory
+                        cur_addr.next = desc_addr.unsigned
+                        remaining_issue.next = desc_length
+                        remaining_data.next = 0 if desc_to_memory else desc_length
+                    else:
+                        completions.push_value(std.zeros(1))
+            else:
+                if remaining_issue == 0 and remaining_data == 0:
+                    active.next = False
+                    completions.push_value(std.ones(1))
+
+                if issue_read or issue_write:
+                    cur_addr.next = cur_addr + LINE_STEP
+                    remaining_issue.next = remaining_issue - 1
+
+                if forward:
+                    remaining_data.next = remaining_data - 1
+
+    async def submit(self, addr, length, *, to_memory=False):
+        """
+        Waits until the descriptor queue is ready and queues a transfer
+        of `length` lines starting at `addr`. Must be called from `ctrl_ctx`
+        and is an alternative to writing the descriptor registers directly.
+        """
+
+        self.addr <<= addr
+        self.length <<= length
+        self.to_memory <<= to_memory
+
+        # `ready` only reflects a previous descriptor
+        # once `start` has returned to zero
+        await expr(self.ready and not self.start)
+        self.start ^= True
+        await std.tick()
+
+    async def wait_idle(self):
+        """
+        Waits until all queued transfers are completed.
+        """
+
+        await expr(not self.start and not self.busy)
+
+
+@dataclass
+class ArbiterClient:
+    """
+    Configuration of a single `Ddr2Arbiter` client.
+
+    `ctx` is the clock domain of the client (defaults to the ui_ctx).
+    Clients with a higher `priority` are served first, clients of the same
+    priority in round robin order. A client keeps the grant for up to
+    `weight` requests and longer while its requests target the same row.
+    When `max_latency` is set, a request pending for that many ui_clk cycles
+    preempts the current client at the next request boundary.
+    """
+
+    ctx: std.SequentialContext | None = None
+    priority: int = 0
+    weight: int = 1
+    max_latency: int | None = None
+    request_depth: int = 16
+    response_depth: int = 64
+
+
+class Ddr2ArbiterPort:
+    """
+    Memory access port of a single `Ddr2Arbiter` client.
+    Provides the same methods as `PipelinedMemoryInterface` in the clock
+    domain of the client. All requests must be issued from a single coroutine.
+    """
+
+    def __init__(
+        self,
+        config: ArbiterClient,
+        ui_ctx: std.SequentialContext,
+        addr_width: int,
+    ):
+        ctx = ui_ctx if config.ctx is None else config.ctx
+
+        self.config = config
+        self.ctx = ctx
+        self.addr_width = addr_width
+
+        # [is_write][addr][mask][data]
+        self.requests = _fifo(
+            1 + addr_width + 16 + 128, config.request_depth, ui_ctx, ctx
+        )
+        self.responses = _fifo(
+            128, config.response_depth, ctx, ui_ctx, Implementation.BLOCK_RAM
+        )
+
+        # created by request_stream/read_stream
+        self._request_stream = None
+        self._read_stream = None
+
+    async def request_read(self, addr):
+        """
+        Queues a read of the 128 bit line containing `addr`.
+        The data is returned by `receive_read` in request order.
+        """
+
+        await self.requests.wait_and_push(std.concat(Bit(0), addr, std.zeros(16 + 128)))
+
+    async def receive_read(self) -> BitVector[128]:
+        return await self.responses.wait_and_pop()
+
+    async def write_data(self, addr, data: BitVector[128], mask=Null):
+        """
+        Queues a write of `data` to the line containing `addr`.
+        """
+
+        assert data.width == 128
+        await self.requests.wait_and_push(
+            std.concat(Bit(1), addr, std.zeros(16) if mask is Null else mask, data)
+        )
+
+    async def read_data(self, addr) -> BitVector[128]:
+        await self.request_read(addr)
+        return await self.receive_read()
+
+    def request_stream(self):
+        """
+        Returns a stream writing one request per clock cycle into the
+        request fifo, each transfer contains `[is_write][addr][mask][data]`.
+        Must not be combined with the request coroutines.
+        """
+
+        if self._request_stream is None:
+            self._request_stream = fifo_input_stream(
+                self.requests, self.ctx.clk(), self.ctx.reset(), prefix="ddr2_arb_req_"
+            )
+
+        return self._request_stream
+
+    def read_stream(self):
+        """
+        Returns a stream of the read responses (128 bit) in request order.
+        Must not be combined with `receive_read`.
+        """
+
+        if self._read_stream is None:
+            self._read_stream = fifo_output_stream(
+                self.responses, self.ctx.clk(), self.ctx.reset(), prefix="ddr2_arb_rd_"
+            )
+
+        return self._read_stream
+
+
+class Ddr2Arbiter:
+    """
+    Shares the DDR2 memory between multiple clients.
+
+    Each entry of `clients` creates a `Ddr2ArbiterPort` in `ports`.
+    Requests are moved from the port fifos into a single
+    `PipelinedMemoryInterface` (one request per ui_clk cycle), read data
+    is returned to the port that issued the read. A response can only be
+    returned once the response fifo of its port has room, so a client that
+    does not collect its read data stalls the read data of all other clients.
+
+    See `ArbiterClient` for the arbitration options. Switching
+    to another client takes one additional ui_clk cycle.
+    The latency limits are only met, when the combined bandwidth of the
+    urgent clients does not exceed the memory bandwidth.
+    """
+
+    def __init__(
+        self,
+        interface: DDR2_UserInterface,
+        clients: list[ArbiterClient],
+        *,
+        order_depth: int = 128,
+    ):
+        assert len(clients) >= 1, "at least one client required"
+
+        for client in clients:
+            assert client.weight >= 1, "client weight must be at least 1"
+            assert (
+                client.max_latency is None or client.max_latency >= 1
+            ), "max_latency must be at least 1"
+
+        ui_ctx = interface.ui_ctx
+        addr_width = interface.signals.app_addr.width
+
+        self.ui_ctx = ui_ctx
+        self.pipe = PipelinedMemoryInterface(interface)
+
+        with std.prefix("ddr2_arb"):
+            self.ports = [
+                Ddr2ArbiterPort(client, ui_ctx, addr_width) for client in clients
+            ]
+
+            index_type = Unsigned.upto(max(len(clients) - 1, 1))
+            # client index of all issued reads in issue order
+            self.order = _fifo(index_type.width, order_depth, ui_ctx, ui_ctx)
+
+            self._impl_responses()
+            self._impl_requests(index_type, addr_width)
+
+    def _impl_responses(self):
+        pipe = self.pipe
+        order = self.order
+        ports = self.ports
+
+        head = order.data_out.unsigned
+        full_msb_first = [port.responses.full for port in reversed(ports)]
+        port_full = Signal[BitVector[len(ports)]](name="ddr2_arb_port_full")
+        forward = Signal[Bit](name="ddr2_arb_forward_resp")
+
+        @std.concurrent
+        def proc_forward_responses():
+            port_full.next = std.concat(*full_msb_first)
+            forward.next = (
+                not pipe.responses.empty and not order.empty and not port_full[head]
+            )
+
+            pipe.responses.rd_en <<= forward
+            order.rd_en <<= forward
+
+        for nr, port in enumerate(ports):
+
+            def impl_port(nr=nr, port=port):
+                @std.concurrent
+                def proc_route_response():
+                    port.responses.wr_en <<= forward and head == nr
+                    port.responses.data_in <<= pipe.responses.data_out
+
+            impl_port()
+
+    def _impl_requests(self, index_type, addr_width):
+        pipe = self.pipe
+        order = self.order
+        ports = self.ports
+        client_cnt = len(ports)
+        max_weight = max(port.config.weight for port in ports)
+
+        grant = Signal[index_type](0, name="ddr2_arb_grant")
+        granted = Signal[Bit](False, name="ddr2_arb_granted")
+        # requests forwarded since the current grant started
+        used = Signal[Unsigned.upto(max_weight)](0, name="ddr2_arb_used")
+        last_row = Signal[BitVector[addr_width - ROW_LSB]](Null, name="ddr2_arb_row")
+
+        head = Signal[BitVector[1 + addr_width + 16 + 128]](name="ddr2_arb_head")
+        weight_type = Unsigned.upto(max_weight)
+        weight = Signal[weight_type](name="ddr2_arb_weight")
+        allow = Signal[Bit](name="ddr2_arb_allow")
+        forward = Signal[Bit](name="ddr2_arb_forward")
+
+        head_is_write = head.msb()
+        head_addr = head.lsb(rest=1).msb(addr_width)
+        head_row = head_addr.msb(rest=ROW_LSB)
+        head_mask_data = head.lsb(16 + 128)
+
+        # per client state: pending request, pending request after
+        # the current grant (for round robin) and latency limit reached
+        pending = [
+            Signal[Bit](name=f"ddr2_arb_pending_{nr}") for nr in range(client_cnt)
+        ]
+        after = [Signal[Bit](name=f"ddr2_arb_after_{nr}") for nr in range(client_cnt)]
+        urgent = [
+            Signal[Bit](False, name=f"ddr2_arb_urgent_{nr}") for nr in range(client_cnt)
+        ]
+
+        pending_vec = Signal[BitVector[client_cnt]](name="ddr2_arb_pending")
+        urgent_vec = Signal[BitVector[client_cnt]](name="ddr2_arb_urgent")
+
+        pending_msb_first = pending[::-1]
+        urgent_msb_first = urgent[::-1]
+
+        index_const = [index_type(nr) for nr in range(client_cnt)]
+        head_options = {nr: port.requests.data_out for nr, port in enumerate(ports)}
+        weight_options = {
+            nr: weight_type(port.config.weight) for nr, port in enumerate(ports)
+        }
+
+        # candidates for the next grant in descending precedence,
+        # urgent clients first, then by priority and round robin order
+        candidates = [
+            (urgent[nr], index_const[nr])
+            for nr, port in enumerate(ports)
+            if port.config.max_latency is not None
+        ]
+
+        for priority in sorted({port.config.priority for port in ports}, reverse=True):
+            group = [
+                nr for nr, port in enumerate(ports) if port.config.priority == priority
+            ]
+            candidates += [(after[nr], index_const[nr]) for nr in group]
+            candidates += [(pending[nr], index_const[nr]) for nr in group]
+
+        for nr, port in enumerate(ports):
+            self._impl_client(
+                nr, port, grant, forward, pending[nr], after[nr], urgent[nr]
+            )
+
+        @std.concurrent
+        def proc_select():
+            pending_vec.next = std.concat(*pending_msb_first)
+            urgent_vec.next = std.concat(*urgent_msb_first)
+
+            head.next = std.select(grant, head_options, default=head_options[0])
+            weight.next = std.select(grant, weight_options, default=weight_options[0])
+
+            allow.next = (
+                granted
+                and pending_vec[grant]
+                and not (urgent_vec & ~std.one_hot(client_cnt, grant))
+                and (used < weight or head_row == last_row)
+            )
+
+            forward.next = allow and not (
+                pipe.commands.full
+                or pipe.write_buffer.full
+                or (order.full and not head_is_write)
+            )
+
+            pipe.commands.wr_en <<= forward
+            pipe.commands.data_in <<= std.concat(
+                head_is_write, pipe._line_addr(head_addr)
+            )
+            pipe.write_buffer.wr_en <<= forward & head_is_write
+            pipe.write_buffer.data_in <<= head_mask_data
+            order.wr_en <<= forward & ~head_is_write
+            order.data_in <<= grant
+
+        @self.ui_ctx
+        def proc_arbitrate():
+            if allow:
+                if forward:
+                    last_row.next = head_row
+
+                    if used != max_weight:
+                        used.next = used + 1
+            else:
+                granted.next = bool(pending_vec)
+                grant.next = std.choose_first(*candidates, default=grant)
+                used.next = 0
+
+    def _impl_client(self, nr, port, grant, forward, pending, after, urgent):
+        max_latency = port.config.max_latency
+        served = Signal[Bit](name=f"ddr2_arb_served_{nr}")
+
+        @std.concurrent
+        def proc_client():
+            served.next = forward and grant == nr
+            pending.next = not port.requests.empty
+            after.next = pending and grant < nr
+            port.requests.rd_en <<= served
+
+        if max_latency is not None:
+            waiting = Signal[Unsigned.upto(max_latency)](0, name=f"ddr2_arb_wait_{nr}")
+
+            @self.ui_ctx
+            def proc_latency():
+                if pending and not served:
+                    if waiting != max_latency:
+                        waiting.next = waiting + 1
+                else:
+                    waiting.next = 0
+
+                urgent.next = pending and not served and waiting >= max_latency - 1
+
+
+class Ddr2LineCache:
+    """
+    Write-combining line cache for 128 bit memory lines.
+
+    `memory` is any object providing the coroutines `read_data(addr)`
+    and `write_data(addr, data, mask)` in the clock domain `ctx`
+    (for example a `DDR2_UserInterface`, `PipelinedMemoryInterface`
+    or `Ddr2ArbiterPort`). The cache stores `lines` lines organized
+    in sets of `ways` lines, victims are chosen in round robin order.
+    Line data and tags are only read through registers,
+    so they can be mapped to block RAM.
+
+    Writes only update the cached line and record the written bytes.
+    Partial writes to the same line are merged and written to memory
+    when the line is evicted or `flush` is called (using the write mask
+    to skip bytes that were never written). Reads of fully written or
+    previously read lines are served without accessing the memory.
+
+    All requests must be issued from a single coroutine in `ctx`.
+    """
+
+    _READ = std.as_bitvector("00")
+    _WRITE = std.as_bitvector("01")
+    _FLUSH = std.as_bitvector("10")
+
+    def __init__(
+        self,
+        memory,
+        ctx: std.SequentialContext,
+        *,
+        addr_width: int = 27,
+        lines: int = 64,
+        ways: int = 2,
+    ):
+        assert std.is_pow_two(lines), "lines must be a power of two"
+        assert std.is_pow_two(ways), "ways must be a power of two"
+        assert ways <= lines, "more ways than lines"
+
+        sets = lines // ways
+        assert sets >= 2, "the cache requires at least two sets"
+
+        set_bits = std.int_log_2(sets)
+        tag_width = addr_width - 4 - set_bits
+
+        self.memory = memory
+        self.ctx = ctx
+        self.addr_width = addr_width
+        self.lines = lines
+        self.ways = ways
+
+        with std.prefix("ddr2_cache"):
+            # [kind][addr][mask][data]
+            with std.prefix("req"):
+                self._req_box = std.Mailbox[BitVector[2 + addr_width + 16 + 128]]()
+            with std.prefix("resp"):
+                self._resp_box = std.Mailbox[BitVector[128]]()
+
+            self._impl(sets, set_bits, tag_width)
+
+    def _impl(self, sets, set_bits, tag_width):
+        ctx = self.ctx
+        memory = self.memory
+        ways = self.ways
+        addr_width = self.addr_width
+        way_bits = std.int_log_2(ways)
+        way_type = Unsigned[max(way_bits, 1)]
+
+        # line meta data: [dirty][written bytes][tag]
+        meta_width = 1 + 16 + tag_width
+
+        data_mem = [
+            Signal[std.Array[BitVector[128], sets]](name=f"ddr2_cache_data_{w}")
+            for w in range(ways)
+        ]
+        meta_mem = [
+            Signal[std.Array[BitVector[meta_width], sets]](name=f"ddr2_cache_meta_{w}")
+            for w in range(ways)
+        ]
+        valid_mem = [
+            Signal[BitVector[sets]](Null, name=f"ddr2_cache_valid_{w}")
+            for w in range(ways)
+        ]
+
+        # content of the selected set, one entry per way
+        data_set = [
+            Signal[BitVector[128]](name=f"ddr2_cache_rd_data_{w}") for w in range(ways)
+        ]
+        meta_set = [
+            Signal[BitVector[meta_width]](name=f"ddr2_cache_rd_meta_{w}")
+            for w in range(ways)
+        ]
+        valid_set = [Signal[Bit](name=f"ddr2_cache_rd_valid_{w}") for w in range(ways)]
+        hit_vec = Signal[BitVector[ways]](name="ddr2_cache_hit")
+        hit_set = [hit_vec[w] for w in range(ways)]
+
+        data_opts = dict(enumerate(data_set))
+        meta_opts = dict(enumerate(meta_set))
+        valid_opts = dict(enumerate(valid_set))
+        hit_opts = [(hit, way_type(w)) for w, hit in enumerate(hit_set)]
+        zero_way = way_type(0)
+
+        victim = Signal[way_type](0, name="ddr2_cache_victim")
+        flush_cnt = Signal[Unsigned.upto(sets * ways)](0, name="ddr2_cache_flush_cnt")
+
+        # state of the accessed line
+        cur_way = Signal[way_type](0, name="ddr2_cache_way")
+        cur_hit = Signal[Bit](False, name="ddr2_cache_cur_hit")
+        cur_evict = Signal[Bit](False, name="ddr2_cache_evict")
+        cur_tag = Signal[BitVector[tag_width]](Null, name="ddr2_cache_cur_tag")
+        cur_bytes = Signal[BitVector[16]](Null, name="ddr2_cache_cur_bytes")
+        cur_dirty = Signal[Bit](False, name="ddr2_cache_cur_dirty")
+        cur_data = Signal[BitVector[128]](Null, name="ddr2_cache_cur_data")
+        # memory address of the line in cur_data
+        cur_addr = Signal[BitVector[addr_width]](Null, name="ddr2_cache_cur_addr")
+
+        req = self._req_box.data()
+        req_kind = req.msb(2)
+        req_addr = req.lsb(rest=2).msb(addr_width)
+        req_mask = req.lsb(16 + 128).msb(16)
+        req_data = req.lsb(128)
+        req_line = req_addr.msb(rest=4)
+        req_set = req_line.lsb(set_bits).unsigned
+        req_tag = req_line.msb(tag_width)
+
+        flush_set = flush_cnt.lsb(set_bits).unsigned
+        flush_way = (
+            zero_way
+            if way_bits == 0
+            else flush_cnt.lsb(set_bits + way_bits).msb(way_bits).unsigned
+        )
+
+        @std.concurrent
+        def proc_hit():
+            for w in range(ways):
+                hit_set[w] <<= valid_set[w] and meta_set[w].lsb(tag_width) == req_tag
+
+        def load_set(set_idx):
+            for w in range(ways):
+                data_set[w].next = data_mem[w][set_idx]
+                meta_set[w].next = meta_mem[w][set_idx]
+                valid_set[w].next = valid_mem[w][set_idx]
+
+        def select_line(way, set_idx, evict):
+            # copies the line `way` of the loaded set into the cur_* registers,
+            # `evict` is called with the valid and dirty flag of the line
+            meta = std.select(way, meta_opts, default=meta_set[0])
+            valid = std.select(way, valid_opts, default=valid_set[0])
+
+            cur_way.next = way
+            cur_evict.next = evict(valid, meta.msb())
+            cur_tag.next = meta.lsb(tag_width)
+            cur_bytes.next = meta.lsb(rest=1).msb(16)
+            cur_dirty.next = meta.msb()
+            cur_data.next = std.select(way, data_opts, default=data_set[0])
+            cur_addr.next = std.concat(meta.lsb(tag_width), set_idx, std.zeros(4))
+
+        def store(set_idx, dirty, written, tag, data):
+            for w in range(ways):
+                if cur_way == w:
+                    data_mem[w][set_idx] <<= data
+                    meta_mem[w][set_idx] <<= std.concat(dirty, written, tag)
+                    valid_mem[w][set_idx] <<= True
+
+        def merge(old, new, new_bytes):
+            # replaces the bytes of `old` selected by `new_bytes`
+            select = std.stretch(new_bytes, 8)
+            return (old & ~select) | (new & select)
+
+        async def flush():
+            while flush_cnt != sets * ways:
+                load_set(flush_set)
+                await std.tick()
+
+                select_line(flush_way, flush_set, lambda valid, dirty: valid and dirty)
+                await std.tick()
+
+                if cur_evict:
+                    await memory.write_data(cur_addr, cur_data, ~cur_bytes)
+                    store(flush_set, Bit(0), cur_bytes, cur_tag, cur_data)
+
+                flush_cnt.next = flush_cnt + 1
+
+            flush_cnt.next = 0
+
+        async def access():
+            load_set(req_set)
+            await std.tick()
+
+            is_hit = bool(hit_vec)
+            way = std.choose_first(*hit_opts, default=victim)
+
+            select_line(
+                way, req_set, lambda valid, dirty: valid and dirty and not is_hit
+            )
+            cur_hit.next = is_hit
+            await std.tick()
+
+            if cur_evict:
+                await memory.write_data(cur_addr, cur_data, ~cur_bytes)
+
+            if not cur_hit:
+                # allocate the line without reading it from memory
+                victim.next = victim + 1
+                cur_bytes.next = Null
+                cur_dirty.next = False
+                await std.tick()
+
+            if req_kind == self._WRITE:
+                store(
+                    req_set,
+                    Bit(1),
+                    cur_bytes | ~req_mask,
+                    req_tag,
+                    merge(cur_data, req_data, ~req_mask),
+                )
+                self._resp_box.send(Null)
+            elif cur_bytes == std.ones(16):
+                self._resp_box.send(cur_data)
+            else:
+                # complete partially written lines with the memory content
+                mem_data = await memory.read_data(req_addr)
+                line = merge(mem_data, cur_data, cur_bytes)
+
+                store(req_set, cur_dirty, std.ones(16), req_tag, line)
+                self._resp_box.send(line)
+
+        @ctx
+        async def proc_cache():
+            await self._req_box.is_set()
+
+            if req_kind == self._FLUSH:
+                await flush()
+                self._resp_box.send(Null)
+            else:
+                await access()
+
+            self._req_box.clear()
+
+    async def _request(self, kind, addr, mask, data):
+        self._req_box.send(std.concat(kind, addr, mask, data))
+        return await self._resp_box.receive()
+
+    async def write(self, addr, data: BitVector[128], mask=Null):
+        """
+        Writes the bytes of `data` not masked by `mask` (one bit per byte,
+        same meaning as in `DDR2_UserInterface.write_data`) into the line
+        containing `addr`.
+        """
+
+        assert data.width == 128
+        await self._request(
+            self._WRITE, addr, std.zeros(16) if mask is Null else mask, data
+        )
+
+    async def read(self, addr) -> BitVector[128]:
+        """
+        Returns the 128 bit line containing `addr`.
+        """
+
+        return await self._request(self._READ, addr, std.zeros(16), std.zeros(128))
+
+    async def flush(self):
+        """
+        Writes all modified lines back to the memory.
+        """
+
+        await self._request(
+            self._FLUSH, std.zeros(self.addr_width), std.zeros(16), std.zeros(128)
+        )
+
+
+class Ddr2TrafficGenerator:
+    """
+    Generates memory traffic and measures the performance of a DDR2 access path.
+
+    `memory` is an access path in the clock domain `ctx`, either one
+    providing `request_stream()` and `read_stream()` (such as
+    `PipelinedMemoryInterface`, `SynchronizedMemoryInterface` with
+    `use_fifos`, `Ddr2ArbiterPort` or `Ddr2AxiMemory`) or one providing
+    the coroutines `read_data(addr)` and `write_data(addr, data, mask)`
+    (such as `DDR2_UserInterface`). Each run performs `count` accesses
+    of one line using one of the address patterns
+
+    * SEQUENTIAL: consecutive lines starting at `base`
+    * STRIDED: lines `stride` lines apart starting at `base`
+    * RANDOM: lines from a 32 bit LFSR (same sequence in every run)
+
+    Written lines contain a value derived from their address,
+    reads compare the returned data against this value and
+    count mismatches in `errors`. So a read run following a write run
+    with the same parameters verifies the memory content.
+
+    Stream based paths get a new request in every clock cycle in which
+    the previous one is accepted, while a separate process collects the
+    responses (at most `pending_depth` accesses await their response).
+    Writes complete with their write response when `memory` provides
+    `write_response_stream()` (`Ddr2AxiMemory`), otherwise once they are
+    accepted. Coroutine based paths perform one access after another,
+    so the cycles of a run include the full latency of each access.
+
+    Hardware counters record the cycles of the run (until the last
+    access is complete), the number of accesses and the minimum, maximum
+    and histogram of the access latencies (in `ctx` cycles from issuing
+    an access until it is complete).
+    Histogram bin `n` counts latencies in `[n, n+1) * 2**bin_shift`,
+    the last bin also counts all longer latencies.
+
+    `send_report` serializes the counters of the last run into a frame of
+    `report_bytes()` bytes:
+
+        0xA5 0x5A, tag, pattern (bit 7 set for read runs),
+        ctx frequency in kHz, accesses, cycles, errors (u32 each),
+        min and max latency (u16 each), bin_shift, bin count (u8 each),
+        histogram bins (u32 each), checksum (sum of all bytes after the
+        sync bytes modulo 256)
+
+    All multi byte values are little endian. `tag` is a user defined
+    number used to identify the access path in the report.
+    """
+
+    SEQUENTIAL = 0
+    STRIDED = 1
+    RANDOM = 2
+
+    _SYNC = (0xA5, 0x5A)
+    # Galois LFSR taps for x^32 + x^22 + x^2 + x + 1
+    _LFSR_TAPS = 0x80200003
+
+    def __init__(
+        self,
+        memory,
+        ctx: std.SequentialContext,
+        *,
+        addr_width: int = 27,
+        count_width: int = 24,
+        bins: int = 16,
+        bin_shift: int = 2,
+        tag: int = 0,
+        pending_depth: int = 128,
+    ):
+        assert addr_width > 4, "addr_width too small"
+        assert 2 <= bins <= 255, "bins must be in range [2, 255]"
+        assert 0 <= tag <= 255, "tag must fit into a byte"
+
+        self.memory = memory
+        self.ctx = ctx
+        self.addr_width = addr_width
+        self.bins = bins
+        self.bin_shift = bin_shift
+        self.tag = tag
+        self.pending_depth = pending_depth
+
+        with std.prefix("ddr2_traffic"):
+            n = std.name
+
+            # run parameters
+            self.pattern = Signal[Unsigned[2]](self.SEQUENTIAL, name=n("pattern"))
+            self.read = Signal[Bit](False, name=n("read"))
+            self.count = Signal[Unsigned[count_width]](0, name=n("count"))
+            self.stride = Signal[Unsigned[addr_width - 4]](1, name=n("stride"))
+            self.base = Signal[Unsigned[addr_width]](0, name=n("base"))
+            self.start = Signal[Bit](False, name=n("start"))
+
+            # status and counters of the last run
+            self.busy = Signal[Bit](name=n("busy"))
+            self.accesses = Signal[Unsigned[32]](0, name=n("accesses"))
+            self.cycles = Signal[Unsigned[32]](0, name=n("cycles"))
+            self.errors = Signal[Unsigned[32]](0, name=n("errors"))
+            self.latency_min = Signal[Unsigned[16]](0, name=n("latency_min"))
+            self.latency_max = Signal[Unsigned[16]](0, name=n("latency_max"))
+            self.histogram = [
+                Signal[Unsigned[32]](0, name=n(f"bin_{nr}")) for nr in range(bins)
+            ]
+
+            self._impl(count_width)
+            self._impl_report()
+
+    def _line_data(self, addr):
+        # expected content of the line at `addr`
+        word = std.leftpad(addr, 32)
+        return std.concat(~word, word, ~word, word)
+
+    def _impl(self, count_width):
+        ctx = self.ctx
+        memory = self.memory
+        addr_width = self.addr_width
+        line_type = Unsigned[addr_width - 4]
+
+        active = Signal[Bit](False, name="ddr2_traffic_active")
+        remaining = Signal[Unsigned[count_width]](0, name="ddr2_traffic_remaining")
+        cur_line = Signal[line_type](0, name="ddr2_traffic_line")
+        cur_addr = Signal[BitVector[addr_width]](name="ddr2_traffic_addr")
+        cur_data = Signal[BitVector[128]](name="ddr2_traffic_data")
+        lfsr = Signal[BitVector[32]](Null, name="ddr2_traffic_lfsr")
+
+        timer = Signal[Unsigned[16]](0, name="ddr2_traffic_timer")
+
+        # completed accesses reported by proc_generator and proc_responses,
+        # only one of them completes the accesses of a run
+        latency = Signal[Unsigned[16]](0, name="ddr2_traffic_latency")
+        record = Signal[Bit](False, name="ddr2_traffic_record")
+        mismatch = Signal[Bit](False, name="ddr2_traffic_mismatch")
+        resp_latency = Signal[Unsigned[16]](0, name="ddr2_traffic_resp_latency")
+        resp_record = Signal[Bit](False, name="ddr2_traffic_resp_record")
+        resp_mismatch = Signal[Bit](False, name="ddr2_traffic_resp_mismatch")
+        done_latency = Signal[Unsigned[16]](name="ddr2_traffic_done_latency")
+
+        collecting = Signal[Bit](False, name="ddr2_traffic_collecting")
+
+        seed = std.as_bitvector(f"{1:032b}")
+        taps = std.as_bitvector(f"{self._LFSR_TAPS:032b}")
+
+        bin_index = done_latency.msb(rest=self.bin_shift).unsigned
+        last_bin = self.bins - 1
+
+        @std.concurrent
+        def proc_addr():
+            self.busy <<= self.start | active | collecting
+            cur_addr.next = (cur_line.bitvector @ std.zeros(4)).unsigned + self.base
+            cur_data.next = self._line_data(cur_addr)
+            done_latency.next = resp_latency if resp_record else latency
+
+        def first_line():
+            if self.pattern == self.RANDOM:
+                cur_line.next = seed.lsb(addr_width - 4).unsigned
+            else:
+                cur_line.next = 0
+
+        def next_line():
+            if self.pattern == self.SEQUENTIAL:
+                cur_line.next = cur_line + 1
+            elif self.pattern == self.STRIDED:
+                cur_line.next = cur_line + self.stride
+            else:
+                lfsr_shifted = std.zeros(1) @ lfsr.msb(rest=1)
+                next_lfsr = lfsr_shifted ^ taps if lfsr[0] else lfsr_shifted
+                lfsr.next = next_lfsr
+                cur_line.next = next_lfsr.lsb(addr_width - 4).unsigned
+
+        async def start_run():
+            await self.start
+
+            active.next = True
+            remaining.next = self.count
+            lfsr.next = seed
+            first_line()
+
+            # wait until the address registers are updated
+            await std.tick()
+
+        if hasattr(memory, "request_stream"):
+            requests = memory.request_stream()
+            reads = memory.read_stream()
+
+            assert (
+                requests.data_width() == 1 + addr_width + 16 + 128
+            ), "request stream does not match addr_width"
+
+            # [issue time][addr] of the accesses awaiting their response
+            pending = _fifo(16 + addr_width, self.pending_depth, ctx, ctx)
+            pending_time = pending.data_out.msb(16).unsigned
+            pending_addr = pending.data_out.lsb(addr_width)
+
+            # the current request, presented to `requests` until accepted
+            req_valid = Signal[Bit](False, name="ddr2_traffic_req_valid")
+            req_write = Signal[Bit](False, name="ddr2_traffic_req_write")
+            req_addr = Signal[BitVector[addr_width]](Null, name="ddr2_traffic_req_addr")
+            req_data = Signal[BitVector[128]](Null, name="ddr2_traffic_req_data")
+            req_time = Signal[Unsigned[16]](0, name="ddr2_traffic_req_time")
+
+            accepted = Signal[Bit](name="ddr2_traffic_accepted")
+            completed = Signal[Bit](name="ddr2_traffic_completed")
+            expected = Signal[BitVector[128]](name="ddr2_traffic_expected")
+
+            # set for runs whose accesses complete with a response,
+            # other accesses are complete once their request is accepted
+            collect = Signal[Bit](name="ddr2_traffic_collect")
+
+            if hasattr(memory, "write_response_stream"):
+                write_responses = memory.write_response_stream()
+                std.concurrent_assign(collect, True)
+
+                def response_valid():
+                    return reads.valid if self.read else write_responses.valid
+
+                @std.concurrent
+                def proc_write_responses():
+                    write_responses.ready <<= collecting & ~self.read & ~pending.empty
+
+            else:
+                std.concurrent_assign(collect, self.read)
+
+                def response_valid():
+                    return reads.valid
+
+            @std.concurrent
+            def proc_streams():
+                # requests are held back while the pending fifo is full,
+                # so each collected response has a pending entry
+                requests.valid <<= req_valid & ~pending.full
+                requests.data <<= std.concat(
+                    req_write, req_addr, std.zeros(16), req_data
+                )
+                accepted.next = req_valid & ~pending.full & requests.ready
+
+                pending.wr_en <<= accepted & collect
+                pending.data_in <<= std.concat(req_time.bitvector, req_addr)
+
+                completed.next = collecting & ~pending.empty & response_valid()
+                reads.ready <<= collecting & self.read & ~pending.empty
+                pending.rd_en <<= completed
+                expected.next = self._line_data(pending_addr)
+
+            @ctx
+            async def proc_generator():
+                await start_run()
+
+                # one iteration per clock cycle, the next request
+                # is loaded in the cycle the current one is accepted
+                while remaining or req_valid:
+                    if accepted and not collect:
+                        latency.next = timer - req_time
+                        record.push = True
+
+                    if accepted or not req_valid:
+                        if remaining:
+                            req_valid.next = True
+                            req_write.next = not self.read
+                            req_addr.next = cur_addr
+                            req_data.next = cur_data
+                            req_time.next = timer
+                            remaining.next = remaining - 1
+                            next_line()
+                        else:
+                            req_valid.next = False
+
+                active.next = False
+
+            resp_remaining = Signal[Unsigned[count_width]](
+                0, name="ddr2_traffic_resp_remaining"
+            )
+
+            @ctx
+            async def proc_responses():
+                await expr(self.start and collect)
+
+                collecting.next = True
+                resp_remaining.next = self.count
+
+                # one iteration per clock cycle
+                while resp_remaining:
+                    if completed:
+                        resp_latency.next = timer - pending_time
+                        resp_record.push = True
+                        resp_remaining.next = resp_remaining - 1
+
+                        if self.read:
+                            resp_mismatch.push = reads.data != expected
+
+                collecting.next = False
+
+        else:
+            issued = Signal[Unsigned[16]](0, name="ddr2_traffic_issued")
+
+            @ctx
+            async def proc_generator():
+                await start_run()
+
+                while remaining:
+                    issued.next = timer
+
+                    if self.read:
+                        data = await memory.read_data(cur_addr)
+                        mismatch.push = data != cur_data
+                    else:
+                        await memory.write_data(cur_addr, cur_data)
+
+                    latency.next = timer - issued
+                    record.push = True
+                    remaining.next = remaining - 1
+                    next_line()
+
+                active.next = False
+
+        @ctx
+        def proc_counters():
+            timer.next = timer + 1
+
+            if self.start:
+                self.accesses.next = 0
+                self.cycles.next = 0
+                self.errors.next = 0
+                self.latency_min.next = std.ones(16).unsigned
+                self.latency_max.next = 0
+
+                for hist_bin in self.histogram:
+                    hist_bin.next = 0
+            else:
+                if active or collecting:
+                    self.cycles.next = self.cycles + 1
+
+                if mismatch or resp_mismatch:
+                    self.errors.next = self.errors + 1
+
+                if record or resp_record:
+                    self.accesses.next = self.accesses + 1
+
+                    if done_latency < self.latency_min:
+                        self.latency_min.next = done_latency
+                    if done_latency > self.latency_max:
+                        self.latency_max.next = done_latency
+
+                    for nr, hist_bin in enumerate(self.histogram):
+                        if nr == last_bin:
+                            if bin_index >= last_bin:
+                                hist_bin.next = hist_bin + 1
+                        elif bin_index == nr:
+                            hist_bin.next = hist_bin + 1
+
+    def _impl_report(self):
+        def const_byte(value):
+            return std.as_bitvector(f"{value:08b}")
+
+        freq_khz = int(self.ctx.clk().frequency().megahertz() * 1000)
+
+        # constant fields are created outside of `fields`
+        # because f-strings are not allowed in synthesizable code
+        sync = [const_byte(value) for value in self._SYNC]
+        tag = const_byte(self.tag)
+        freq = std.as_bitvector(f"{freq_khz:032b}")
+        bin_info = [const_byte(self.bin_shift), const_byte(self.bins)]
+
+        def fields():
+            # report fields in transmission order (least significant byte first)
+            return [
+                *sync,
+                tag,
+                self.read @ std.zeros(5) @ self.pattern.bitvector,
+                freq,
+                self.accesses.bitvector,
+                self.cycles.bitvector,
+                self.errors.bitvector,
+                self.latency_min.bitvector,
+                self.latency_max.bitvector,
+                *bin_info,
+                *[hist_bin.bitvector for hist_bin in self.histogram],
+            ]
+
+        # without the checksum appended by `send_report`
+        self._report_len = 26 + 4 * self.bins
+
+        n = std.name
+
+        self._report = Signal[BitVector[8 * self._report_len]](name=n("report"))
+        self._shift = Signal[BitVector[8 * self._report_len]](name=n("shift"))
+        self._checksum = Signal[Unsigned[8]](0, name=n("checksum"))
+        self._send_cnt = Signal[Unsigned.upto(self._report_len)](0, name=n("send_cnt"))
+
+        @std.concurrent
+        def proc_report():
+            self._report <<= std.concat(*fields()[::-1])
+
+    def report_bytes(self):
+        """
+        Returns the length of the frame sent by `send_report` in bytes.
+        """
+
+        return self._report_len + 1
+
+    async def run(self, pattern, *, read=False, count=1024, stride=1, base=0):
+        """
+        Starts a run with the given parameters and waits until it is done.
+        Must be called from `ctx` and is an alternative to writing the
+        run parameters and setting `start` for one clock cycle.
+        """
+
+        self.pattern <<= pattern
+        self.read <<= read
+        self.count <<= count
+        self.stride <<= stride
+        self.base <<= base
+
+        await expr(not self.busy)
+        self.start ^= True
+        await std.tick()
+        await expr(not self.busy)
+
+    async def send_report(self, send_byte):
+        """
+        Sends the report frame of the last run. `send_byte` is a coroutine
+        function called with each byte (a BitVector[8]) and must return
+        once the byte was accepted (for example by a UART).
+        Must be called from a single coroutine.
+        """
+
+        shift = self._shift
+        checksum = self._checksum
+        cnt = self._send_cnt
+
+        shift <<= self._report
+        checksum <<= 0
+        cnt <<= 0
+
+        # wait until the report is loaded into the shift register
+        await std.tick()
+
+        while cnt != self._report_len:
+            await send_byte(shift.lsb(8))
+
+            # the sync bytes are not part of the checksum
+            if cnt >= len(self._SYNC):
+                checksum <<= checksum + shift.lsb(8).unsigned
+
+            shift <<= std.concat(shift.lsb(8), shift.msb(rest=8))
+            cnt <<= cnt + 1
+
+        await send_byte(checksum.bitvector)
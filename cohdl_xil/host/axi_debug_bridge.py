@@ -0,0 +1,434 @@
+"""
+Host side of `cohdl_xil.ip.axi_debug_bridge.AxiDebugBridge`.
+
+`DebugBridgeClient` queues register accesses and sends them to the board
+in a single write, the responses of all queued commands are read back
+afterwards. This avoids one UART round trip per register:
+
+    client = DebugBridgeClient(serial.Serial("/dev/ttyUSB1", 3000000, timeout=0.05))
+
+    with client.batch():
+        client.write(0x00, 0xFF)
+        switches = client.read(0x04)
+        scratch = client.read(0x40, 16)
+
+    print(switches.value, scratch.values)
+
+`BridgeModel` is a Python model of the board side used by
+
+    python -m cohdl_xil.host.axi_debug_bridge --loopback
+"""
+
+from __future__ import annotations
+
+import contextlib
+import struct
+import time
+
+CMD_ECHO = 0x00
+CMD_WRITE = 0x01
+CMD_READ = 0x02
+CMD_ERROR = 0xEE
+
+FLAG_FIXED = 0x10
+
+MAX_COUNT = 256
+
+RESP_NAMES = {0: "OKAY", 1: "EXOKAY", 2: "SLVERR", 3: "DECERR"}
+
+
+class BridgeError(Exception):
+    pass
+
+
+class Access:
+    """
+    Result of a queued access, available after the next `flush`.
+    """
+
+    def __init__(self, cmd: int, addr: int, count: int):
+        self.cmd = cmd
+        self.addr = addr
+        self.count = count
+        self._values: list[int] | None = None
+        self._resp: int | None = None
+
+    def _response_len(self):
+        if self.cmd & 0x0F == CMD_READ:
+            return 2 + 4 * self.count
+        return 2
+
+    def _complete(self, response: bytes):
+        if response[0] != self.cmd:
+            raise BridgeError(
+                f"unexpected response 0x{response[0]:02x} to command 0x{self.cmd:02x}"
+            )
+
+        if self.cmd & 0x0F == CMD_READ:
+            self._values = list(struct.unpack(f"<{self.count}I", response[1:-1]))
+        else:
+            self._values = []
+
+        self._resp = response[-1]
+
+    def done(self):
+        return self._resp is not None
+
+    @property
+    def resp(self) -> int:
+        """
+        Bitwise or of the AXI responses of all words of the access.
+        """
+
+        assert self.done(), "access not completed, call flush() first"
+        return self._resp
+
+    @property
+    def values(self) -> list[int]:
+        """
+        Read values (empty for writes).
+        """
+
+        assert self.done(), "access not completed, call flush() first"
+        return self._values
+
+    @property
+    def value(self) -> int:
+        assert len(self.values) == 1, "use `values` for multi word reads"
+        return self.values[0]
+
+
+class DebugBridgeClient:
+    """
+    Client for `AxiDebugBridge` over `port`, any object with `read(size)`
+    and `write(data)` methods such as a `serial.Serial` or
+    `cohdl_xil.host.framed_link.FdPort`.
+
+    `read` and `write` only queue accesses. Queued accesses are sent when
+    `flush` is called, when a `batch` block is left or when more than
+    `max_pending` response bytes are outstanding (to stay within the
+    receive buffer of the host).
+    When `check` is set, `flush` raises a `BridgeError` for accesses
+    with a non OKAY response.
+    """
+
+    def __init__(
+        self,
+        port,
+        *,
+        timeout: float = 1.0,
+        max_pending: int = 2048,
+        check: bool = True,
+    ):
+        self.port = port
+        self.timeout = timeout
+        self.max_pending = max_pending
+        self.check = check
+
+        self._request = bytearray()
+        self._pending: list[Access] = []
+        self._pending_len = 0
+        self._batch_depth = 0
+
+        # statistics
+        self.round_trips = 0
+        self.accesses = 0
+
+    def _queue(self, access: Access, request: bytes):
+        if self._pending_len + access._response_len() > self.max_pending:
+            self.flush()
+
+        self._request += request
+        self._pending.append(access)
+        self._pending_len += access._response_len()
+        self.accesses += access.count
+
+        if self._batch_depth == 0:
+            self.flush()
+
+        return access
+
+    def write(self, addr: int, values: int | list[int], *, increment=True):
+        """
+        Queues a write of one or more words starting at `addr`.
+        Returns a list of `Access` objects (one per 256 words).
+        """
+
+        if isinstance(values, int):
+            values = [values]
+
+        assert len(values) != 0, "no values to write"
+        result = []
+
+        for pos in range(0, len(values), MAX_COUNT):
+            chunk = values[pos : pos + MAX_COUNT]
+            chunk_addr = addr + 4 * pos if increment else addr
+            cmd = CMD_WRITE | (0 if increment else FLAG_FIXED)
+
+            request = struct.pack(
+                f"<BIB{len(chunk)}I", cmd, chunk_addr, len(chunk) - 1, *chunk
+            )
+            result.append(self._queue(Access(cmd, chunk_addr, len(chunk)), request))
+
+        return result if len(result) != 1 else result[0]
+
+    def read(self, addr: int, count: int = 1, *, increment=True):
+        """
+        Queues a read of `count` words starting at `addr`.
+        Returns an `Access` object (or a list of them for
+        more than 256 words) containing the read values after `flush`.
+        """
+
+        assert count >= 1, "count must be at least 1"
+        result = []
+
+        for pos in range(0, count, MAX_COUNT):
+            chunk = min(MAX_COUNT, count - pos)
+            chunk_addr = addr + 4 * pos if increment else addr
+            cmd = CMD_READ | (0 if increment else FLAG_FIXED)
+
+            request = struct.pack("<BIB", cmd, chunk_addr, chunk - 1)
+            result.append(self._queue(Access(cmd, chunk_addr, chunk), request))
+
+        return result if len(result) != 1 else result[0]
+
+    def read_word(self, addr: int) -> int:
+        with self.batch():
+            access = self.read(addr)
+        return access.value
+
+    def write_word(self, addr: int, value: int):
+        with self.batch():
+            self.write(addr, value)
+
+    @contextlib.contextmanager
+    def batch(self):
+        """
+        Accesses queued inside the with block are sent in a single
+        round trip when the block is left.
+        """
+
+        self._batch_depth += 1
+
+        try:
+            yield self
+        finally:
+            self._batch_depth -= 1
+
+        if self._batch_depth == 0:
+            self.flush()
+
+    def _read_exact(self, size: int) -> bytes:
+        result = bytearray()
+        deadline = time.monotonic() + self.timeout
+
+        while len(result) < size:
+            data = self.port.read(size - len(result))
+
+            if data:
+                result += data
+                deadline = time.monotonic() + self.timeout
+            elif time.monotonic() > deadline:
+                raise BridgeError(
+                    f"timeout after receiving {len(result)} of {size} bytes"
+                )
+
+        return bytes(result)
+
+    def flush(self):
+        """
+        Sends all queued accesses and waits for their responses.
+        """
+
+        if not self._pending:
+            return
+
+        pending, self._pending = self._pending, []
+        request, self._request = bytes(self._request), bytearray()
+        self._pending_len = 0
+
+        self.port.write(request)
+        self.round_trips += 1
+
+        response = self._read_exact(sum(access._response_len() for access in pending))
+        pos = 0
+
+        for access in pending:
+            access._complete(response[pos : pos + access._response_len()])
+            pos += access._response_len()
+
+        if self.check:
+            for access in pending:
+                if access.resp != 0:
+                    kind = "read" if access.cmd & 0x0F == CMD_READ else "write"
+                    raise BridgeError(
+                        f"{kind} at 0x{access.addr:08x} failed "
+                        f"({RESP_NAMES[access.resp]})"
+                    )
+
+    def sync(self, token: int = 0x5A):
+        """
+        Discards pending input and checks the connection with an
+        ECHO command. Queued accesses are dropped.
+        """
+
+        self._pending = []
+        self._request = bytearray()
+        self._pending_len = 0
+
+        while self.port.read(4096):
+            pass
+
+        self.port.write(bytes([CMD_ECHO, token]))
+        response = self._read_exact(2)
+
+        if response != bytes([CMD_ECHO, token]):
+            raise BridgeError(f"invalid echo response {response.hex()}")
+
+
+class BridgeModel:
+    """
+    Python model of `AxiDebugBridge` connected to a memory of 32 bit words
+    (a dict from address to value). Accesses to addresses outside of
+    `valid_range` respond with DECERR.
+    """
+
+    def __init__(self, port, memory: dict | None = None, valid_range=range(0, 0x1000)):
+        self.port = port
+        self.memory = {} if memory is None else memory
+        self.valid_range = valid_range
+        self._buffer = bytearray()
+
+    def _access(self, addr, value=None):
+        if addr not in self.valid_range:
+            return 0, 3
+
+        if value is not None:
+            self.memory[addr] = value
+            return 0, 0
+
+        return self.memory.get(addr, 0), 0
+
+    def _process(self):
+        # processes one complete command, returns False if more data is needed
+        buf = self._buffer
+
+        if not buf:
+            return False
+
+        cmd = buf[0]
+        op = cmd & 0x0F
+        step = 0 if cmd & FLAG_FIXED else 4
+
+        if cmd == CMD_ECHO:
+            if len(buf) < 2:
+                return False
+
+            self.port.write(bytes(buf[:2]))
+            del buf[:2]
+        elif op in (CMD_WRITE, CMD_READ):
+            if len(buf) < 6:
+                return False
+
+            addr, count = struct.unpack("<IB", buf[1:6])
+            count += 1
+            total = 6 + 4 * count if op == CMD_WRITE else 6
+
+            if len(buf) < total:
+                return False
+
+            resp = 0
+            response = bytearray([cmd])
+
+            if op == CMD_WRITE:
+                for nr, value in enumerate(struct.unpack(f"<{count}I", buf[6:total])):
+                    resp |= self._access(addr + nr * step, value)[1]
+            else:
+                for nr in range(count):
+                    value, word_resp = self._access(addr + nr * step)
+                    resp |= word_resp
+                    response += struct.pack("<I", value)
+
+            response.append(resp)
+            self.port.write(bytes(response))
+            del buf[:total]
+        else:
+            self.port.write(bytes([CMD_ERROR, cmd]))
+            del buf[0]
+
+        return True
+
+    def step(self):
+        self._buffer += self.port.read(4096)
+
+        while self._process():
+            pass
+
+
+def main():
+    import argparse
+    import random
+    import threading
+
+    from cohdl_xil.host.framed_link import _loopback_ports
+
+    parser = argparse.ArgumentParser(description="axi debug bridge self check")
+    parser.add_argument("port", nargs="?", help="serial port of the board")
+    parser.add_argument("--baud", type=int, default=3000000)
+    parser.add_argument("--base", type=lambda x: int(x, 0), default=0x40)
+    parser.add_argument("--words", type=int, default=16, help="at most 256")
+    parser.add_argument(
+        "--loopback", action="store_true", help="use a BridgeModel on a pseudo terminal"
+    )
+    args = parser.parse_args()
+
+    def run(client: DebugBridgeClient):
+        client.sync()
+        values = [random.getrandbits(32) for _ in range(args.words)]
+
+        start = time.monotonic()
+
+        with client.batch():
+            client.write(args.base, values)
+            single = [client.read(args.base + 4 * nr) for nr in range(args.words)]
+            burst = client.read(args.base, args.words)
+
+        elapsed = time.monotonic() - start
+
+        ok = [access.value for access in single] == values and burst.values == values
+        print("readback ok" if ok else "readback mismatch")
+        print(
+            f"{client.accesses} accesses in {client.round_trips} "
+            f"round trip(s), {elapsed * 1e3:.2f}ms"
+        )
+
+    if args.loopback:
+        host_port, board_port = _loopback_ports()
+        board = BridgeModel(board_port)
+        done = threading.Event()
+
+        def run_board():
+            while not done.is_set():
+                board.step()
+
+        thread = threading.Thread(target=run_board, daemon=True)
+        thread.start()
+
+        try:
+            run(DebugBridgeClient(host_port))
+        finally:
+            done.set()
+            thread.join()
+        return
+
+    if args.port is None:
+        parser.error("either a serial port or --loopback is required")
+
+    import serial
+
+    with serial.Serial(args.port, args.baud, timeout=0.05) as port:
+        run(DebugBridgeClient(port))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,441 @@
+"""
+Host side of the framed link protocol implemented by
+`cohdl_xil.ip.framed_link.FramedLink`.
+
+`FramedLinkClient` sends data in CRC checked frames using a sliding
+window (go-back-N with cumulative acknowledges) and receives the frames
+sent by the board. `BoardModel` is a Python model of the hardware side
+used to run the client against a pseudo terminal without a board:
+
+    python -m cohdl_xil.host.framed_link --loopback
+    python -m cohdl_xil.host.framed_link /dev/ttyUSB1 --baud 3000000
+
+The second form requires pyserial and a design that echoes `rx_payload`
+into `tx_payload` (see example/12_framed_link.py).
+"""
+
+from __future__ import annotations
+
+import os
+import select
+import time
+from dataclasses import dataclass, field
+
+SYNC = 0x7E
+KIND_DATA = 0x01
+KIND_ACK = 0x02
+KIND_RESET = 0x03
+
+MAX_PAYLOAD = 255
+
+
+def crc16(data: bytes, crc: int = 0xFFFF) -> int:
+    """
+    CRC-16/CCITT (polynomial 0x1021, initial value 0xFFFF).
+    """
+
+    for byte in data:
+        crc ^= byte << 8
+
+        for _ in range(8):
+            crc = ((crc << 1) ^ 0x1021) if crc & 0x8000 else (crc << 1)
+            crc &= 0xFFFF
+
+    return crc
+
+
+def encode_frame(kind: int, seq: int, payload: bytes = b"") -> bytes:
+    assert len(payload) <= MAX_PAYLOAD, "payload too long"
+    body = bytes([kind, seq & 0xFF, len(payload)]) + payload
+    crc = crc16(body)
+    return bytes([SYNC]) + body + bytes([crc & 0xFF, crc >> 8])
+
+
+class FrameDecoder:
+    """
+    Incremental frame decoder, `feed` returns all frames completed by
+    the given bytes as (kind, seq, payload) tuples. Frames with invalid
+    CRC are dropped and counted in `crc_errors`.
+    """
+
+    def __init__(self, max_payload: int = MAX_PAYLOAD):
+        self.max_payload = max_payload
+        self.crc_errors = 0
+        self._buffer = bytearray()
+
+    def feed(self, data: bytes) -> list[tuple[int, int, bytes]]:
+        self._buffer += data
+        frames = []
+
+        while True:
+            start = self._buffer.find(SYNC)
+
+            if start < 0:
+                self._buffer.clear()
+                return frames
+
+            del self._buffer[:start]
+
+            if len(self._buffer) < 4:
+                return frames
+
+            length = self._buffer[3]
+
+            if length > self.max_payload:
+                del self._buffer[0]
+                continue
+
+            frame_len = 4 + length + 2
+
+            if len(self._buffer) < frame_len:
+                return frames
+
+            body = bytes(self._buffer[1 : 4 + length])
+            received_crc = self._buffer[4 + length] | self._buffer[5 + length] << 8
+
+            if crc16(body) != received_crc:
+                # resynchronize at the next sync byte
+                self.crc_errors += 1
+                del self._buffer[0]
+                continue
+
+            frames.append((body[0], body[1], body[3:]))
+            del self._buffer[:frame_len]
+
+
+@dataclass
+class LinkStats:
+    frames_sent: int = 0
+    retransmissions: int = 0
+    bytes_sent: int = 0
+    bytes_acked: int = 0
+    frames_received: int = 0
+    bytes_received: int = 0
+    lost_frames: int = 0
+    crc_errors: int = 0
+    timeouts: int = 0
+    # round trip times (seconds) from sending a frame until its acknowledge
+    rtt: list[float] = field(default_factory=list)
+    start_time: float = field(default_factory=time.monotonic)
+
+    def elapsed(self):
+        return time.monotonic() - self.start_time
+
+    def throughput(self):
+        """
+        Acknowledged payload bytes per second.
+        """
+
+        elapsed = self.elapsed()
+        return self.bytes_acked / elapsed if elapsed > 0 else 0.0
+
+    def summary(self):
+        lines = [
+            f"sent {self.bytes_sent} bytes in {self.frames_sent} frames "
+            f"({self.retransmissions} retransmitted, {self.timeouts} timeouts)",
+            f"acknowledged {self.bytes_acked} bytes, "
+            f"{self.throughput() / 1e3:.1f} kB/s over {self.elapsed():.2f}s",
+            f"received {self.bytes_received} bytes in {self.frames_received} frames "
+            f"({self.lost_frames} lost, {self.crc_errors} crc errors)",
+        ]
+
+        if self.rtt:
+            lines.append(
+                f"rtt min {min(self.rtt) * 1e3:.2f}ms, "
+                f"avg {sum(self.rtt) / len(self.rtt) * 1e3:.2f}ms, "
+                f"max {max(self.rtt) * 1e3:.2f}ms"
+            )
+
+        return "\n".join(lines)
+
+
+class FdPort:
+    """
+    Minimal serial port interface (`read`/`write`) on a file descriptor,
+    for example one side of a pseudo terminal.
+    """
+
+    def __init__(self, fd: int, timeout: float = 0.1):
+        self.fd = fd
+        self.timeout = timeout
+
+    def read(self, size: int) -> bytes:
+        ready, _, _ = select.select([self.fd], [], [], self.timeout)
+        return os.read(self.fd, size) if ready else b""
+
+    def write(self, data: bytes):
+        view = memoryview(data)
+
+        while view:
+            written = os.write(self.fd, view)
+            view = view[written:]
+
+
+class FramedLinkClient:
+    """
+    Sends and receives framed data over `port`, any object with
+    `read(size)` (returning the available bytes after a short timeout)
+    and `write(data)` methods such as a `serial.Serial` or `FdPort`.
+
+    Up to `window` frames are sent before waiting for acknowledges,
+    unacknowledged frames are repeated after `timeout` seconds.
+    """
+
+    def __init__(
+        self,
+        port,
+        *,
+        window: int = 4,
+        max_payload: int = MAX_PAYLOAD,
+        timeout: float = 0.5,
+    ):
+        assert 1 <= window <= 64, "window must be in range [1, 64]"
+        assert 1 <= max_payload <= MAX_PAYLOAD, "max_payload must be in range [1, 255]"
+
+        self.port = port
+        self.window = window
+        self.max_payload = max_payload
+        self.timeout = timeout
+        self.stats = LinkStats()
+
+        self._decoder = FrameDecoder(max_payload)
+        self._seq = 0
+        self._last_ack = None
+        self._rx_expected = None
+        self._received: list[bytes] = []
+
+    def _poll(self):
+        # processes received frames, returns True if data was received
+        data = self.port.read(4096)
+
+        if not data:
+            return False
+
+        for kind, seq, payload in self._decoder.feed(data):
+            if kind == KIND_ACK:
+                self._last_ack = seq
+            elif kind == KIND_DATA:
+                if self._rx_expected is not None:
+                    self.stats.lost_frames += (seq - self._rx_expected) & 0xFF
+
+                self._rx_expected = (seq + 1) & 0xFF
+                self.stats.frames_received += 1
+                self.stats.bytes_received += len(payload)
+                self._received.append(payload)
+
+        self.stats.crc_errors = self._decoder.crc_errors
+        return True
+
+    def reset(self):
+        """
+        Synchronizes the sequence numbers with the board,
+        must be called before the first `send`.
+        """
+
+        seq = self._seq
+
+        while True:
+            self._last_ack = None
+            self.port.write(encode_frame(KIND_RESET, seq))
+            deadline = time.monotonic() + self.timeout
+
+            while time.monotonic() < deadline:
+                self._poll()
+
+                if self._last_ack == seq:
+                    self._seq = (seq + 1) & 0xFF
+                    return
+
+            self.stats.timeouts += 1
+
+    def send(self, data: bytes):
+        """
+        Sends `data` and waits until all frames are acknowledged.
+        """
+
+        chunks = [
+            data[pos : pos + self.max_payload]
+            for pos in range(0, len(data), self.max_payload)
+        ]
+
+        base_seq = self._seq
+        base = 0
+        next_chunk = 0
+        send_time: dict[int, float] = {}
+        last_progress = time.monotonic()
+
+        while base < len(chunks):
+            while next_chunk < len(chunks) and next_chunk - base < self.window:
+                if next_chunk in send_time:
+                    self.stats.retransmissions += 1
+
+                self.port.write(
+                    encode_frame(KIND_DATA, base_seq + next_chunk, chunks[next_chunk])
+                )
+                send_time[next_chunk] = time.monotonic()
+                self.stats.frames_sent += 1
+                self.stats.bytes_sent += len(chunks[next_chunk])
+                next_chunk += 1
+
+            self._poll()
+
+            if self._last_ack is not None:
+                # cumulative acknowledge of all frames up to `acked`,
+                # stale acknowledges wrap around to offsets >= window
+                offset = (self._last_ack - base_seq - base) & 0xFF
+                acked = base + offset
+
+                if offset < next_chunk - base:
+                    now = time.monotonic()
+                    self.stats.rtt.append(now - send_time[acked])
+
+                    for nr in range(base, acked + 1):
+                        self.stats.bytes_acked += len(chunks[nr])
+
+                    base = acked + 1
+                    last_progress = now
+
+            if time.monotonic() - last_progress > self.timeout:
+                # go back and repeat all unacknowledged frames
+                self.stats.timeouts += 1
+                next_chunk = base
+                last_progress = time.monotonic()
+
+        self._seq = (base_seq + len(chunks)) & 0xFF
+
+    def receive(self, timeout: float | None = None) -> bytes | None:
+        """
+        Returns the payload of the next frame sent by the board
+        or None if nothing was received within `timeout` seconds.
+        """
+
+        deadline = None if timeout is None else time.monotonic() + timeout
+
+        while not self._received:
+            if deadline is not None and time.monotonic() > deadline:
+                return None
+
+            self._poll()
+
+        return self._received.pop(0)
+
+
+class BoardModel:
+    """
+    Python model of `FramedLink` with `rx_payload` connected to
+    `tx_payload`, i.e. every accepted frame is echoed back.
+    `corrupt_every` flips a bit in every n-th received byte
+    to exercise the retransmission logic.
+    """
+
+    def __init__(self, port, *, max_payload: int = MAX_PAYLOAD, corrupt_every=None):
+        self.port = port
+        self.decoder = FrameDecoder(max_payload)
+        self.corrupt_every = corrupt_every
+        self.expected = 0
+        self.tx_seq = 0
+        self._byte_cnt = 0
+
+    def step(self):
+        data = bytearray(self.port.read(4096))
+
+        if self.corrupt_every:
+            for pos in range(len(data)):
+                self._byte_cnt += 1
+
+                if self._byte_cnt % self.corrupt_every == 0:
+                    data[pos] ^= 0x10
+
+        for kind, seq, payload in self.decoder.feed(bytes(data)):
+            if kind == KIND_RESET:
+                self.expected = (seq + 1) & 0xFF
+                self.port.write(encode_frame(KIND_ACK, seq))
+            elif kind == KIND_DATA:
+                if seq == self.expected:
+                    self.port.write(encode_frame(KIND_DATA, self.tx_seq, payload))
+                    self.tx_seq = (self.tx_seq + 1) & 0xFF
+                    self.expected = (self.expected + 1) & 0xFF
+
+                self.port.write(encode_frame(KIND_ACK, (self.expected - 1) & 0xFF))
+
+
+def _loopback_ports():
+    # returns a connected pair of ports using a pseudo terminal in raw mode
+    import tty
+
+    master, slave = os.openpty()
+    tty.setraw(slave)
+    return FdPort(master), FdPort(slave)
+
+
+def _run_transfer(client: FramedLinkClient, size: int, check_echo: bool):
+    payload = os.urandom(size)
+
+    client.reset()
+    client.send(payload)
+
+    if check_echo:
+        echoed = b""
+
+        while len(echoed) < len(payload):
+            frame = client.receive(timeout=5.0)
+
+            if frame is None:
+                break
+
+            echoed += frame
+
+        print("echo ok" if echoed == payload else "echo mismatch")
+
+    print(client.stats.summary())
+
+
+def main():
+    import argparse
+    import threading
+
+    parser = argparse.ArgumentParser(description="framed link throughput test")
+    parser.add_argument("port", nargs="?", help="serial port of the board")
+    parser.add_argument("--baud", type=int, default=3000000)
+    parser.add_argument("--size", type=int, default=64 * 1024)
+    parser.add_argument("--window", type=int, default=4)
+    parser.add_argument(
+        "--loopback", action="store_true", help="use a BoardModel on a pseudo terminal"
+    )
+    parser.add_argument(
+        "--corrupt-every", type=int, default=None, help="loopback bit error rate"
+    )
+    args = parser.parse_args()
+
+    if args.loopback:
+        host_port, board_port = _loopback_ports()
+        board = BoardModel(board_port, corrupt_every=args.corrupt_every)
+        done = threading.Event()
+
+        def run_board():
+            while not done.is_set():
+                board.step()
+
+        thread = threading.Thread(target=run_board, daemon=True)
+        thread.start()
+
+        try:
+            _run_transfer(
+                FramedLinkClient(host_port, window=args.window), args.size, True
+            )
+        finally:
+            done.set()
+            thread.join()
+        return
+
+    if args.port is None:
+        parser.error("either a serial port or --loopback is required")
+
+    import serial
+
+    with serial.Serial(args.port, args.baud, timeout=0.05) as port:
+        _run_transfer(FramedLinkClient(port, window=args.window), args.size, True)
+
+
+if __name__ == "__main__":
+    main()
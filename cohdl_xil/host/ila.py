@@ -0,0 +1,319 @@
+"""
+Host side helpers for `cohdl_xil.ip.ila.ila` cores.
+
+The bit layout of all ila cores in a design is written to
+`build/generated/ila_probes.json`. `IlaLayout` reads it and splits
+samples of (possibly packed) probe ports into the original probes:
+
+    layout = IlaLayout.load("build/generated/ila_probes.json")
+    values = layout.unpack({"ila0_probe0": 0x1_0000_0003})
+
+`capture` runs the generated `capture_ila.tcl` script in batch mode,
+it arms the core with a trigger condition, waits for the trigger and
+exports each capture as a CSV file. `load_csv` reads such a file into
+a NumPy structured array with one field per probe:
+
+    for samples in capture("build", {"counter": 0}, captures=100):
+        print(samples["cnt_zero"].sum(), samples["all_sw"][0])
+
+NumPy is only required by `load_csv` and `capture`.
+"""
+
+from __future__ import annotations
+
+import csv
+import glob
+import json
+import os
+import re
+import subprocess
+from dataclasses import dataclass
+
+
+@dataclass(frozen=True)
+class ProbeLayout:
+    """
+    Location of a probe (a key of the `probes` dict passed to `ila`)
+    in the probe port connected to the net `net`.
+    """
+
+    name: str
+    port: int
+    net: str
+    lsb: int
+    width: int
+    signed: bool
+    type: str
+
+    def extract(self, port_value: int) -> int:
+        value = (port_value >> self.lsb) & ((1 << self.width) - 1)
+
+        if self.signed and value >> (self.width - 1):
+            return value - (1 << self.width)
+
+        return value
+
+
+@dataclass(frozen=True)
+class PortLayout:
+    net: str
+    width: int
+
+
+class IlaLayout:
+    """
+    Probe layout of a single ila core.
+    """
+
+    def __init__(
+        self, data_depth: int, ports: list[PortLayout], probes: list[ProbeLayout]
+    ):
+        self.data_depth = data_depth
+        self.ports = ports
+        self.probes = probes
+
+    @staticmethod
+    def from_dict(layout: dict) -> IlaLayout:
+        return IlaLayout(
+            layout["data_depth"],
+            [PortLayout(**port) for port in layout["ports"]],
+            [ProbeLayout(**probe) for probe in layout["probes"]],
+        )
+
+    @staticmethod
+    def load(path: str | os.PathLike, index: int = 0) -> IlaLayout:
+        """
+        Reads the layout of the `index`-th ila core (in instantiation order)
+        from a file generated by the build.
+        """
+
+        with open(path) as file:
+            cores = json.load(file)["ila"]
+
+        assert 0 <= index < len(cores), f"no ila core with index {index}"
+        return IlaLayout.from_dict(cores[index])
+
+    def probe(self, name: str) -> ProbeLayout:
+        for probe in self.probes:
+            if probe.name == name:
+                return probe
+
+        raise KeyError(f"no probe named '{name}'")
+
+    def stored_probes(self) -> list[ProbeLayout]:
+        """
+        Probes contained in captured samples (trigger only probes are not stored).
+        """
+
+        return [probe for probe in self.probes if probe.type != "TRIGGER"]
+
+    def unpack(self, ports: dict[str, int]) -> dict[str, int]:
+        """
+        Splits the values of probe ports (indexed by net name) into the
+        values of the original probes. Probes of ports missing
+        in `ports` are not contained in the result.
+        """
+
+        return {
+            probe.name: probe.extract(ports[probe.net])
+            for probe in self.probes
+            if probe.net in ports
+        }
+
+    def pack(self, values: dict[str, int]) -> dict[str, int]:
+        """
+        Inverse of `unpack`, combines probe values into port values
+        (for example to build trigger compare values of packed ports).
+        Missing probes are set to zero.
+        """
+
+        result = {}
+
+        for probe in self.probes:
+            mask = (1 << probe.width) - 1
+            value = values.get(probe.name, 0) & mask
+            result[probe.net] = result.get(probe.net, 0) | (value << probe.lsb)
+
+        return result
+
+    def compare_values(self, trigger: dict[str, int]) -> dict[int, str]:
+        """
+        Trigger compare values (equality with `trigger`) of all
+        probe ports containing at least one probe of `trigger`.
+        Bits of other probes in the same port are don't care.
+        """
+
+        bits: dict[int, list[str]] = {}
+
+        for name, value in trigger.items():
+            probe = self.probe(name)
+            assert probe.type != "DATA", f"probe '{name}' cannot be used as trigger"
+
+            port = bits.setdefault(probe.port, ["X"] * self.ports[probe.port].width)
+            value &= (1 << probe.width) - 1
+
+            for nr in range(probe.width):
+                port[probe.lsb + nr] = str((value >> nr) & 1)
+
+        return {
+            port: f"eq{len(port_bits)}'b{''.join(reversed(port_bits))}"
+            for port, port_bits in bits.items()
+        }
+
+
+_RADIX = {"HEX": 16, "BINARY": 2, "OCTAL": 8, "UNSIGNED": 10, "SIGNED": 10}
+
+_SAMPLE_COLUMNS = {
+    "Sample in Buffer": "sample",
+    "Sample in Window": "window",
+    "TRIGGER": "trigger",
+}
+
+
+def _column_net(column: str):
+    # 'comp_IP_wrapper/ila0_probe0[32:0]' -> 'ila0_probe0'
+    return re.sub(r"\[.*\]$", "", column.strip()).split("/")[-1]
+
+
+def _dtype(probe: ProbeLayout):
+    import numpy as np
+
+    if probe.width == 1 and not probe.signed:
+        return np.bool_
+    if probe.width > 64:
+        return object
+
+    for bits in (8, 16, 32, 64):
+        if probe.width <= bits:
+            return np.dtype(f"{'i' if probe.signed else 'u'}{bits // 8}")
+
+
+def load_csv(path: str | os.PathLike, layout: IlaLayout):
+    """
+    Reads a capture exported with `write_hw_ila_data -csv_file` into a
+    NumPy structured array. The array contains the fields 'sample',
+    'window' and 'trigger' followed by one field per stored probe
+    (named after the keys of the `probes` dict passed to `ila`).
+    """
+
+    import numpy as np
+
+    with open(path, newline="") as file:
+        rows = list(csv.reader(file))
+
+    header, rows = rows[0], rows[1:]
+    radix = [10] * len(header)
+
+    # Vivado writes the radix of all columns in the second row
+    if rows and rows[0][0].startswith("Radix"):
+        radix = [_RADIX[value.split("-")[-1].strip().upper()] for value in rows[0]]
+        rows = rows[1:]
+
+    nets = {port.net for port in layout.ports}
+    columns = {}
+
+    for nr, column in enumerate(header):
+        net = _column_net(column)
+
+        if column.strip() in _SAMPLE_COLUMNS:
+            columns[_SAMPLE_COLUMNS[column.strip()]] = nr
+        elif net in nets:
+            columns[net] = nr
+
+    probes = layout.stored_probes()
+    missing = {probe.net for probe in probes if probe.net not in columns}
+    assert not missing, f"probe ports {sorted(missing)} not found in {path}"
+
+    fields = [
+        (name, np.int64) for name in ("sample", "window", "trigger") if name in columns
+    ]
+    fields += [(probe.name, _dtype(probe)) for probe in probes]
+
+    result = np.zeros(len(rows), dtype=fields)
+
+    def port_values(nr: int, width: int):
+        values = [int(row[nr], radix[nr]) for row in rows]
+        # signed radix values are converted to their two's complement
+        return [value & ((1 << width) - 1) for value in values]
+
+    for name in ("sample", "window", "trigger"):
+        if name in columns:
+            result[name] = [
+                int(row[columns[name]], radix[columns[name]]) for row in rows
+            ]
+
+    for port in layout.ports:
+        if port.net not in columns:
+            continue
+
+        values = port_values(columns[port.net], port.width)
+
+        for probe in probes:
+            if probe.net == port.net:
+                result[probe.name] = [probe.extract(value) for value in values]
+
+    return result
+
+
+def capture(
+    build_dir: str | os.PathLike,
+    trigger: dict[str, int] | None = None,
+    *,
+    ila: int = 0,
+    captures: int = 1,
+    trigger_position: int = 0,
+    timeout: int = 1,
+    out_dir: str | None = None,
+    vivado: str = "vivado",
+) -> list:
+    """
+    Arms the `ila`-th ila core of the design built in `build_dir`
+    (the device must already be programmed, see `make program`).
+
+    `trigger` maps probe names to values, the core triggers when all of them
+    match (no trigger condition triggers immediately). The core is armed
+    `captures` times, each capture waits at most `timeout` minutes.
+    `trigger_position` is the index of the trigger sample in each capture.
+
+    Returns the captures loaded with `load_csv`. The CSV files are
+    kept in `out_dir` (defaults to output/ila/<ila> in `build_dir`).
+    """
+
+    layout = IlaLayout.load(
+        os.path.join(build_dir, "generated", "ila_probes.json"), ila
+    )
+
+    if out_dir is None:
+        out_dir = os.path.join("output", "ila", str(ila))
+
+    args = [str(ila), out_dir, str(captures), str(trigger_position), str(timeout)]
+
+    for port, compare in layout.compare_values(trigger or {}).items():
+        args += [str(port), compare]
+
+    # stale files of previous runs would be loaded as captures
+    for old in glob.glob(os.path.join(build_dir, out_dir, "capture_*.csv")):
+        os.remove(old)
+
+    subprocess.run(
+        [
+            vivado,
+            "-mode",
+            "batch",
+            "-source",
+            "generated/capture_ila.tcl",
+            "-journal",
+            "output/build_log/vivado_capture.jou",
+            "-log",
+            "output/build_log/vivado_capture.log",
+            "-tclargs",
+            *args,
+        ],
+        cwd=build_dir,
+        check=True,
+    )
+
+    return [
+        load_csv(path, layout)
+        for path in sorted(glob.glob(os.path.join(build_dir, out_dir, "capture_*.csv")))
+    ]
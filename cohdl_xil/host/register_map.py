@@ -0,0 +1,168 @@
+"""
+Host accessor for register banks generated from a
+`cohdl_xil.ip.register_map.RegisterMap`.
+
+Registers and fields are addressed by name ('reg' or 'reg.field'),
+accesses are sent over a `DebugBridgeClient`:
+
+    regs = RegisterMapClient(client, "build/counter_regs.json")
+
+    regs.write("ctrl.enable", 1)
+    print(regs.read("count"))
+    print(regs.dump())
+"""
+
+from __future__ import annotations
+
+import os
+
+from cohdl_xil.host.axi_debug_bridge import DebugBridgeClient
+from cohdl_xil.ip.register_map import RegisterMap, Register, Access
+
+
+class RegisterMapClient:
+    """
+    Named access to the registers of `regmap` (a `RegisterMap`
+    or the path of a file created by `RegisterMap.to_json`)
+    located at `base` in the address space of the debug bridge.
+
+    `read_many`, `write_many` and `dump` need a single round trip,
+    consecutive registers are read with auto-increment bursts.
+    """
+
+    def __init__(
+        self,
+        client: DebugBridgeClient,
+        regmap: RegisterMap | str | os.PathLike,
+        base: int = 0,
+    ):
+        if not isinstance(regmap, RegisterMap):
+            with open(regmap) as file:
+                regmap = RegisterMap.from_json(file.read())
+
+        self.client = client
+        self.regmap = regmap
+        self.base = base
+
+    def _preserved_bits(self, reg: Register):
+        # bits written back unchanged by read-modify-write accesses,
+        # only RW fields can be read back, writing W1C or PULSE bits
+        # would trigger their side effects
+        return sum(f.mask() for f in reg.fields if f.access is Access.RW)
+
+    def read(self, path: str) -> int:
+        """
+        Returns the value of a register or field.
+        """
+
+        return self.read_many([path])[path]
+
+    def write(self, path: str, value: int):
+        """
+        Writes a register or field. Field writes read the register first
+        when it contains other RW fields to keep their values.
+        """
+
+        self.write_many({path: value})
+
+    def read_many(self, paths: list[str]) -> dict[str, int]:
+        """
+        Reads all given registers/fields in a single round trip.
+        """
+
+        lookups = {path: self.regmap.lookup(path) for path in paths}
+        words = self._read_registers({reg for reg, _ in lookups.values()})
+
+        return {
+            path: words[reg.name] if f is None else f.extract(words[reg.name])
+            for path, (reg, f) in lookups.items()
+        }
+
+    def write_many(self, values: dict[str, int]):
+        """
+        Writes all given registers/fields. Field writes to registers
+        containing other RW fields need one additional round trip
+        (for all registers together) to read the current values.
+
+        WO fields read as zero and cannot be preserved, field writes to
+        a register are rejected unless all of its other WO fields are
+        written in the same call.
+        """
+
+        lookups = {path: self.regmap.lookup(path) for path in values}
+
+        # bits of each register written by this call
+        written: dict[str, int] = {}
+
+        for reg, f in lookups.values():
+            mask = 0xFFFFFFFF if f is None else f.mask()
+            written[reg.name] = written.get(reg.name, 0) | mask
+
+        for reg, f in lookups.values():
+            lost = [
+                other.name
+                for other in reg.fields
+                if other.access is Access.WO and other.mask() & ~written[reg.name]
+            ]
+            assert (
+                not lost
+            ), f"writing '{reg.name}' field by field would clear the write only fields {lost}, write them in the same call or write the whole register"
+
+        rmw = {
+            reg
+            for reg, _ in lookups.values()
+            if self._preserved_bits(reg) & ~written[reg.name]
+        }
+        words = {
+            name: word & self._preserved_bits(self.regmap.register(name))
+            for name, word in self._read_registers(rmw).items()
+        }
+
+        for path, (reg, f) in lookups.items():
+            if f is None:
+                words[reg.name] = values[path]
+            else:
+                words[reg.name] = f.insert(words.get(reg.name, 0), values[path])
+
+        with self.client.batch():
+            for name, word in words.items():
+                self.client.write(self.base + self.regmap.register(name).offset, word)
+
+    def dump(self) -> dict[str, dict[str, int]]:
+        """
+        Returns the decoded fields of all registers.
+        """
+
+        words = self._read_registers(set(self.regmap.registers))
+        return {reg.name: reg.decode(words[reg.name]) for reg in self.regmap.registers}
+
+    def _read_registers(self, regs: set[Register]) -> dict[str, int]:
+        # reads runs of consecutive registers with a single burst each
+        regs = sorted(regs, key=lambda reg: reg.offset)
+        runs: list[list[Register]] = []
+
+        for reg in regs:
+            if runs and runs[-1][-1].offset + 4 == reg.offset:
+                runs[-1].append(reg)
+            else:
+                runs.append([reg])
+
+        with self.client.batch():
+            accesses = [
+                (run, self.client.read(self.base + run[0].offset, len(run)))
+                for run in runs
+            ]
+
+        result = {}
+
+        for run, access in accesses:
+            values = (
+                access.values
+                if not isinstance(access, list)
+                else [value for part in access for value in part.values]
+            )
+
+            for reg, value in zip(run, values):
+                result[reg.name] = value
+
+        return result
@@ -0,0 +1,319 @@
+from __future__ import annotations
+
+import cohdl
+from cohdl import Port, Bit, BitVector, Unsigned, Signal, Null, Full
+from cohdl import std
+from cohdl.std.axi.axi4_light import Channel
+
+# maximum number of beats in an AXI4 INCR burst
+MAX_BURST_LENGTH = 256
+
+
+class Axi4:
+    """
+    AXI4 (full) interface with burst support.
+
+    Compared to `cohdl.std.axi.axi4_light.Axi4Light` the address channels
+    carry the burst parameters (id, len, size, burst, lock, cache, qos)
+    and the data channels the last flag and transaction id.
+    Only INCR bursts with full width beats are generated by the
+    methods of this class.
+    """
+
+    class BurstConstants:
+        FIXED = "00"
+        INCR = "01"
+        WRAP = "10"
+
+    class _AddrChannel(Channel):
+        # address channel signals are available with and without
+        # the aw/ar prefix (for example `awaddr` and `addr`)
+        _fields = ["id", "addr", "len", "size", "burst", "lock", "cache", "prot", "qos"]
+
+        def __init__(self, prefix, valid, ready, **kwargs):
+            super().__init__(valid, ready, **kwargs)
+
+            for field in self._fields:
+                setattr(self, field, kwargs[f"{prefix}{field}"])
+                setattr(self, f"{prefix}{field}", kwargs[f"{prefix}{field}"])
+
+    class WrAddr(_AddrChannel):
+        def __init__(self, valid, ready, **kwargs):
+            super().__init__("aw", valid, ready, **kwargs)
+
+    class WrData(Channel):
+        def __init__(self, valid, ready, wdata, wstrb, wlast):
+            super().__init__(valid, ready, wdata=wdata, wstrb=wstrb, wlast=wlast)
+
+            self.wdata = wdata
+            self.wstrb = wstrb
+            self.wlast = wlast
+
+    class WrResp(Channel):
+        def __init__(self, valid, ready, bid, bresp):
+            super().__init__(valid, ready, bid=bid, bresp=bresp)
+
+            self.bid = bid
+            self.bresp = bresp
+
+    class RdAddr(_AddrChannel):
+        def __init__(self, valid, ready, **kwargs):
+            super().__init__("ar", valid, ready, **kwargs)
+
+    class RdData(Channel):
+        def __init__(self, valid, ready, rid, rdata, rresp, rlast):
+            super().__init__(
+                valid, ready, rid=rid, rdata=rdata, rresp=rresp, rlast=rlast
+            )
+
+            self.rid = rid
+            self.rdata = rdata
+            self.rresp = rresp
+            self.rlast = rlast
+
+    @staticmethod
+    def _addr_signals(dir: str, addr_width: int, id_width: int, prefix: str):
+        S = Signal
+        p = f"{prefix}{dir}"
+
+        return dict(
+            valid=S[Bit](Null, name=f"{p}valid"),
+            ready=S[Bit](Null, name=f"{p}ready"),
+            **{
+                f"{dir}id": S[BitVector[id_width]](Null, name=f"{p}id"),
+                f"{dir}addr": S[BitVector[addr_width]](Null, name=f"{p}addr"),
+                f"{dir}len": S[BitVector[8]](Null, name=f"{p}len"),
+                f"{dir}size": S[BitVector[3]](Null, name=f"{p}size"),
+                f"{dir}burst": S[BitVector[2]](Null, name=f"{p}burst"),
+                f"{dir}lock": S[Bit](Null, name=f"{p}lock"),
+                f"{dir}cache": S[BitVector[4]](Null, name=f"{p}cache"),
+                f"{dir}prot": S[BitVector[3]](Null, name=f"{p}prot"),
+                f"{dir}qos": S[BitVector[4]](Null, name=f"{p}qos"),
+            },
+        )
+
+    @staticmethod
+    def signal(
+        clk: std.Clock,
+        reset: std.Reset,
+        addr_width: int,
+        data_width: int,
+        id_width: int = 4,
+        prefix="",
+    ):
+        S = Signal
+
+        assert data_width % 8 == 0, "data_width must be a multiple of 8"
+        strb_width = data_width // 8
+
+        wraddr = Axi4.WrAddr(**Axi4._addr_signals("aw", addr_width, id_width, prefix))
+        rdaddr = Axi4.RdAddr(**Axi4._addr_signals("ar", addr_width, id_width, prefix))
+
+        wrdata = Axi4.WrData(
+            S[Bit](Null, name=f"{prefix}wvalid"),
+            S[Bit](Null, name=f"{prefix}wready"),
+            S[BitVector[data_width]](Null, name=f"{prefix}wdata"),
+            S[BitVector[strb_width]](Null, name=f"{prefix}wstrb"),
+            S[Bit](Null, name=f"{prefix}wlast"),
+        )
+
+        wrresp = Axi4.WrResp(
+            S[Bit](Null, name=f"{prefix}bvalid"),
+            S[Bit](Null, name=f"{prefix}bready"),
+            S[BitVector[id_width]](Null, name=f"{prefix}bid"),
+            S[BitVector[2]](Null, name=f"{prefix}bresp"),
+        )
+
+        rddata = Axi4.RdData(
+            S[Bit](Null, name=f"{prefix}rvalid"),
+            S[Bit](Null, name=f"{prefix}rready"),
+            S[BitVector[id_width]](Null, name=f"{prefix}rid"),
+            S[BitVector[data_width]](Null, name=f"{prefix}rdata"),
+            S[BitVector[2]](Null, name=f"{prefix}rresp"),
+            S[Bit](Null, name=f"{prefix}rlast"),
+        )
+
+        return Axi4(clk, reset, wraddr, wrdata, wrresp, rdaddr, rddata)
+
+    def __init__(
+        self,
+        clk: std.Clock,
+        reset: std.Reset,
+        wraddr: Axi4.WrAddr,
+        wrdata: Axi4.WrData,
+        wrresp: Axi4.WrResp,
+        rdaddr: Axi4.RdAddr,
+        rddata: Axi4.RdData,
+    ):
+        self.clk = clk
+        self.reset = reset
+        self.wraddr = wraddr
+        self.wrdata = wrdata
+        self.wrresp = wrresp
+        self.rdaddr = rdaddr
+        self.rddata = rddata
+
+        self._addr_width = rdaddr.araddr.width
+        self._data_width = rddata.rdata.width
+        self._id_width = rddata.rid.width
+
+        self._full_size = std.as_bitvector(
+            f"{std.int_log_2(self._data_width // 8):03b}"
+        )
+        self._incr = std.as_bitvector(Axi4.BurstConstants.INCR)
+        # modifiable, bufferable
+        self._cache = std.as_bitvector("0011")
+
+    def addr_width(self):
+        return self._addr_width
+
+    def data_width(self):
+        return self._data_width
+
+    def id_width(self):
+        return self._id_width
+
+    def _size(self):
+        # AxSIZE for full width beats
+        return self._full_size
+
+    @staticmethod
+    def _check_length(length):
+        if isinstance(length, int):
+            assert (
+                1 <= length <= MAX_BURST_LENGTH
+            ), f"burst length must be in range [1, {MAX_BURST_LENGTH}]"
+
+    def set_addr_fields(self, channel: Axi4._AddrChannel, addr, length, trans_id=Null):
+        """
+        Assigns all signals of an address channel except valid
+        for an INCR burst of `length` full width beats.
+        Can be used in sequential and concurrent contexts.
+        """
+
+        channel.id <<= trans_id
+        channel.addr.unsigned <<= addr
+        channel.len.unsigned <<= length - 1
+        channel.size <<= self._size()
+        channel.burst <<= self._incr
+        channel.lock <<= False
+        channel.cache <<= self._cache
+        channel.prot <<= Null
+        channel.qos <<= Null
+
+    async def _send_addr(self, channel: Axi4._AddrChannel, addr, length, trans_id):
+        self.set_addr_fields(channel, addr, length, trans_id)
+
+        channel.valid <<= True
+        await channel.ready
+        channel.valid <<= False
+
+    async def write_burst(self, addr, length, source, trans_id=Null):
+        """
+        Writes an INCR burst of `length` (1 to 256) beats starting at `addr`.
+        `source` is called for each beat and returns the tuple (data, strb).
+        One beat is transferred per clock cycle while the slave is ready.
+        Bursts must not cross a 4KB address boundary.
+        Returns the write response.
+        """
+
+        self._check_length(length)
+        wrdata = self.wrdata
+
+        await self._send_addr(self.wraddr, addr, length, trans_id)
+
+        remaining = cohdl.Variable[Unsigned[9]](length)
+
+        data, strb = source()
+        wrdata.wdata <<= data
+        wrdata.wstrb <<= strb
+        wrdata.wlast <<= remaining == 1
+        wrdata.valid <<= True
+
+        # one iteration per clock cycle
+        while remaining:
+            if wrdata.valid and wrdata.ready:
+                remaining @= remaining - 1
+
+                if remaining:
+                    next_data, next_strb = source()
+                    wrdata.wdata <<= next_data
+                    wrdata.wstrb <<= next_strb
+                    wrdata.wlast <<= remaining == 1
+                else:
+                    wrdata.valid <<= False
+                    wrdata.wlast <<= False
+
+        self.wrresp.ready <<= True
+        await self.wrresp.valid
+        self.wrresp.ready <<= False
+
+        return self.wrresp.bresp
+
+    async def read_burst(self, addr, length, sink, trans_id=Null):
+        """
+        Reads an INCR burst of `length` (1 to 256) beats starting at `addr`.
+        `sink` is called with the data and response of each received beat
+        (one beat per clock cycle while the slave provides data).
+        """
+
+        self._check_length(length)
+        rddata = self.rddata
+
+        await self._send_addr(self.rdaddr, addr, length, trans_id)
+
+        rddata.ready <<= True
+        done = cohdl.Variable[Bit](False)
+
+        # one iteration per clock cycle
+        while not done:
+            if rddata.valid and rddata.ready:
+                sink(rddata.rdata, rddata.rresp)
+
+                if rddata.rlast:
+                    done @= True
+                    rddata.ready <<= False
+
+    async def write_word(self, addr, data, strb=Full, trans_id=Null):
+        return await self.write_burst(addr, 1, lambda: (data, strb), trans_id)
+
+    async def read_word(self, addr, trans_id=Null):
+        """
+        Returns the tuple (data, resp) of a single beat read.
+        """
+
+        await self._send_addr(self.rdaddr, addr, 1, trans_id)
+
+        self.rddata.ready <<= True
+        await self.rddata.valid
+        self.rddata.ready <<= False
+
+        return self.rddata.rdata, self.rddata.rresp
+
+    def _ports(self, prefix: str, master: bool):
+        # port definitions and connections for IP blocks,
+        # `master` defines the direction from the IP point of view
+        out = Port.output if master else Port.input
+        inp = Port.input if master else Port.output
+
+        def port(direction, signal):
+            if std.instance_check(signal, Bit):
+                return (direction(Bit), signal)
+            return (direction(BitVector[signal.width]), signal)
+
+        result = {}
+
+        for ch, channel, forward, backward in [
+            ("aw", self.wraddr, out, inp),
+            ("w", self.wrdata, out, inp),
+            ("b", self.wrresp, inp, out),
+            ("ar", self.rdaddr, out, inp),
+            ("r", self.rddata, inp, out),
+        ]:
+            result[f"{prefix}_{ch}valid"] = port(forward, channel.valid)
+            result[f"{prefix}_{ch}ready"] = port(backward, channel.ready)
+
+            for name, signal in channel._signals.items():
+                result[f"{prefix}_{name}"] = port(forward, signal)
+
+        return result
@@ -0,0 +1,176 @@
+from __future__ import annotations
+
+from cohdl import BitVector, Unsigned, Signal, Null
+from cohdl import std
+from cohdl.std.axi.axi4_light import Axi4Light
+
+from cohdl_xil.ip.axi_stream import AxiStream
+
+# command format (see cohdl_xil.host.axi_debug_bridge for the host side),
+# all multi byte values are sent least significant byte first:
+#
+#   WRITE: cmd, addr (4 bytes), count - 1, count data words (4 bytes each)
+#       -> cmd, resp
+#   READ:  cmd, addr (4 bytes), count - 1
+#       -> cmd, count data words (4 bytes each), resp
+#   ECHO:  cmd, token
+#       -> cmd, token
+#
+# Consecutive words of WRITE and READ commands access consecutive
+# addresses unless the FIXED flag is set in the command byte.
+# `resp` is the bitwise or of the AXI responses of all words.
+# Unknown commands are answered with ERROR and the command byte.
+
+CMD_ECHO = 0x00
+CMD_WRITE = 0x01
+CMD_READ = 0x02
+CMD_ERROR = 0xEE
+
+FLAG_FIXED = 0x10
+
+# maximum number of words per WRITE/READ command
+MAX_COUNT = 256
+
+
+def _byte(value: int):
+    return std.as_bitvector(f"{value:08b}")
+
+
+class AxiDebugBridge:
+    """
+    AXI4-Lite master controlled by commands received over a byte stream
+    (for example the streams of `cohdl_xil.ip.uart.Uart`).
+    Compatible with `cohdl_xil.host.axi_debug_bridge.DebugBridgeClient`.
+
+    Each WRITE or READ command transfers up to 256 words to incrementing
+    (or fixed) addresses. Commands are processed in order without
+    waiting for the host, so many accesses can be queued in a single
+    round trip. The bridge performs one AXI access at a time.
+
+    `axi` is the bus driven by the bridge, when it is None a new
+    interface with `addr_width` address bits is created.
+    The bus is clocked by `ctx`.
+    """
+
+    def __init__(
+        self,
+        ctx: std.SequentialContext,
+        inp: AxiStream,
+        out: AxiStream,
+        axi: Axi4Light | None = None,
+        *,
+        addr_width: int = 32,
+    ):
+        assert inp.data_width() == 8 and out.data_width() == 8, "byte streams required"
+
+        with std.prefix("debug_bridge"):
+            n = std.name
+
+            if axi is None:
+                axi = Axi4Light.signal(
+                    ctx.clk(), ctx.reset(), addr_width, prefix=n("axi_")
+                )
+
+            assert axi.data_width() == 32, "only 32 bit data buses are supported"
+            assert axi.addr_width() <= 32, "address width must not exceed 32 bits"
+
+            self.ctx = ctx
+            self.inp = inp
+            self.out = out
+            self.axi = axi
+
+            # number of processed commands
+            self.commands = Signal[Unsigned[32]](0, name=n("commands"))
+
+            self._impl()
+
+    def _impl(self):
+        inp = self.inp
+        out = self.out
+        axi = self.axi
+        addr_width = axi.addr_width()
+
+        cmd = Signal[BitVector[8]](Null, name="debug_bridge_cmd")
+        addr = Signal[Unsigned[32]](0, name="debug_bridge_addr")
+        count = Signal[Unsigned[8]](0, name="debug_bridge_count")
+        word = Signal[BitVector[32]](Null, name="debug_bridge_word")
+        resp = Signal[BitVector[2]](Null, name="debug_bridge_resp")
+
+        cmd_echo = _byte(CMD_ECHO)
+        cmd_error = _byte(CMD_ERROR)
+        op_write = std.as_bitvector(f"{CMD_WRITE:04b}")
+        op_read = std.as_bitvector(f"{CMD_READ:04b}")
+        fixed_bit = std.int_log_2(FLAG_FIXED)
+
+        async def receive():
+            data, _last, _keep = await inp.receive()
+            return data
+
+        async def receive_word():
+            # bytes are shifted in at the msb of `word`, the first byte
+            # ends up in the least significant position of the result
+            for _ in range(3):
+                word.next = (await receive()) @ word.msb(rest=8)
+
+            return (await receive()) @ word.msb(rest=8)
+
+        async def send_word(data):
+            # the first byte is sent directly, the remaining ones are
+            # shifted out of `word`, each send samples `word` in the
+            # same cycle in which it is shifted to the next byte
+            word.next = std.zeros(8) @ data.msb(rest=8)
+            await out.send(data.lsb(8))
+
+            for _ in range(3):
+                word.next = std.zeros(8) @ word.msb(rest=8)
+                await out.send(word.lsb(8))
+
+        def bus_addr():
+            return addr.lsb(addr_width).unsigned
+
+        def next_addr():
+            if not cmd[fixed_bit]:
+                addr.next = addr + 4
+
+        @self.ctx
+        async def proc_bridge():
+            command = await receive()
+            cmd.next = command
+
+            if command == cmd_echo:
+                await out.send(command)
+                await out.send(await receive())
+            elif command.lsb(4) == op_write or command.lsb(4) == op_read:
+                addr.next = (await receive_word()).unsigned
+                count.next = (await receive()).unsigned
+                resp.next = Null
+
+                await out.send(cmd)
+
+                # each command transfers one word more than the value of count
+                if cmd.lsb(4) == op_write:
+                    while True:
+                        bresp = await axi.write_word(bus_addr(), await receive_word())
+                        resp.next = resp | bresp
+                        next_addr()
+                        count.next = count - 1
+
+                        if count == 0:
+                            await out.send(std.zeros(6) @ (resp | bresp))
+                            break
+                else:
+                    while True:
+                        rdata, rresp = await axi.read_word(bus_addr())
+                        resp.next = resp | rresp
+                        next_addr()
+                        await send_word(rdata)
+                        count.next = count - 1
+
+                        if count == 0:
+                            await out.send(std.zeros(6) @ resp)
+                            break
+            else:
+                await out.send(cmd_error)
+                await out.send(command)
+
+            self.commands.next = self.commands + 1
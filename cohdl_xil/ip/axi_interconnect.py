@@ -0,0 +1,343 @@
+from __future__ import annotations
+
+import cohdl
+from cohdl import Bit, BitVector, Unsigned, Signal, Null
+from cohdl import std
+from cohdl.std.axi.axi4_light import Axi4Light
+
+# width of the slave index, the index after the last
+# slave marks requests to unmapped addresses
+_SEL_WIDTH = 8
+
+
+class AxiInterconnect:
+    """
+    AXI4-Lite interconnect connecting any number of masters to
+    any number of slaves (added with `reserve` or `connect`).
+
+    Read and write transactions are handled independently, one of each
+    at a time. Masters are granted access in round robin order,
+    the granted request is buffered and forwarded to the slave whose
+    address range contains the request. Requests outside of all ranges
+    are answered with DECERR.
+
+    All outputs of the interconnect are registered, so no combinational
+    path crosses it. When `register_slices` is set, the address decode
+    is performed on the buffered address in an additional pipeline stage
+    (one more cycle per transaction) instead of directly on the address
+    provided by the master. The protection bits are not forwarded.
+
+    All interfaces are clocked by `ctx` and must use 32 bit data.
+    """
+
+    class _Slave:
+        def __init__(self, offset: int, axi: Axi4Light):
+            size = 2 ** axi.addr_width()
+            assert offset % size == 0, "offset must be a multiple of the slave size"
+
+            self.offset = offset
+            self.size = size
+            self.axi = axi
+            # the address bits above the slave range select the slave
+            self._low_bits = axi.addr_width()
+            self._prefix = offset >> axi.addr_width()
+
+        def overlaps(self, offset: int, size: int):
+            return offset < self.offset + self.size and self.offset < offset + size
+
+        def contains_addr(self, addr):
+            return addr.msb(rest=self._low_bits).unsigned == self._prefix
+
+    def __init__(
+        self,
+        ctx: std.SequentialContext,
+        masters: Axi4Light | list[Axi4Light],
+        *,
+        register_slices: bool = True,
+    ):
+        if isinstance(masters, Axi4Light):
+            masters = [masters]
+
+        assert len(masters) != 0, "at least one master required"
+
+        addr_width = masters[0].addr_width()
+
+        for master in masters:
+            assert master.addr_width() == addr_width, "address widths of masters differ"
+            assert master.data_width() == 32, "only 32 bit data buses are supported"
+
+        self.ctx = ctx
+        self.masters = masters
+        self.register_slices = register_slices
+
+        self._addr_width = addr_width
+        self._slaves: list[AxiInterconnect._Slave] = []
+
+        # the transaction logic is traced at the end of the architecture,
+        # after all slaves were added
+        with std.prefix("axi_interconnect"):
+            self._impl_read()
+            self._impl_write()
+
+    def addr_width(self):
+        return self._addr_width
+
+    def reserve(self, offset: int, size: int, prefix="") -> Axi4Light:
+        """
+        Creates and connects a new slave interface for the
+        address range [offset, offset+size).
+        """
+
+        assert size.bit_count() == 1 and size >= 4, "size must be a power of 2"
+        axi = Axi4Light.signal(
+            self.ctx.clk(), self.ctx.reset(), std.int_log_2(size), prefix=prefix
+        )
+        self.connect(axi, offset)
+        return axi
+
+    def connect(self, axi: Axi4Light, offset: int, size: int | None = None):
+        """
+        Connects an existing slave interface, its size is defined
+        by its address width.
+        """
+
+        assert axi.data_width() == 32, "only 32 bit data buses are supported"
+        assert len(self._slaves) < 2**_SEL_WIDTH - 1, "too many slaves"
+        assert size is None or size == 2 ** axi.addr_width(), "size mismatch"
+        assert offset + 2 ** axi.addr_width() <= 2**self._addr_width, "out of range"
+
+        for slv in self._slaves:
+            assert not slv.overlaps(
+                offset, 2 ** axi.addr_width()
+            ), f"address range at 0x{offset:x} overlaps an existing slave"
+
+        self._slaves.append(AxiInterconnect._Slave(offset, axi))
+
+    def _round_robin(self, requests: list, last: Signal):
+        # index of the first requesting master after `last`,
+        # lower priority candidates are assigned first
+        count = len(requests)
+        grant = cohdl.Variable[Unsigned[last.width]](0)
+
+        for prev in range(count):
+            if last == prev:
+                for step in range(count, 0, -1):
+                    idx = (prev + step) % count
+
+                    if requests[idx]:
+                        grant @= idx
+
+        return grant
+
+    def _decode(self, addr, target: Signal):
+        # selects the slave containing `addr`, the index
+        # behind the last slave marks unmapped addresses
+        result = cohdl.Variable[Unsigned[target.width]](len(self._slaves))
+
+        for nr, slv in enumerate(self._slaves):
+            if slv.contains_addr(addr):
+                result @= nr
+
+        target.next = result
+
+    def _select(self, sel: Signal, values: list, target: Signal):
+        # multiplexer for the signals of the selected slave/master
+        target.next = std.select(
+            sel, {nr: value for nr, value in enumerate(values)}, default=Null
+        )
+
+    def _pending(self, requests: list):
+        result = cohdl.Variable[Bit](False)
+
+        for request in requests:
+            result @= result | request
+
+        return result
+
+    def _impl_read(self):
+        masters = self.masters
+        n = std.name
+        grant_width = max(1, std.ceil_log_2(len(masters)))
+
+        last = Signal[Unsigned[grant_width]](0, name=n("rd_last"))
+        sel = Signal[Unsigned[_SEL_WIDTH]](0, name=n("rd_sel"))
+        addr = Signal[BitVector[self._addr_width]](Null, name=n("rd_addr"))
+        data = Signal[BitVector[32]](Null, name=n("rd_data"))
+        resp = Signal[BitVector[2]](Null, name=n("rd_resp"))
+
+        # signals of the selected slave and master
+        slave_arready = Signal[Bit](False, name=n("rd_slave_arready"))
+        slave_rvalid = Signal[Bit](False, name=n("rd_slave_rvalid"))
+        slave_rdata = Signal[BitVector[32]](Null, name=n("rd_slave_rdata"))
+        slave_rresp = Signal[BitVector[2]](Null, name=n("rd_slave_rresp"))
+        master_rready = Signal[Bit](False, name=n("rd_master_rready"))
+
+        decerr = std.as_bitvector(Axi4Light.RespConstants.DECERR)
+
+        @std.concurrent
+        def proc_read_mux():
+            slaves = [slv.axi for slv in self._slaves]
+
+            self._select(sel, [slv.rdaddr.ready for slv in slaves], slave_arready)
+            self._select(sel, [slv.rddata.valid for slv in slaves], slave_rvalid)
+            self._select(sel, [slv.rddata.rdata for slv in slaves], slave_rdata)
+            self._select(sel, [slv.rddata.rresp for slv in slaves], slave_rresp)
+            self._select(last, [m.rddata.ready for m in masters], master_rready)
+
+        @self.ctx
+        async def proc_read():
+            requests = [master.rdaddr.valid for master in masters]
+
+            if self._pending(requests):
+                grant = self._round_robin(requests, last)
+                last.next = grant
+
+                # the address is stable while arvalid is set,
+                # the handshake completes in the next cycle
+                for nr, master in enumerate(masters):
+                    if grant == nr:
+                        master.rdaddr.ready ^= True
+                        addr.next = master.rdaddr.araddr
+
+                        if not self.register_slices:
+                            self._decode(master.rdaddr.araddr, sel)
+
+                await std.tick()
+
+                if self.register_slices:
+                    self._decode(addr, sel)
+                    await std.tick()
+
+                if sel == len(self._slaves):
+                    data.next = Null
+                    resp.next = decerr
+                else:
+                    for nr, slv in enumerate(self._slaves):
+                        slv.axi.rdaddr.araddr <<= addr.lsb(slv.axi.addr_width())
+                        slv.axi.rdaddr.valid <<= sel == nr
+                        slv.axi.rddata.ready <<= sel == nr
+
+                    await slave_arready
+
+                    for slv in self._slaves:
+                        slv.axi.rdaddr.valid <<= False
+
+                    await slave_rvalid
+
+                    for slv in self._slaves:
+                        slv.axi.rddata.ready <<= False
+
+                    data.next = slave_rdata
+                    resp.next = slave_rresp
+
+                await std.tick()
+
+                for nr, master in enumerate(masters):
+                    master.rddata.rdata <<= data
+                    master.rddata.rresp <<= resp
+                    master.rddata.valid <<= last == nr
+
+                await master_rready
+
+                for master in masters:
+                    master.rddata.valid <<= False
+
+    def _impl_write(self):
+        masters = self.masters
+        n = std.name
+        grant_width = max(1, std.ceil_log_2(len(masters)))
+
+        last = Signal[Unsigned[grant_width]](0, name=n("wr_last"))
+        sel = Signal[Unsigned[_SEL_WIDTH]](0, name=n("wr_sel"))
+        addr = Signal[BitVector[self._addr_width]](Null, name=n("wr_addr"))
+        data = Signal[BitVector[32]](Null, name=n("wr_data"))
+        strb = Signal[BitVector[4]](Null, name=n("wr_strb"))
+        resp = Signal[BitVector[2]](Null, name=n("wr_resp"))
+
+        slave_awready = Signal[Bit](False, name=n("wr_slave_awready"))
+        slave_wready = Signal[Bit](False, name=n("wr_slave_wready"))
+        slave_bvalid = Signal[Bit](False, name=n("wr_slave_bvalid"))
+        slave_bresp = Signal[BitVector[2]](Null, name=n("wr_slave_bresp"))
+        master_bready = Signal[Bit](False, name=n("wr_master_bready"))
+
+        decerr = std.as_bitvector(Axi4Light.RespConstants.DECERR)
+
+        @std.concurrent
+        def proc_write_mux():
+            slaves = [slv.axi for slv in self._slaves]
+
+            self._select(sel, [slv.wraddr.ready for slv in slaves], slave_awready)
+            self._select(sel, [slv.wrdata.ready for slv in slaves], slave_wready)
+            self._select(sel, [slv.wrresp.valid for slv in slaves], slave_bvalid)
+            self._select(sel, [slv.wrresp.bresp for slv in slaves], slave_bresp)
+            self._select(last, [m.wrresp.ready for m in masters], master_bready)
+
+        @self.ctx
+        async def proc_write():
+            # both address and data must be valid before a master is granted
+            requests = [master.wraddr.valid & master.wrdata.valid for master in masters]
+
+            if self._pending(requests):
+                grant = self._round_robin(requests, last)
+                last.next = grant
+
+                for nr, master in enumerate(masters):
+                    if grant == nr:
+                        master.wraddr.ready ^= True
+                        master.wrdata.ready ^= True
+                        addr.next = master.wraddr.awaddr
+                        data.next = master.wrdata.wdata
+                        strb.next = master.wrdata.wstrb
+
+                        if not self.register_slices:
+                            self._decode(master.wraddr.awaddr, sel)
+
+                await std.tick()
+
+                if self.register_slices:
+                    self._decode(addr, sel)
+                    await std.tick()
+
+                if sel == len(self._slaves):
+                    resp.next = decerr
+                else:
+                    for nr, slv in enumerate(self._slaves):
+                        slv.axi.wraddr.awaddr <<= addr.lsb(slv.axi.addr_width())
+                        slv.axi.wrdata.wdata <<= data
+                        slv.axi.wrdata.wstrb <<= strb
+                        slv.axi.wraddr.valid <<= sel == nr
+                        slv.axi.wrdata.valid <<= sel == nr
+                        slv.axi.wrresp.ready <<= sel == nr
+
+                    addr_done = cohdl.Variable[Bit](False)
+                    data_done = cohdl.Variable[Bit](False)
+
+                    # address and data may be accepted in different cycles
+                    while True:
+                        addr_done @= addr_done | slave_awready
+                        data_done @= data_done | slave_wready
+
+                        for nr, slv in enumerate(self._slaves):
+                            slv.axi.wraddr.valid <<= sel == nr and not addr_done
+                            slv.axi.wrdata.valid <<= sel == nr and not data_done
+
+                        if addr_done & data_done:
+                            break
+
+                    await slave_bvalid
+
+                    for slv in self._slaves:
+                        slv.axi.wrresp.ready <<= False
+
+                    resp.next = slave_bresp
+
+                await std.tick()
+
+                for nr, master in enumerate(masters):
+                    master.wrresp.bresp <<= resp
+                    master.wrresp.valid <<= last == nr
+
+                await master_bready
+
+                for master in masters:
+                    master.wrresp.valid <<= False
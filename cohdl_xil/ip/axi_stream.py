@@ -0,0 +1,414 @@
+from __future__ import annotations
+
+from cohdl import Port, Bit, BitVector, Signal, Null, Full
+from cohdl import std
+
+from cohdl_xil import ip_block
+from cohdl_xil.ip.fifo import CommonClkFifo, IndependentClkFifo, Backend, Implementation
+
+
+class AxiStream:
+    """
+    AXI4-Stream interface consisting of tvalid/tready/tdata
+    and the optional tlast and tkeep signals.
+
+    All wrappers in this module take an input stream and return a new
+    output stream so they can be chained:
+
+        out = axis_clock_converter(axis_dwidth_converter(inp, 128), clk, reset)
+    """
+
+    @staticmethod
+    def signal(
+        clk: std.Clock,
+        reset: std.Reset,
+        data_width: int,
+        *,
+        has_last=True,
+        has_keep=True,
+        prefix="",
+    ):
+        assert (
+            not has_keep or data_width % 8 == 0
+        ), "tkeep requires a byte aligned tdata"
+
+        return AxiStream(
+            clk,
+            reset,
+            valid=Signal[Bit](False, name=f"{prefix}tvalid"),
+            ready=Signal[Bit](False, name=f"{prefix}tready"),
+            data=Signal[BitVector[data_width]](Null, name=f"{prefix}tdata"),
+            last=Signal[Bit](False, name=f"{prefix}tlast") if has_last else None,
+            keep=(
+                Signal[BitVector[data_width // 8]](Full, name=f"{prefix}tkeep")
+                if has_keep
+                else None
+            ),
+        )
+
+    def __init__(
+        self,
+        clk: std.Clock,
+        reset: std.Reset,
+        valid: Signal[Bit],
+        ready: Signal[Bit],
+        data: Signal[BitVector],
+        last: Signal[Bit] | None = None,
+        keep: Signal[BitVector] | None = None,
+    ):
+        self.clk = clk
+        self.reset = reset
+        self.valid = valid
+        self.ready = ready
+        self.data = data
+        self.last = last
+        self.keep = keep
+
+    def data_width(self):
+        return self.data.width
+
+    def has_last(self):
+        return self.last is not None
+
+    def has_keep(self):
+        return self.keep is not None
+
+    def similar(self, *, clk=None, reset=None, data_width=None, prefix=""):
+        """
+        Creates a new stream with the same optional signals as self.
+        """
+
+        return AxiStream.signal(
+            self.clk if clk is None else clk,
+            self.reset if reset is None else reset,
+            self.data_width() if data_width is None else data_width,
+            has_last=self.has_last(),
+            has_keep=self.has_keep(),
+            prefix=prefix,
+        )
+
+    def connect(self, target: AxiStream):
+        """
+        Forwards all transfers of this stream to `target`.
+        """
+
+        assert self.data_width() == target.data_width()
+        assert self.has_last() == target.has_last()
+        assert self.has_keep() == target.has_keep()
+
+        @std.concurrent
+        def proc_connect():
+            target.valid <<= self.valid
+            target.data <<= self.data
+            self.ready <<= target.ready
+
+            if self.last is not None:
+                target.last <<= self.last
+            if self.keep is not None:
+                target.keep <<= self.keep
+
+        return target
+
+    async def send(self, data, last=False, keep=Full):
+        """
+        Transmits a single word and waits until it is accepted.
+        """
+
+        self.data <<= data
+
+        if self.last is not None:
+            self.last <<= last
+        if self.keep is not None:
+            self.keep <<= keep
+
+        self.valid <<= True
+        await self.ready
+        self.valid <<= False
+
+    async def receive(self):
+        """
+        Waits for a single transfer, returns the tuple (data, last, keep).
+        """
+
+        self.ready <<= True
+        await self.valid
+        self.ready <<= False
+
+        return self.data, self.last, self.keep
+
+    def _ports(self, prefix: str, master: bool):
+        # returns port definitions and connections for IP blocks,
+        # `master` defines the direction from the IP point of view
+        out = Port.output if master else Port.input
+        inp = Port.input if master else Port.output
+
+        ports = {
+            f"{prefix}_tvalid": (out(Bit), self.valid),
+            f"{prefix}_tready": (inp(Bit), self.ready),
+            f"{prefix}_tdata": (out(BitVector[self.data_width()]), self.data),
+        }
+
+        if self.keep is not None:
+            ports[f"{prefix}_tkeep"] = (out(BitVector[self.keep.width]), self.keep)
+        if self.last is not None:
+            ports[f"{prefix}_tlast"] = (out(Bit), self.last)
+
+        return ports
+
+
+def _axis_ip(name, version, module_name, properties, ports: dict):
+    ip = ip_block(
+        name=name,
+        vendor="xilinx.com",
+        library="ip",
+        version=version,
+        module_name=module_name,
+        properties=properties,
+        ports={port_name: port for port_name, (port, _) in ports.items()},
+    )
+
+    ip(**{port_name: signal for port_name, (_, signal) in ports.items()})
+
+
+def _signal_properties(stream: AxiStream):
+    return {
+        "CONFIG.HAS_TLAST": "1" if stream.has_last() else "0",
+        "CONFIG.HAS_TKEEP": "1" if stream.has_keep() else "0",
+    }
+
+
+def _check_byte_aligned(stream: AxiStream):
+    assert (
+        stream.data_width() % 8 == 0
+    ), f"AXI4-Stream IP requires byte aligned tdata (width = {stream.data_width()})"
+
+
+def axis_data_fifo(
+    inp: AxiStream,
+    depth: int,
+    *,
+    clk: std.Clock | None = None,
+    reset: std.Reset | None = None,
+) -> AxiStream:
+    """
+    Buffers `inp` in an `axis_data_fifo` IP with `depth` entries.
+    When `clk` is set, the output stream is clocked by it (using an
+    asynchronous fifo).
+    """
+
+    _check_byte_aligned(inp)
+    assert depth in [2**n for n in range(4, 16)], f"invalid fifo depth {depth}"
+
+    is_async = clk is not None
+    out = inp.similar(clk=clk, reset=reset, prefix="axis_fifo_")
+
+    ports = {
+        "s_axis_aclk": (Port.input(Bit), inp.clk.signal()),
+        "s_axis_aresetn": (Port.input(Bit), inp.reset.active_low_signal()),
+        **inp._ports("s_axis", master=False),
+        **out._ports("m_axis", master=True),
+    }
+
+    if is_async:
+        ports["m_axis_aclk"] = (Port.input(Bit), out.clk.signal())
+
+    _axis_ip(
+        "axis_data_fifo",
+        "2.0",
+        "axis_data_fifo",
+        {
+            "CONFIG.TDATA_NUM_BYTES": str(inp.data_width() // 8),
+            "CONFIG.FIFO_DEPTH": str(depth),
+            "CONFIG.IS_ACLK_ASYNC": "1" if is_async else "0",
+            **_signal_properties(inp),
+        },
+        ports,
+    )
+
+    return out
+
+
+def axis_dwidth_converter(inp: AxiStream, data_width: int) -> AxiStream:
+    """
+    Converts `inp` to a stream with `data_width` bits using
+    an `axis_dwidth_converter` IP.
+    """
+
+    _check_byte_aligned(inp)
+    assert data_width % 8 == 0, "data_width must be a multiple of 8"
+
+    out = inp.similar(data_width=data_width, prefix="axis_dwidth_")
+
+    _axis_ip(
+        "axis_dwidth_converter",
+        "1.1",
+        "axis_dwidth_converter",
+        {
+            "CONFIG.S_TDATA_NUM_BYTES": str(inp.data_width() // 8),
+            "CONFIG.M_TDATA_NUM_BYTES": str(data_width // 8),
+            **_signal_properties(inp),
+        },
+        {
+            "aclk": (Port.input(Bit), inp.clk.signal()),
+            "aresetn": (Port.input(Bit), inp.reset.active_low_signal()),
+            **inp._ports("s_axis", master=False),
+            **out._ports("m_axis", master=True),
+        },
+    )
+
+    return out
+
+
+def axis_clock_converter(inp: AxiStream, clk: std.Clock, reset: std.Reset) -> AxiStream:
+    """
+    Moves `inp` into the clock domain of `clk` using
+    an `axis_clock_converter` IP.
+    """
+
+    _check_byte_aligned(inp)
+
+    out = inp.similar(clk=clk, reset=reset, prefix="axis_cc_")
+
+    _axis_ip(
+        "axis_clock_converter",
+        "1.1",
+        "axis_clock_converter",
+        {
+            "CONFIG.TDATA_NUM_BYTES": str(inp.data_width() // 8),
+            **_signal_properties(inp),
+        },
+        {
+            "s_axis_aclk": (Port.input(Bit), inp.clk.signal()),
+            "s_axis_aresetn": (Port.input(Bit), inp.reset.active_low_signal()),
+            "m_axis_aclk": (Port.input(Bit), clk.signal()),
+            "m_axis_aresetn": (Port.input(Bit), reset.active_low_signal()),
+            **inp._ports("s_axis", master=False),
+            **out._ports("m_axis", master=True),
+        },
+    )
+
+    return out
+
+
+def axis_fifo(
+    inp: AxiStream,
+    depth: int,
+    *,
+    clk: std.Clock | None = None,
+    reset: std.Reset | None = None,
+    backend: Backend = Backend.FIFO_GENERATOR,
+    implementation: Implementation | None = None,
+) -> AxiStream:
+    """
+    AXI4-Stream version of `CommonClkFifo` (or `IndependentClkFifo` when
+    `clk` is set). tdata, tkeep and tlast are stored in a single fifo word,
+    input and output accept/produce one transfer per clock cycle.
+    """
+
+    out = inp.similar(clk=clk, reset=reset, prefix="axis_fifo_")
+
+    data_width = inp.data_width()
+    keep_width = 0 if inp.keep is None else inp.keep.width
+    fifo_width = data_width + keep_width + (1 if inp.has_last() else 0)
+
+    if clk is None:
+        fifo = CommonClkFifo(
+            reset=inp.reset,
+            clk=inp.clk,
+            data_width=fifo_width,
+            depth=depth,
+            backend=backend,
+            implementation=implementation,
+        )
+    else:
+        fifo = IndependentClkFifo(
+            reset=inp.reset,
+            clk_read=clk,
+            clk_write=inp.clk,
+            data_width=fifo_width,
+            depth=depth,
+            backend=backend,
+            implementation=implementation,
+        )
+
+    # word layout: [last][keep][data]
+    parts = [inp.data]
+
+    if inp.keep is not None:
+        parts.append(inp.keep)
+    if inp.last is not None:
+        parts.append(inp.last)
+
+    parts.reverse()
+
+    @std.concurrent
+    def proc_write():
+        inp.ready <<= ~fifo.full
+        fifo.wr_en <<= inp.valid & ~fifo.full
+        fifo.data_in <<= std.concat(*parts)
+
+    @std.concurrent
+    def proc_read():
+        out.valid <<= ~fifo.empty
+        fifo.rd_en <<= out.ready & ~fifo.empty
+        out.data <<= fifo.data_out.lsb(data_width)
+
+        if out.keep is not None:
+            out.keep <<= fifo.data_out[data_width + keep_width - 1 : data_width]
+        if out.last is not None:
+            out.last <<= fifo.data_out.msb()
+
+    return out
+
+
+def fifo_input_stream(
+    fifo: CommonClkFifo | IndependentClkFifo,
+    clk: std.Clock,
+    reset: std.Reset,
+    *,
+    prefix="",
+) -> AxiStream:
+    """
+    Returns a stream (without tlast and tkeep) that writes each transfer
+    into `fifo`, one per clock cycle while the fifo is not full.
+    `clk` and `reset` belong to the write side of the fifo,
+    which must not be written by other means.
+    """
+
+    stream = AxiStream.signal(
+        clk, reset, fifo.write_width, has_last=False, has_keep=False, prefix=prefix
+    )
+
+    @std.concurrent
+    def proc_write():
+        stream.ready <<= ~fifo.full
+        fifo.wr_en <<= stream.valid & ~fifo.full
+        fifo.data_in <<= stream.data
+
+    return stream
+
+
+def fifo_output_stream(
+    fifo: CommonClkFifo | IndependentClkFifo,
+    clk: std.Clock,
+    reset: std.Reset,
+    *,
+    prefix="",
+) -> AxiStream:
+    """
+    Returns a stream (without tlast and tkeep) producing the words read
+    from `fifo`. Requires first word fall through mode, `clk` and `reset`
+    belong to the read side of the fifo, which must not be read by other means.
+    """
+
+    stream = AxiStream.signal(
+        clk, reset, fifo.read_width, has_last=False, has_keep=False, prefix=prefix
+    )
+
+    @std.concurrent
+    def proc_read():
+        stream.valid <<= ~fifo.empty
+        stream.data <<= fifo.data_out
+        fifo.rd_en <<= stream.ready & ~fifo.empty
+
+    return stream
@@ -1,8 +1,13 @@
+from __future__ import annotations
+
 import enum
-from cohdl import Port, Bit, BitVector, Signal
+
+import cohdl
+from cohdl import Port, Bit, BitVector, Unsigned, Signal, expr
 from cohdl import std
 
 from cohdl_xil import ip_block
+from cohdl_xil.ip.axi_stream import AxiStream, axis_fifo
 
 Axi4Light = std.axi.axi4_light.Axi4Light
 
@@ -24,6 +29,17 @@ Parity_ = Parity
 class AxiUartlite:
     Parity = Parity_
 
+    # register addresses
+    RX_FIFO = 0x0
+    TX_FIFO = 0x4
+    STATUS = 0x8
+    CONTROL = 0xC
+
+    # depth of the receive and transmit fifos of the IP core
+    FIFO_DEPTH = 16
+
+    _ENABLE_INTR = std.as_bitvector(f"{0x10:032b}")
+
     supported_baud = [
         110,
         300,
@@ -108,6 +124,7 @@ class AxiUartlite:
 
         self.axi = axi
         self.interrupt = Signal[Bit]()
+        self.ctx = std.SequentialContext(clk, reset)
 
         connected = {
             "s_axi_aclk": clk.signal(),
@@ -135,3 +152,121 @@ class AxiUartlite:
         }
 
         ip(**connected)
+
+        # the interrupt output is only asserted for one clock cycle,
+        # keep it until it is handled by `wait_interrupt`
+        self.interrupt_pending = Signal[Bit](False, name="uartlite_irq_pending")
+        self._clear_interrupt = Signal[Bit](False, name="uartlite_irq_clear")
+
+        @self.ctx
+        def proc_interrupt():
+            if self.interrupt:
+                self.interrupt_pending.next = True
+            elif self._clear_interrupt:
+                self.interrupt_pending.next = False
+
+    async def enable_interrupt(self):
+        """
+        Enables the interrupt output. It is asserted when the receive
+        fifo becomes non-empty or the transmit fifo becomes empty.
+        """
+
+        # control register bit 4: enable interrupt
+        await self.axi.write_word(self.CONTROL, self._ENABLE_INTR)
+
+    async def wait_interrupt(self):
+        """
+        Waits until an interrupt occurred since the last call.
+        """
+
+        await self.interrupt_pending
+        self._clear_interrupt ^= True
+
+    async def read_status(self) -> BitVector[8]:
+        status, _ = await self.axi.read_word(self.STATUS)
+        return status.lsb(8)
+
+    async def drain_rx(self, sink: AxiStream):
+        """
+        Forwards all bytes in the receive fifo to `sink`. When the
+        fifo is full its 16 entries are read without checking the status
+        register in between, otherwise each byte requires one status read.
+        Returns once the receive fifo is empty.
+        """
+
+        status = cohdl.Variable[BitVector[8]](await self.read_status())
+        cnt = cohdl.Variable[Unsigned.upto(self.FIFO_DEPTH)](0)
+
+        # status bit 0: receive data valid, bit 1: receive fifo full
+        while status[0]:
+            cnt @= self.FIFO_DEPTH if status[1] else 1
+
+            while cnt:
+                data, _ = await self.axi.read_word(self.RX_FIFO)
+                await sink.send(data.lsb(8))
+                cnt @= cnt - 1
+
+            status @= await self.read_status()
+
+    async def fill_tx(self, source: AxiStream):
+        """
+        Moves bytes from `source` into the transmit fifo. When the fifo is
+        empty up to 16 bytes are written without checking the status
+        register in between, otherwise at most one byte is written.
+        Returns the transmit fifo full flag (as seen before the writes).
+        """
+
+        status = cohdl.Variable[BitVector[8]](await self.read_status())
+        # status bit 2: transmit fifo empty, bit 3: transmit fifo full
+        cnt = cohdl.Variable[Unsigned.upto(self.FIFO_DEPTH)](
+            self.FIFO_DEPTH if status[2] else (0 if status[3] else 1)
+        )
+
+        while cnt and source.valid:
+            data, _last, _keep = await source.receive()
+            await self.axi.write_word(self.TX_FIFO, std.leftpad(data, 32))
+            cnt @= cnt - 1
+
+        return status[3]
+
+    def streams(
+        self, *, rx_depth: int | None = None, tx_depth: int | None = None
+    ) -> tuple[AxiStream, AxiStream]:
+        """
+        Returns the tuple (rx_stream, tx_stream) of byte streams clocked by
+        the clock of the IP core. A process driven by the interrupt output
+        drains the receive fifo and fills the transmit fifo in bursts,
+        so the status register is not polled while the link is idle.
+        `rx_depth` and `tx_depth` add downstream fifos to the streams.
+        This process must be the only user of `axi`.
+        """
+
+        clk = self.ctx.clk()
+        reset = self.ctx.reset()
+
+        rx_sink = AxiStream.signal(
+            clk, reset, 8, has_last=False, has_keep=False, prefix="uartlite_rx_"
+        )
+        tx_stream = AxiStream.signal(
+            clk, reset, 8, has_last=False, has_keep=False, prefix="uartlite_tx_"
+        )
+
+        rx_stream = rx_sink if rx_depth is None else axis_fifo(rx_sink, rx_depth)
+        tx_source = tx_stream if tx_depth is None else axis_fifo(tx_stream, tx_depth)
+
+        tx_full = Signal[Bit](False, name="uartlite_tx_full")
+
+        @self.ctx
+        async def proc_uartlite_streams():
+            await self.enable_interrupt()
+
+            while True:
+                # the transmit empty interrupt signals free space
+                # after the fifo was found full
+                await expr(self.interrupt_pending or (tx_source.valid and not tx_full))
+                self._clear_interrupt ^= True
+
+                await self.drain_rx(rx_sink)
+                tx_full.next = await self.fill_tx(tx_source)
+
+        return rx_stream, tx_stream
@@ -1,10 +1,11 @@
 from __future__ import annotations
 
 import enum
-from cohdl import Port, Bit, BitVector, Signal, expr
+from dataclasses import dataclass
+from cohdl import Port, Bit, BitVector, Unsigned, Signal, expr
 from cohdl import std
 
-from cohdl_xil import ip_block
+from cohdl_xil import ip_block, xpm_block
 
 
 class ReadMode(enum.Enum):
@@ -12,17 +13,185 @@ class ReadMode(enum.Enum):
     FIRST_WORD_FALLTHROUGH = enum.auto()
 
 
-_allowed_depth = [
-    2**9,
-    2**10,
-    2**11,
-    2**12,
-    2**13,
-    2**14,
-    2**15,
-    2**16,
-    2**17,
-]
+class Backend(enum.Enum):
+    # fifo_generator IP, built in a separate Vivado run
+    FIFO_GENERATOR = enum.auto()
+    # xpm_fifo_sync/xpm_fifo_async macros, synthesized inline with the design
+    XPM = enum.auto()
+
+
+class Implementation(enum.Enum):
+    # dedicated FIFO18/FIFO36 primitives
+    BUILTIN = enum.auto()
+    BLOCK_RAM = enum.auto()
+    DISTRIBUTED_RAM = enum.auto()
+    # only available for common clock FIFOs of the fifo_generator backend
+    SHIFT_REGISTER = enum.auto()
+
+
+_allowed_depth = {
+    Implementation.BUILTIN: [2**n for n in range(9, 18)],
+    Implementation.BLOCK_RAM: [2**n for n in range(4, 23)],
+    Implementation.DISTRIBUTED_RAM: [2**n for n in range(4, 17)],
+    Implementation.SHIFT_REGISTER: [2**n for n in range(4, 17)],
+}
+
+
+_allowed_width_ratio = [1, 2, 4, 8]
+
+# synchronization stages of the xpm_fifo_async gray code pointers
+_XPM_CDC_SYNC_STAGES = 2
+
+
+@dataclass
+class _FifoConfig:
+    # write width, the read width is `read_width`
+    data_width: int
+    depth: int
+    read_mode: ReadMode
+    backend: Backend
+    implementation: Implementation
+    prog_full: int | None
+    prog_empty: int | None
+    data_count: bool
+    read_width: int
+
+    def fwft(self):
+        return self.read_mode is ReadMode.FIRST_WORD_FALLTHROUGH
+
+    def is_symmetric(self):
+        return self.data_width == self.read_width
+
+    def read_depth(self):
+        return self.depth * self.data_width // self.read_width
+
+    def _count_width(self, depth: int):
+        # fifo_generator only adds the extra bit required to
+        # represent a full fifo in first word fall through mode
+        # (using the 'more accurate data counts' option)
+        if self.backend is Backend.FIFO_GENERATOR and not self.fwft():
+            return depth.bit_length() - 1
+        return depth.bit_length()
+
+    def wr_count_width(self):
+        return self._count_width(self.depth)
+
+    def rd_count_width(self):
+        return self._count_width(self.read_depth())
+
+    def check(self, common_clock: bool):
+        for name, width in [
+            ("data_width", self.data_width),
+            ("read_width", self.read_width),
+        ]:
+            assert 1 <= width <= 1024, f"{name} {width} out of range [1-1024]"
+
+        assert (
+            self.depth in _allowed_depth[self.implementation]
+        ), f"invalid fifo depth {self.depth} for implementation {self.implementation.name}"
+
+        if not self.is_symmetric():
+            wide, narrow = sorted([self.data_width, self.read_width], reverse=True)
+
+            assert (
+                wide % narrow == 0 and wide // narrow in _allowed_width_ratio
+            ), f"width ratio {self.data_width}:{self.read_width} not supported, the wider port must be 1, 2, 4 or 8 times as wide as the narrower one"
+            assert self.implementation is Implementation.BLOCK_RAM or (
+                self.backend is Backend.XPM
+            ), "different read and write widths require block RAM fifos"
+            assert self.read_depth() >= 16, "read depth must be at least 16"
+
+        if self.backend is Backend.XPM:
+            assert self.implementation in (
+                Implementation.BLOCK_RAM,
+                Implementation.DISTRIBUTED_RAM,
+            ), f"implementation {self.implementation.name} not supported by xpm fifos"
+
+        if self.implementation is Implementation.SHIFT_REGISTER:
+            assert common_clock, "shift register fifos require a common clock"
+
+        if self.data_count:
+            assert (
+                self.implementation is not Implementation.BUILTIN
+            ), "builtin fifos do not provide data counts"
+
+        # prog_full is counted in written words, prog_empty in read words
+        for name, threshold, (low, high) in [
+            ("prog_full", self.prog_full, self._prog_full_range(common_clock)),
+            ("prog_empty", self.prog_empty, self._prog_empty_range()),
+        ]:
+            assert threshold is None or (
+                low <= threshold <= high
+            ), f"{name} threshold {threshold} out of range [{low}-{high}]{self._threshold_note(common_clock)}"
+
+    def _prog_full_range(self, common_clock: bool):
+        # limits of PROG_FULL_THRESH in written words, the output stage of
+        # xpm fifos in first word fall through mode holds two read words
+        # (rounded up to written words) and xpm_fifo_async adds the
+        # synchronization stages of its pointers to the minimum
+        margin = 0
+        low = 3
+
+        if self.backend is Backend.XPM:
+            if self.fwft():
+                margin = -(-2 * self.read_width // self.data_width)
+            if not common_clock:
+                low += _XPM_CDC_SYNC_STAGES
+
+        return low + margin, self.depth - 3 - margin
+
+    def _prog_empty_range(self):
+        # limits of PROG_EMPTY_THRESH in read words
+        margin = 2 if self.backend is Backend.XPM and self.fwft() else 0
+        return 3 + margin, self.read_depth() - 3 - margin
+
+    def _threshold_note(self, common_clock: bool):
+        if self.backend is not Backend.XPM:
+            return ""
+
+        macro = "xpm_fifo_sync" if common_clock else "xpm_fifo_async"
+        mode = "first word fall through" if self.fwft() else "standard"
+        return f" for {macro} in {mode} mode"
+
+
+def _default_implementation(backend: Backend, implementation: Implementation | None):
+    if implementation is not None:
+        return implementation
+
+    if backend is Backend.XPM:
+        return Implementation.BLOCK_RAM
+    return Implementation.BUILTIN
+
+
+_fifo_generator_impl = {
+    (True, Implementation.BUILTIN): "Common_Clock_Builtin_FIFO",
+    (True, Implementation.BLOCK_RAM): "Common_Clock_Block_RAM",
+    (True, Implementation.DISTRIBUTED_RAM): "Common_Clock_Distributed_RAM",
+    (True, Implementation.SHIFT_REGISTER): "Common_Clock_Shift_Register",
+    (False, Implementation.BUILTIN): "Independent_Clocks_Builtin_FIFO",
+    (False, Implementation.BLOCK_RAM): "Independent_Clocks_Block_RAM",
+    (False, Implementation.DISTRIBUTED_RAM): "Independent_Clocks_Distributed_RAM",
+}
+
+
+def _optional_ports(config: _FifoConfig, single_count: bool):
+    # ports for programmable flags and data counts, the fifo_generator IP
+    # uses a single data_count output for symmetric common clock fifos
+    ports = {}
+
+    if config.prog_full is not None:
+        ports["prog_full"] = Port.output(Bit)
+    if config.prog_empty is not None:
+        ports["prog_empty"] = Port.output(Bit)
+
+    if config.data_count:
+        if single_count:
+            ports["data_count"] = Port.output(BitVector[config.wr_count_width()])
+        else:
+            ports["wr_data_count"] = Port.output(BitVector[config.wr_count_width()])
+            ports["rd_data_count"] = Port.output(BitVector[config.rd_count_width()])
+
+    return ports
 
 
 def _gen_ip_block(properties: dict[str, str], ports):
@@ -37,34 +206,67 @@ def _gen_ip_block(properties: dict[str, str], ports):
     )
 
 
-def _gen_common_clk_fifo(
-    data_width: int,
-    depth: int,
-    read_mode=ReadMode.FIRST_WORD_FALLTHROUGH,
-):
-    assert 1 <= data_width <= 1024, f"data_width {data_width} out of range [1-1024]"
-    assert depth in _allowed_depth, f"invalid fifo depth {depth}"
-
+def _fifo_generator_properties(config: _FifoConfig, common_clock: bool):
     properties = {
-        "CONFIG.Fifo_Implementation": "Common_Clock_Builtin_FIFO",
-        "CONFIG.Input_Data_Width": str(data_width),
-        "CONFIG.Input_Depth": str(depth),
+        "CONFIG.Fifo_Implementation": _fifo_generator_impl[
+            (common_clock, config.implementation)
+        ],
+        "CONFIG.Input_Data_Width": str(config.data_width),
+        "CONFIG.Input_Depth": str(config.depth),
     }
 
+    if not config.is_symmetric():
+        properties["CONFIG.Output_Data_Width"] = str(config.read_width)
+        properties["CONFIG.Output_Depth"] = str(config.read_depth())
+
+    if config.fwft():
+        properties["CONFIG.Performance_Options"] = "First_Word_Fall_Through"
+
+    if config.prog_full is not None:
+        properties["CONFIG.Programmable_Full_Type"] = (
+            "Single_Programmable_Full_Threshold_Constant"
+        )
+        properties["CONFIG.Full_Threshold_Assert_Value"] = str(config.prog_full)
+
+    if config.prog_empty is not None:
+        properties["CONFIG.Programmable_Empty_Type"] = (
+            "Single_Programmable_Empty_Threshold_Constant"
+        )
+        properties["CONFIG.Empty_Threshold_Assert_Value"] = str(config.prog_empty)
+
+    if config.data_count:
+        if config.fwft():
+            properties["CONFIG.Use_Extra_Logic"] = "true"
+
+        if common_clock and config.is_symmetric():
+            properties["CONFIG.Data_Count"] = "true"
+            properties["CONFIG.Data_Count_Width"] = str(config.wr_count_width())
+        else:
+            properties["CONFIG.Write_Data_Count"] = "true"
+            properties["CONFIG.Write_Data_Count_Width"] = str(config.wr_count_width())
+            properties["CONFIG.Read_Data_Count"] = "true"
+            properties["CONFIG.Read_Data_Count_Width"] = str(config.rd_count_width())
+
+    return properties
+
+
+def _gen_common_clk_fifo(config: _FifoConfig):
+    config.check(common_clock=True)
+
+    properties = _fifo_generator_properties(config, common_clock=True)
+
     ports = {
         "clk": Port.input(Bit),
         "rst": Port.input(Bit),
-        "din": Port.input(BitVector[data_width]),
+        "din": Port.input(BitVector[config.data_width]),
         "wr_en": Port.input(Bit),
         "rd_en": Port.input(Bit),
-        "dout": Port.output(BitVector[data_width]),
+        "dout": Port.output(BitVector[config.read_width]),
         "full": Port.output(Bit),
         "empty": Port.output(Bit),
+        **_optional_ports(config, single_count=config.is_symmetric()),
     }
 
-    if read_mode is ReadMode.FIRST_WORD_FALLTHROUGH:
-        properties["CONFIG.Performance_Options"] = "First_Word_Fall_Through"
-
     return _gen_ip_block(
         properties=properties,
         ports=ports,
@@ -72,56 +274,258 @@ def _gen_common_clk_fifo(
 
 
 def _gen_independent_clk_fifo(
-    data_width: int,
-    depth: int,
+    config: _FifoConfig,
     read_freq_mhz: float,
     write_freq_mhz: float,
-    read_mode: ReadMode.FIRST_WORD_FALLTHROUGH,
 ):
+    config.check(common_clock=False)
+
     ports = {
         "rst": Port.input(Bit),
         "wr_clk": Port.input(Bit),
         "rd_clk": Port.input(Bit),
-        "din": Port.input(BitVector[data_width]),
+        "din": Port.input(BitVector[config.data_width]),
         "wr_en": Port.input(Bit),
         "rd_en": Port.input(Bit),
-        "dout": Port.output(BitVector[data_width]),
+        "dout": Port.output(BitVector[config.read_width]),
         "full": Port.output(Bit),
         "empty": Port.output(Bit),
+        **_optional_ports(config, single_count=False),
     }
 
     properties = {
-        "CONFIG.Fifo_Implementation": "Independent_Clocks_Builtin_FIFO",
-        "CONFIG.Input_Data_Width": str(data_width),
-        "CONFIG.Input_Depth": str(depth),
+        **_fifo_generator_properties(config, common_clock=False),
         "CONFIG.Read_Clock_Frequency": str(read_freq_mhz),
         "CONFIG.Write_Clock_Frequency": str(write_freq_mhz),
     }
 
-    if read_mode is ReadMode.FIRST_WORD_FALLTHROUGH:
-        properties["CONFIG.Performance_Options"] = "First_Word_Fall_Through"
-
     return _gen_ip_block(properties=properties, ports=ports)
 
 
+def _gen_xpm_fifo(
+    macro: str,
+    config: _FifoConfig,
+    ports: dict[str, Port],
+    generics: dict[str, str | int],
+):
+    fwft = config.fwft()
+
+    # USE_ADV_FEATURES bits: 1 prog_full, 2 wr_data_count,
+    # 9 prog_empty, 10 rd_data_count
+    adv_features = 0
+
+    if config.prog_full is not None:
+        adv_features |= 1 << 1
+        generics = {**generics, "PROG_FULL_THRESH": config.prog_full}
+    if config.prog_empty is not None:
+        adv_features |= 1 << 9
+        generics = {**generics, "PROG_EMPTY_THRESH": config.prog_empty}
+    if config.data_count:
+        adv_features |= (1 << 2) | (1 << 10)
+
+    return xpm_block(
+        macro=macro,
+        module_name=f"{macro}_wrapper",
+        generics={
+            "DOUT_RESET_VALUE": "0",
+            "ECC_MODE": "no_ecc",
+            "FIFO_MEMORY_TYPE": (
+                "block"
+                if config.implementation is Implementation.BLOCK_RAM
+                else "distributed"
+            ),
+            "FIFO_READ_LATENCY": 0 if fwft else 1,
+            "FIFO_WRITE_DEPTH": config.depth,
+            # full is also held high while wr_rst_busy is set (see _xpm_status)
+            "FULL_RESET_VALUE": 1,
+            "RD_DATA_COUNT_WIDTH": config.rd_count_width(),
+            "READ_DATA_WIDTH": config.read_width,
+            "READ_MODE": "fwft" if fwft else "std",
+            "USE_ADV_FEATURES": f"{adv_features:04X}",
+            "WR_DATA_COUNT_WIDTH": config.wr_count_width(),
+            "WRITE_DATA_WIDTH": config.data_width,
+            **generics,
+        },
+        ports={
+            **ports,
+            "din": Port.input(BitVector[config.data_width]),
+            "wr_en": Port.input(Bit),
+            "rd_en": Port.input(Bit),
+            "dout": Port.output(BitVector[config.read_width]),
+            "full": Port.output(Bit),
+            "empty": Port.output(Bit),
+            "wr_rst_busy": Port.output(Bit),
+            **_optional_ports(config, single_count=False),
+        },
+        fixed_inputs={
+            "sleep": "'0'",
+            "injectsbiterr": "'0'",
+            "injectdbiterr": "'0'",
+        },
+    )
+
+
+def _gen_xpm_common_clk_fifo(config: _FifoConfig):
+    config.check(common_clock=True)
+
+    return _gen_xpm_fifo(
+        "xpm_fifo_sync",
+        config,
+        ports={"wr_clk": Port.input(Bit), "rst": Port.input(Bit)},
+        generics={},
+    )
+
+
+def _gen_xpm_independent_clk_fifo(config: _FifoConfig):
+    config.check(common_clock=False)
+
+    return _gen_xpm_fifo(
+        "xpm_fifo_async",
+        config,
+        ports={
+            "wr_clk": Port.input(Bit),
+            "rd_clk": Port.input(Bit),
+            "rst": Port.input(Bit),
+        },
+        generics={"CDC_SYNC_STAGES": _XPM_CDC_SYNC_STAGES, "RELATED_CLOCKS": 0},
+    )
+
+
+# number of cycles the programmable flags and data counts may lag behind
+# the actual fill level, burst conditions keep this many words as a margin
+_STATUS_LATENCY = 2
+
+
 class _FifoBase:
     def __init__(
         self,
         data_width: int,
+        config: _FifoConfig | None = None,
     ):
+        read_width = data_width if config is None else config.read_width
+
+        self.write_width = data_width
+        self.read_width = read_width
+        self._config = config
+
         self.wr_en = Signal[Bit](False, name="fifo_wr_en")
         self.rd_en = Signal[Bit](False, name="fifo_rd_en")
         self.data_in = Signal[BitVector[data_width]](name="fifo_data_in")
-        self.data_out = Signal[BitVector[data_width]](name="fifo_data_out")
+        self.data_out = Signal[BitVector[read_width]](name="fifo_data_out")
         self.full = Signal[Bit](name="fifo_full")
         self.empty = Signal[Bit](name="fifo_empty")
 
+        # optional status outputs, None when not configured
+        self.prog_full: Signal[Bit] | None = None
+        self.prog_empty: Signal[Bit] | None = None
+        self.wr_data_count: Signal[BitVector] | None = None
+        self.rd_data_count: Signal[BitVector] | None = None
+
+        if config is None:
+            return
+
+        if config.prog_full is not None:
+            self.prog_full = Signal[Bit](name="fifo_prog_full")
+        if config.prog_empty is not None:
+            self.prog_empty = Signal[Bit](name="fifo_prog_empty")
+
+        if config.data_count:
+            self.wr_data_count = Signal[BitVector[config.wr_count_width()]](
+                name="fifo_wr_data_count"
+            )
+            self.rd_data_count = Signal[BitVector[config.rd_count_width()]](
+                name="fifo_rd_data_count"
+            )
+
+    def _xpm_status(self):
+        # the xpm macros ignore writes while wr_rst_busy is set after a reset,
+        # it is combined into `full` so users checking `full` wait for it
+        full = Signal[Bit](name="fifo_xpm_full")
+        wr_rst_busy = Signal[Bit](name="fifo_wr_rst_busy")
+
+        @std.concurrent
+        def logic():
+            self.full <<= full | wr_rst_busy
+
+        return {"full": full, "wr_rst_busy": wr_rst_busy}
+
+    def _optional_connections(self, single_count: bool):
+        result = {}
+
+        if self.prog_full is not None:
+            result["prog_full"] = self.prog_full
+        if self.prog_empty is not None:
+            result["prog_empty"] = self.prog_empty
+
+        if self.wr_data_count is not None:
+            if single_count:
+                # both counts refer to the same output
+                self.rd_data_count = self.wr_data_count
+                result["data_count"] = self.wr_data_count
+            else:
+                result["wr_data_count"] = self.wr_data_count
+                result["rd_data_count"] = self.rd_data_count
+
+        return result
+
+    def writes_per_read(self):
+        """
+        Number of written words combined into one read word.
+        """
+
+        assert (
+            self.read_width >= self.write_width
+        ), "fifo reads are narrower than writes, use reads_per_write"
+        return self.read_width // self.write_width
+
+    def reads_per_write(self):
+        """
+        Number of read words produced from one written word.
+        """
+
+        assert (
+            self.write_width >= self.read_width
+        ), "fifo writes are narrower than reads, use writes_per_read"
+        return self.write_width // self.read_width
+
     def is_empty(self):
         return self.empty
 
     def is_full(self):
         return self.full
 
+    def is_almost_full(self):
+        """
+        True when the fifo contains at least `prog_full` written words.
+        """
+
+        assert self.prog_full is not None, "prog_full threshold not configured"
+        return self.prog_full
+
+    def is_almost_empty(self):
+        """
+        True when the fifo contains at most `prog_empty` read words.
+        """
+
+        assert self.prog_empty is not None, "prog_empty threshold not configured"
+        return self.prog_empty
+
+    def write_count(self):
+        """
+        Number of words in the fifo as seen from the write side.
+        """
+
+        assert self.wr_data_count is not None, "data counts not enabled"
+        return self.wr_data_count.unsigned
+
+    def read_count(self):
+        """
+        Number of words in the fifo as seen from the read side.
+        """
+
+        assert self.rd_data_count is not None, "data counts not enabled"
+        return self.rd_data_count.unsigned
+
     def push_value(self, value):
         self.wr_en ^= True
         self.data_in <<= value
@@ -139,6 +543,119 @@ class _FifoBase:
         await expr(not self.empty)
         return self.pop_value()
 
+    def _space_for(self, count: int):
+        # returns a condition that is true, when at least `count`
+        # words can be written without checking `full`
+        # `full` is checked as well, it stays set while
+        # the fifo does not accept writes after a reset
+        config = self._config
+
+        if self.wr_data_count is not None:
+            limit = config.depth - count - _STATUS_LATENCY
+            assert limit >= 0, f"burst of {count} words exceeds fifo depth"
+            return lambda: self.write_count() <= limit and not self.full
+        elif self.prog_full is not None:
+            # prog_full is low when less than `prog_full` words are stored
+            assert (
+                count + _STATUS_LATENCY <= config.depth - config.prog_full + 1
+            ), f"burst of {count} words does not fit above the prog_full threshold"
+            return lambda: not (self.prog_full or self.full)
+        else:
+            raise AssertionError("bursts require data counts or a prog_full threshold")
+
+    def _data_for(self, count: int):
+        # returns a condition that is true, when at least `count`
+        # words can be read without checking `empty`
+        config = self._config
+
+        assert config.fwft(), "read bursts require first word fall through mode"
+
+        if self.rd_data_count is not None:
+            limit = count + _STATUS_LATENCY
+            assert (
+                limit <= config.read_depth()
+            ), f"burst of {count} words exceeds fifo depth"
+            return lambda: self.read_count() >= limit
+        elif self.prog_empty is not None:
+            # prog_empty is low when more than `prog_empty` words are stored
+            assert (
+                count + _STATUS_LATENCY <= config.prog_empty + 1
+            ), f"burst of {count} words exceeds the prog_empty threshold"
+            return lambda: not self.prog_empty
+        else:
+            raise AssertionError("bursts require data counts or a prog_empty threshold")
+
+    @staticmethod
+    async def _burst(count: int, step):
+        # calls step once per clock cycle, `count` times in total
+        step()
+
+        if count > 1:
+            remaining = Signal[Unsigned.upto(count - 1)](count - 1, name="burst_cnt")
+
+            while remaining:
+                remaining <<= remaining - 1
+                step()
+
+    async def _pop_burst(self, count: int, sink):
+        # rd_en is a registered output, it is set one cycle before the
+        # cycle in which the corresponding word is sampled from data_out
+        self.rd_en ^= True
+        remaining = Signal[Unsigned.upto(count)](count, name="burst_cnt")
+
+        while remaining:
+            remaining <<= remaining - 1
+            sink(self.data_out)
+
+            if remaining != 1:
+                self.rd_en ^= True
+
+    async def push_burst(self, count: int, source):
+        """
+        Waits until the fifo has room for `count` words and pushes one word
+        per clock cycle. `source` is called once per cycle and returns
+        the next value.
+
+        Requires data counts or a prog_full threshold. Because these lag behind
+        the actual fill level, a margin of a few words is kept free.
+        """
+
+        assert count >= 1
+        space_available = self._space_for(count)
+
+        await expr(space_available())
+        await self._burst(count, lambda: self.push_value(source()))
+
+    async def pop_burst(self, count: int, sink):
+        """
+        Waits until the fifo contains `count` words and pops one word
+        per clock cycle. `sink` is called once per cycle with the popped value.
+
+        Requires first word fall through mode and data counts or
+        a prog_empty threshold.
+        """
+
+        assert count >= 1
+        data_available = self._data_for(count)
+
+        await expr(data_available())
+        await self._pop_burst(count, sink)
+
+    async def forward_burst(self, target: _FifoBase, count: int):
+        """
+        Moves `count` words from this fifo into `target` (one word per cycle)
+        once enough data and space is available on both sides.
+        """
+
+        assert count >= 1
+        assert self.read_width == target.write_width, "fifo widths do not match"
+
+        data_available = self._data_for(count)
+        space_available = target._space_for(count)
+
+        await expr(data_available() and space_available())
+        await self._pop_burst(count, target.push_value)
+
 
 class CommonClkFifo(_FifoBase):
     def __init__(
@@ -149,27 +666,67 @@ class CommonClkFifo(_FifoBase):
         data_width: int,
         depth: int,
         read_mode: ReadMode = ReadMode.FIRST_WORD_FALLTHROUGH,
+        backend: Backend = Backend.FIFO_GENERATOR,
+        implementation: Implementation | None = None,
+        prog_full: int | None = None,
+        prog_empty: int | None = None,
+        data_count: bool = False,
+        read_width: int | None = None,
     ) -> None:
-        assert clk.is_rising_edge()
+        """
+        `implementation` defaults to the builtin FIFO primitives for the
+        fifo_generator backend and to block RAM for the XPM backend.
+        `prog_full` and `prog_empty` enable the programmable flags
+        with the given thresholds and `data_count` enables the data count outputs.
+
+        When `read_width` differs from `data_width` the fifo converts between
+        both widths (ratios up to 1:8 or 8:1). `depth` is given in written words.
+        The fifo_generator backend splits/packs wide words starting at the most
+        significant bits, i.e. the first written word of a 32-in/128-out fifo
+        ends up in the upper 32 bits of the read word (see UG974 for the
+        order used by the XPM backend).
+        """
 
-        super().__init__(data_width=data_width)
+        assert clk.is_rising_edge()
 
-        ip = _gen_common_clk_fifo(
-            data_width=data_width, depth=depth, read_mode=read_mode
+        config = _FifoConfig(
+            data_width=data_width,
+            depth=depth,
+            read_mode=read_mode,
+            backend=backend,
+            implementation=_default_implementation(backend, implementation),
+            prog_full=prog_full,
+            prog_empty=prog_empty,
+            data_count=data_count,
+            read_width=data_width if read_width is None else read_width,
         )
 
+        super().__init__(data_width=data_width, config=config)
+
         self.reset = reset
         self.clk = clk
 
+        if backend is Backend.XPM:
+            ip = _gen_xpm_common_clk_fifo(config)
+            clk_ports = {"wr_clk": self.clk.signal()}
+            status_ports = self._xpm_status()
+            single_count = False
+        else:
+            ip = _gen_common_clk_fifo(config)
+            clk_ports = {"clk": self.clk.signal()}
+            status_ports = {"full": self.full}
+            single_count = config.is_symmetric()
+
         ip(
-            clk=self.clk.signal(),
+            **clk_ports,
             rst=self.reset.active_high_signal(),
             din=self.data_in,
             wr_en=self.wr_en,
             rd_en=self.rd_en,
             dout=self.data_out,
-            full=self.full,
             empty=self.empty,
+            **status_ports,
+            **self._optional_connections(single_count),
         )
 
 
@@ -183,20 +740,47 @@ class IndependentClkFifo(_FifoBase):
         data_width: int,
         depth: int,
         read_mode: ReadMode = ReadMode.FIRST_WORD_FALLTHROUGH,
+        backend: Backend = Backend.FIFO_GENERATOR,
+        implementation: Implementation | None = None,
+        prog_full: int | None = None,
+        prog_empty: int | None = None,
+        data_count: bool = False,
+        read_width: int | None = None,
     ):
+        """
+        Same options as `CommonClkFifo`. `prog_full` and `write_count`
+        belong to the write clock domain, `prog_empty`
+        and `read_count` to the read clock domain.
+        """
+
         assert clk_read.is_rising_edge()
         assert clk_write.is_rising_edge()
 
-        super().__init__(data_width=data_width)
-
-        ip = _gen_independent_clk_fifo(
+        config = _FifoConfig(
             data_width=data_width,
             depth=depth,
-            read_freq_mhz=clk_read.frequency().megahertz(),
-            write_freq_mhz=clk_write.frequency().megahertz(),
             read_mode=read_mode,
+            backend=backend,
+            implementation=_default_implementation(backend, implementation),
+            prog_full=prog_full,
+            prog_empty=prog_empty,
+            data_count=data_count,
+            read_width=data_width if read_width is None else read_width,
         )
 
+        super().__init__(data_width=data_width, config=config)
+
+        if backend is Backend.XPM:
+            ip = _gen_xpm_independent_clk_fifo(config)
+            status_ports = self._xpm_status()
+        else:
+            status_ports = {"full": self.full}
+            ip = _gen_independent_clk_fifo(
+                config,
+                read_freq_mhz=clk_read.frequency().megahertz(),
+                write_freq_mhz=clk_write.frequency().megahertz(),
+            )
+
         self.reset = reset
         self.clk_read = clk_read
         self.clk_write = clk_write
@@ -209,6 +793,7 @@ class IndependentClkFifo(_FifoBase):
             wr_en=self.wr_en,
             rd_en=self.rd_en,
             dout=self.data_out,
-            full=self.full,
             empty=self.empty,
+            **status_ports,
+            **self._optional_connections(single_count=False),
         )
@@ -0,0 +1,256 @@
+from __future__ import annotations
+
+import cohdl
+from cohdl import Bit, BitVector, Unsigned, Signal, Null
+from cohdl import std
+
+from cohdl_xil.ip.axi_stream import AxiStream
+
+# frame format (see cohdl_xil.host.framed_link for the host side):
+#
+#   SYNC, kind, seq, length, payload (length bytes), crc low, crc high
+#
+# The CRC-16/CCITT (polynomial 0x1021, initial value 0xFFFF) covers
+# kind, seq, length and the payload.
+
+SYNC = 0x7E
+KIND_DATA = 0x01
+KIND_ACK = 0x02
+KIND_RESET = 0x03
+
+MAX_PAYLOAD = 255
+
+_CRC_POLY = std.as_bitvector(f"{0x1021:016b}")
+_CRC_INIT = std.as_bitvector(f"{0xFFFF:016b}")
+
+
+def _byte(value: int):
+    return std.as_bitvector(f"{value:08b}")
+
+
+def crc16_update(crc: std.crc.BitwiseCrc, data):
+    """
+    Extends `crc` by the byte `data` (most significant bit first,
+    all eight steps are calculated in a single clock cycle).
+    """
+
+    crc.update_multiple(
+        data[7], data[6], data[5], data[4], data[3], data[2], data[1], data[0]
+    )
+
+
+class FramedLink:
+    """
+    Packetized, CRC checked transfers over a byte stream (for example the
+    streams of `cohdl_xil.ip.uart.Uart`). Compatible with
+    `cohdl_xil.host.framed_link.FramedLinkClient`.
+
+    Received DATA frames are stored in a buffer of `max_payload` bytes
+    and only forwarded to `rx_payload` (one frame per tlast) once their
+    CRC was checked. Frames with the expected sequence number are
+    acknowledged after their payload was accepted, so the host window
+    together with the backpressure of `rx_payload` provides flow control.
+    Frames with a wrong CRC are dropped, duplicates are acknowledged again.
+    A RESET frame sets the expected sequence number.
+
+    Bytes written to `tx_payload` are collected until tlast is set or
+    `max_payload` bytes are buffered and then sent as a DATA frame with an
+    incrementing sequence number. The board to host direction is not
+    acknowledged, the host detects lost frames from gaps in the
+    sequence numbers.
+
+    The receive fifo of the underlying link should hold at least
+    one host window of frames since `inp` is not read while a payload
+    is forwarded.
+    """
+
+    def __init__(
+        self,
+        ctx: std.SequentialContext,
+        inp: AxiStream,
+        out: AxiStream,
+        *,
+        max_payload: int = MAX_PAYLOAD,
+    ):
+        assert inp.data_width() == 8 and out.data_width() == 8, "byte streams required"
+        assert 1 <= max_payload <= MAX_PAYLOAD, "max_payload must be in range [1, 255]"
+
+        self.ctx = ctx
+        self.inp = inp
+        self.out = out
+        self.max_payload = max_payload
+
+        with std.prefix("framed_link"):
+            n = std.name
+
+            self.rx_payload = AxiStream.signal(
+                ctx.clk(), ctx.reset(), 8, has_keep=False, prefix=n("rx_")
+            )
+            self.tx_payload = AxiStream.signal(
+                ctx.clk(), ctx.reset(), 8, has_keep=False, prefix=n("tx_")
+            )
+
+            # statistics
+            self.rx_frames = Signal[Unsigned[32]](0, name=n("rx_frames"))
+            self.crc_errors = Signal[Unsigned[32]](0, name=n("crc_errors"))
+            self.tx_frames = Signal[Unsigned[32]](0, name=n("tx_frames"))
+
+            self._ack_pending = Signal[Bit](False, name=n("ack_pending"))
+            self._ack_set = Signal[Bit](False, name=n("ack_set"))
+            self._ack_clear = Signal[Bit](False, name=n("ack_clear"))
+            self._ack_seq = Signal[BitVector[8]](Null, name=n("ack_seq"))
+
+            self._impl_ack()
+            self._impl_rx()
+            self._impl_tx()
+
+    def _impl_ack(self):
+        @self.ctx
+        def proc_ack():
+            if self._ack_set:
+                self._ack_pending.next = True
+            elif self._ack_clear:
+                self._ack_pending.next = False
+
+    def _impl_rx(self):
+        inp = self.inp
+        rx_payload = self.rx_payload
+        max_payload = self.max_payload
+
+        buffer = Signal[std.Array[BitVector[8], max_payload]](name="framed_link_rx_buf")
+
+        crc = std.crc.BitwiseCrc(_CRC_POLY, _CRC_INIT)
+        crc_low = Signal[BitVector[8]](Null, name="framed_link_rx_crc_low")
+        kind = Signal[BitVector[8]](Null, name="framed_link_rx_kind")
+        seq = Signal[BitVector[8]](Null, name="framed_link_rx_seq")
+        length = Signal[Unsigned[8]](0, name="framed_link_rx_length")
+        expected = Signal[Unsigned[8]](0, name="framed_link_rx_expected")
+
+        sync = _byte(SYNC)
+        kind_data = _byte(KIND_DATA)
+        kind_reset = _byte(KIND_RESET)
+
+        async def receive():
+            data, _last, _keep = await inp.receive()
+            return data
+
+        async def receive_header(target):
+            data = await receive()
+            target.next = data
+            crc16_update(crc, data)
+
+        @self.ctx
+        async def proc_deframe():
+            first = await receive()
+
+            if first == sync:
+                crc.clear()
+
+                await receive_header(kind)
+                await receive_header(seq)
+
+                frame_length = await receive()
+                length.next = frame_length.unsigned
+                crc16_update(crc, frame_length)
+
+                if frame_length.unsigned <= max_payload:
+                    idx = cohdl.Variable[Unsigned[8]](0)
+
+                    while idx != length:
+                        data = await receive()
+                        buffer[idx] <<= data
+                        crc16_update(crc, data)
+                        idx @= idx + 1
+
+                    crc_low.next = await receive()
+                    crc_high = await receive()
+
+                    if crc.result() != crc_high @ crc_low:
+                        self.crc_errors.next = self.crc_errors + 1
+                    elif kind == kind_reset:
+                        expected.next = seq.unsigned + 1
+                        self._ack_seq.next = seq
+                        self._ack_set ^= True
+                    elif kind == kind_data:
+                        self.rx_frames.next = self.rx_frames + 1
+
+                        if seq.unsigned == expected:
+                            idx @= 0
+
+                            while idx != length:
+                                await rx_payload.send(
+                                    buffer[idx], last=idx == length - 1
+                                )
+                                idx @= idx + 1
+
+                            expected.next = expected + 1
+                            self._ack_seq.next = seq
+                        else:
+                            # duplicate or out of order frame,
+                            # repeat the last acknowledge
+                            self._ack_seq.next = (expected - 1).bitvector
+
+                        self._ack_set ^= True
+
+    def _impl_tx(self):
+        out = self.out
+        tx_payload = self.tx_payload
+        max_payload = self.max_payload
+
+        buffer = Signal[std.Array[BitVector[8], max_payload]](name="framed_link_tx_buf")
+
+        crc = std.crc.BitwiseCrc(_CRC_POLY, _CRC_INIT)
+        seq = Signal[Unsigned[8]](0, name="framed_link_tx_seq")
+        length = Signal[Unsigned[8]](0, name="framed_link_tx_length")
+        ready = Signal[Bit](False, name="framed_link_tx_ready")
+        ack_seq = Signal[BitVector[8]](Null, name="framed_link_tx_ack_seq")
+
+        sync = _byte(SYNC)
+        kind_data = _byte(KIND_DATA)
+        kind_ack = _byte(KIND_ACK)
+        empty = _byte(0)
+
+        async def send(data):
+            crc16_update(crc, data)
+            await out.send(data)
+
+        async def send_header(kind, frame_seq, frame_length):
+            crc.clear()
+            await out.send(sync)
+            await send(kind)
+            await send(frame_seq)
+            await send(frame_length)
+
+        async def send_crc():
+            await out.send(crc.result().lsb(8))
+            await out.send(crc.result().msb(8))
+
+        @self.ctx
+        async def proc_frame():
+            if self._ack_pending:
+                # acknowledges received later set `_ack_pending` again
+                self._ack_clear ^= True
+                ack_seq.next = self._ack_seq
+
+                await send_header(kind_ack, ack_seq, empty)
+                await send_crc()
+            elif ready:
+                await send_header(kind_data, seq.bitvector, length.bitvector)
+
+                idx = cohdl.Variable[Unsigned[8]](0)
+
+                while idx != length:
+                    await send(buffer[idx])
+                    idx @= idx + 1
+
+                await send_crc()
+
+                self.tx_frames.next = self.tx_frames + 1
+                seq.next = seq + 1
+                length.next = 0
+                ready.next = False
+            elif tx_payload.valid:
+                data, last, _keep = await tx_payload.receive()
+                buffer[length] <<= data
+                length.next = length + 1
+                ready.next = last or length == max_payload - 1
@@ -1,4 +1,6 @@
 from __future__ import annotations
+
+import enum
 from dataclasses import dataclass
 
 import cohdl
@@ -6,71 +8,373 @@ from cohdl_xil import ip_block
 from cohdl_xil._common.vivado_project import get_active_project
 
 
+class ProbeType(enum.Enum):
+    # values match the C_PROBE<n>_TYPE parameter of the ila core
+    DATA_AND_TRIGGER = 0
+    # stored in the sample buffer but not usable in trigger conditions
+    DATA = 1
+    # usable in trigger conditions but not stored (no BRAM usage)
+    TRIGGER = 2
+
+    def stored(self):
+        return self is not ProbeType.TRIGGER
+
+    def triggers(self):
+        return self is not ProbeType.DATA
+
+
 @dataclass
-class _DbgConnection:
-    type: type
-    wrapped_name: str
-    local_name: str
-    ip_name: str
+class Probe:
+    """
+    Wraps a probe signal to configure it individually. Plain signals
+    in the `probes` dict of `ila` use `ProbeType.DATA_AND_TRIGGER` and
+    the default comparator count.
+    """
 
+    signal: cohdl.Signal
+    type: ProbeType = ProbeType.DATA_AND_TRIGGER
+    # number of comparators (1-16), None selects the default of `ila`
+    comparators: int | None = None
 
-def ila(clk: cohdl.std.Clock, probes: dict):
-    get_active_project().write_debug_probes()
 
-    ip_ports = {"clk": cohdl.Port.input(cohdl.Bit)}
-    wrapper_ports = {"wrapped_clk": cohdl.Port.input(cohdl.Bit)}
-    wrapper_con = {"wrapped_clk": clk.signal()}
+_allowed_depth = [2**n for n in range(10, 18)]
+
+# width of a single BRAM36 for the possible sample depths
+# (deeper configurations cascade multiple BRAMs per bit)
+_bram36_width = {
+    1024: 36,
+    2048: 18,
+    4096: 9,
+    8192: 4,
+    16384: 2,
+    32768: 1,
+}
+
+
+@dataclass
+class IlaResources:
+    """
+    Rough resource estimate of an ila core. Only the BRAM usage
+    follows directly from the configuration, LUT and FF numbers
+    are approximations of the trigger and pipeline logic and exclude
+    the debug hub shared by all debug cores.
+    """
+
+    stored_bits: int
+    trigger_bits: int
+    bram36: int
+    luts: int
+    ffs: int
+
+    def __str__(self):
+        return (
+            f"ila: {self.stored_bits} stored bits, {self.trigger_bits} trigger bits, "
+            f"~{self.bram36} BRAM36, ~{self.luts} LUTs, ~{self.ffs} FFs"
+        )
+
+
+# maximum width of a single ila probe port
+_MAX_PROBE_WIDTH = 4096
+
 
-    properties = {
-        "CONFIG.ALL_PROBE_SAME_MU": "false",
-        "CONFIG.C_NUM_OF_PROBES": str(len(probes)),
-    }
+@dataclass
+class _Member:
+    # a signal of the `probes` dict, located at bit `lsb` of its probe port
+    name: str
+    signal: cohdl.Signal
+    width: int
+    type: ProbeType
+    comparators: int
+    lsb: int = 0
+
+    def signed(self):
+        return issubclass(self.signal.type, cohdl.Signed)
+
+
+@dataclass
+class _ProbeConfig:
+    # a probe port of the ila core, `name` is the name of the connected net
+    name: str
+    type: ProbeType
+    comparators: int
+    members: list[_Member]
+
+    def width(self):
+        return sum(member.width for member in self.members)
+
+
+def _pack(members: list[_Member], net_prefix: str) -> list[_ProbeConfig]:
+    # combines members with the same type and comparator count
+    # into as few probe ports as possible
+    result: list[_ProbeConfig] = []
+    open_ports: dict[tuple, _ProbeConfig] = {}
+
+    for member in members:
+        key = (member.type, member.comparators)
+        port = open_ports.get(key)
 
-    dbg_connections: list[_DbgConnection] = []
+        if port is None or port.width() + member.width > _MAX_PROBE_WIDTH:
+            port = _ProbeConfig(
+                f"{net_prefix}{len(result)}", member.type, member.comparators, []
+            )
+            open_ports[key] = port
+            result.append(port)
 
-    for nr, (name, value) in enumerate(probes.items()):
-        val_type = value.type
-        wrapped_name = f"wrapped_{name}"
-        local_name = name
-        ip_name = f"probe{nr}"
+        member.lsb = port.width()
+        port.members.append(member)
 
-        wrapper_ports[wrapped_name] = cohdl.Port.input(val_type)
-        wrapper_con[wrapped_name] = value
+    return result
 
-        if issubclass(val_type, cohdl.Bit):
-            width = 1
 
-            ip_ports[ip_name] = cohdl.Port.input(cohdl.BitVector[1])
+@dataclass
+class _IlaConfig:
+    probes: list[_ProbeConfig]
+    data_depth: int
+    input_pipe_stages: int
+    advanced_trigger: bool
+    capture_control: bool
+
+    def check(self):
+        assert len(self.probes) != 0, "at least one probe required"
+        assert (
+            len(self.probes) <= 1024
+        ), f"{len(self.probes)} probes exceed the maximum of 1024"
+        assert (
+            self.data_depth in _allowed_depth
+        ), f"invalid data depth {self.data_depth}, must be a power of 2 in [1024-131072]"
+        assert (
+            0 <= self.input_pipe_stages <= 6
+        ), f"input pipe stages {self.input_pipe_stages} out of range [0-6]"
+
+        for probe in self.probes:
+            assert (
+                1 <= probe.width() <= _MAX_PROBE_WIDTH
+            ), f"width {probe.width()} of probe '{probe.name}' out of range [1-{_MAX_PROBE_WIDTH}]"
+            assert (
+                1 <= probe.comparators <= 16
+            ), f"comparator count {probe.comparators} of probe '{probe.name}' out of range [1-16]"
+
+        assert any(
+            probe.type.stored() for probe in self.probes
+        ), "at least one probe must be stored (type DATA or DATA_AND_TRIGGER)"
+        assert any(
+            probe.type.triggers() for probe in self.probes
+        ), "at least one probe must be usable as trigger (type TRIGGER or DATA_AND_TRIGGER)"
+
+    def properties(self) -> dict[str, str]:
+        result = {
+            "CONFIG.ALL_PROBE_SAME_MU": "false",
+            "CONFIG.C_NUM_OF_PROBES": str(len(self.probes)),
+            "CONFIG.C_DATA_DEPTH": str(self.data_depth),
+            "CONFIG.C_INPUT_PIPE_STAGES": str(self.input_pipe_stages),
+            "CONFIG.C_ADV_TRIGGER": str(self.advanced_trigger).lower(),
+            "CONFIG.C_EN_STRG_QUAL": "1" if self.capture_control else "0",
+        }
 
+        for nr, probe in enumerate(self.probes):
+            result[f"CONFIG.C_PROBE{nr}_WIDTH"] = str(probe.width())
+            result[f"CONFIG.C_PROBE{nr}_TYPE"] = str(probe.type.value)
+            result[f"CONFIG.C_PROBE{nr}_MU_CNT"] = str(probe.comparators)
+
+        return result
+
+    def layout(self) -> dict:
+        # bit layout recorded in the project, used by cohdl_xil.host.ila
+        return {
+            "data_depth": self.data_depth,
+            "ports": [
+                {"net": probe.name, "width": probe.width()} for probe in self.probes
+            ],
+            "probes": [
+                {
+                    "name": member.name,
+                    "port": nr,
+                    "net": probe.name,
+                    "lsb": member.lsb,
+                    "width": member.width,
+                    "signed": member.signed(),
+                    "type": member.type.name,
+                }
+                for nr, probe in enumerate(self.probes)
+                for member in probe.members
+            ],
+        }
+
+    def resources(self) -> IlaResources:
+        stored = sum(p.width() for p in self.probes if p.type.stored())
+        trigger = sum(p.width() for p in self.probes if p.type.triggers())
+        # capture control adds one more comparator to every probe
+        comparators = [
+            p.comparators + self.capture_control
+            for p in self.probes
+            if p.type.triggers()
+        ]
+        comparator_bits = sum(
+            p.width() * (p.comparators + self.capture_control)
+            for p in self.probes
+            if p.type.triggers()
+        )
+
+        if self.data_depth in _bram36_width:
+            width = _bram36_width[self.data_depth]
+            bram36 = -(-stored // width)
         else:
-            width = value.width
+            bram36 = stored * self.data_depth // 32768
+
+        # each comparator needs about one configurable LUT per two probe
+        # bits and a fixed amount of control and result logic,
+        # all probes pass through the input pipeline and a capture register
+        total = sum(p.width() for p in self.probes)
+        luts = (
+            -(-comparator_bits // 2)
+            + 8 * sum(comparators)
+            + (200 if self.advanced_trigger else 100)
+        )
+        ffs = (
+            total * (self.input_pipe_stages + 1)
+            + comparator_bits // 2
+            + 6 * sum(comparators)
+            + 100
+        )
+
+        return IlaResources(stored, trigger, bram36, luts, ffs)
+
+
+def _connect_probe(probe: _ProbeConfig, wrapped: list):
+    # creates the net connected to an ila probe port,
+    # `wrapped` contains the member signals in msb first order
+    if len(wrapped) == 1 and issubclass(wrapped[0].type, cohdl.Bit):
+        local_signal = cohdl.Signal[cohdl.BitVector[1]](name=probe.name)
+
+        @cohdl.std.concurrent
+        def con_logic():
+            local_signal[0] <<= wrapped[0]
+
+    elif len(wrapped) == 1:
+        local_signal = cohdl.Signal[wrapped[0].type](name=probe.name)
+
+        @cohdl.std.concurrent
+        def con_logic():
+            local_signal.next = wrapped[0]
+
+    else:
+        local_signal = cohdl.Signal[cohdl.BitVector[probe.width()]](name=probe.name)
+
+        @cohdl.std.concurrent
+        def con_logic():
+            local_signal.next = cohdl.std.concat(
+                *[cohdl.std.as_bitvector(w) for w in wrapped]
+            )
+
+    return local_signal
+
+
+def ila(
+    clk: cohdl.std.Clock,
+    probes: dict,
+    *,
+    data_depth: int = 1024,
+    comparators: int = 1,
+    input_pipe_stages: int = 0,
+    advanced_trigger: bool = False,
+    capture_control: bool = False,
+    max_bram36: int | None = None,
+    pack_probes: bool = False,
+) -> IlaResources:
+    """
+    Instantiates an integrated logic analyzer monitoring `probes`.
+    The keys of `probes` define the names shown in the Vivado hardware
+    manager, values are signals or `Probe` objects.
+
+    `data_depth` is the number of samples per capture (1024-131072).
+    Every stored probe bit uses `data_depth` bits of block RAM, use
+    probes of type `ProbeType.TRIGGER` for signals only needed in
+    trigger conditions and `ProbeType.DATA` for signals that are
+    only recorded.
+
+    `comparators` is the default number of comparators per probe (1-16),
+    more comparators allow more complex trigger conditions
+    at the cost of additional logic.
+    `input_pipe_stages` (0-6) adds register stages in front of the
+    trigger logic, this relaxes timing for probes from distant or
+    fast parts of the design.
+    `advanced_trigger` enables the trigger state machine and
+    `capture_control` enables storage qualification (only samples
+    matching a capture condition are stored).
+
+    When `pack_probes` is set, probes with the same type and comparator
+    count are concatenated into a single probe port (named
+    `ila<index>_probe<nr>` in the hardware manager). This reduces the
+    per-probe logic of the core. The bit layout of all ila cores is
+    written to `generated/ila_probes.json`, `cohdl_xil.host.ila`
+    uses it to split captured samples into the original probes.
 
-            ip_ports[ip_name] = cohdl.Port.input(cohdl.BitVector[width])
+    Returns an estimate of the resources used by the core.
+    When `max_bram36` is set, configurations with a larger estimated
+    BRAM usage are rejected.
+    """
 
-        dbg_connections.append(
-            _DbgConnection(val_type, wrapped_name, local_name, ip_name)
+    project = get_active_project()
+    index = len(project._ila_cores)
+
+    members = []
+
+    for name, value in probes.items():
+        probe = value if isinstance(value, Probe) else Probe(value)
+        width = 1 if issubclass(probe.signal.type, cohdl.Bit) else probe.signal.width
+
+        members.append(
+            _Member(
+                name,
+                probe.signal,
+                width,
+                probe.type,
+                comparators if probe.comparators is None else probe.comparators,
+            )
         )
-        properties[f"CONFIG.C_PROBE{nr}_WIDTH"] = str(width)
 
-    def architecture(self):
-        ip_connections = {"clk": self.wrapped_clk}
+    if pack_probes:
+        probe_configs = _pack(members, f"ila{index}_probe")
+    else:
+        probe_configs = [
+            _ProbeConfig(m.name, m.type, m.comparators, [m]) for m in members
+        ]
 
-        for con in dbg_connections:
-            if issubclass(con.type, cohdl.Bit):
-                local_signal = cohdl.Signal[cohdl.BitVector[1]](name=con.local_name)
+    config = _IlaConfig(
+        probe_configs, data_depth, input_pipe_stages, advanced_trigger, capture_control
+    )
+    config.check()
 
-                @cohdl.std.concurrent
-                def con_logic():
-                    local_signal[0] <<= getattr(self, con.wrapped_name)
+    resources = config.resources()
 
-            else:
-                local_signal = cohdl.Signal[con.type](name=con.local_name)
+    assert (
+        max_bram36 is None or resources.bram36 <= max_bram36
+    ), f"ila requires ~{resources.bram36} BRAM36 (limit {max_bram36}), reduce data_depth or the number of stored probe bits"
 
-                @cohdl.std.concurrent
-                def con_logic():
-                    local_signal.next = getattr(self, con.wrapped_name)
+    project.add_ila(config.layout())
 
-            ip_connections[con.ip_name] = local_signal
+    ip_ports = {"clk": cohdl.Port.input(cohdl.Bit)}
+    wrapper_ports = {"wrapped_clk": cohdl.Port.input(cohdl.Bit)}
+    wrapper_con = {"wrapped_clk": clk.signal()}
+
+    properties = config.properties()
+
+    for nr, probe in enumerate(probe_configs):
+        ip_ports[f"probe{nr}"] = cohdl.Port.input(cohdl.BitVector[probe.width()])
+
+        for member in probe.members:
+            wrapper_ports[f"wrapped_{member.name}"] = cohdl.Port.input(
+                member.signal.type
+            )
+            wrapper_con[f"wrapped_{member.name}"] = member.signal
+
+    def architecture(self):
+        ip_connections = {"clk": self.wrapped_clk}
+
+        for nr, probe in enumerate(probe_configs):
+            # the first member is placed at the lsb
+            wrapped = [getattr(self, f"wrapped_{m.name}") for m in probe.members][::-1]
+            ip_connections[f"probe{nr}"] = _connect_probe(probe, wrapped)
 
         ip = ip_block(
             name="ila",
@@ -89,3 +393,5 @@ def ila(clk: cohdl.std.Clock, probes: dict):
     )
 
     ip_wrapper(**wrapper_con)
+
+    return resources
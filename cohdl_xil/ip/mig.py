@@ -1,20 +1,426 @@
 from __future__ import annotations
 
+import enum
+import xml.etree.ElementTree as ElementTree
+from dataclasses import dataclass, field, replace
+
 import cohdl
 from cohdl import Bit, BitVector, Port, Signal
 from cohdl_xil import ip_block
 
 
+class Ordering(enum.Enum):
+    # requests are executed in the order they were issued
+    STRICT = enum.auto()
+    # the controller may reorder requests to improve efficiency
+    NORMAL = enum.auto()
+
+    def config_str(self):
+        return {Ordering.STRICT: "Strict", Ordering.NORMAL: "Normal"}[self]
+
+
+class BurstType(enum.Enum):
+    SEQUENTIAL = enum.auto()
+    INTERLEAVED = enum.auto()
+
+    def config_str(self):
+        return {
+            BurstType.SEQUENTIAL: "Sequential",
+            BurstType.INTERLEAVED: "Interleaved",
+        }[self]
+
+
+class PhyRatio(enum.Enum):
+    # ratio between the memory clock and the user interface clock
+    RATIO_4_1 = enum.auto()
+    RATIO_2_1 = enum.auto()
+
+    def config_str(self):
+        return {PhyRatio.RATIO_4_1: "4:1", PhyRatio.RATIO_2_1: "2:1"}[self]
+
+    def ratio(self):
+        return {PhyRatio.RATIO_4_1: 4, PhyRatio.RATIO_2_1: 2}[self]
+
+
+def _from_config_str(enum_type, value: str):
+    for option in enum_type:
+        if option.config_str() == value:
+            return option
+
+    raise AssertionError(f"invalid {enum_type.__name__} '{value}'")
+
+
+def _fmt_number(value: float):
+    # short, deterministic number format (45.0 -> '45', 7.80 -> '7.8')
+    return f"{value:g}"
+
+
+@dataclass(frozen=True)
+class MigPin:
+    name: str
+    pad: str
+    iostandard: str
+
+    def render(self):
+        return (
+            f'<Pin IN_TERM="" IOSTANDARD="{self.iostandard}" PADName="{self.pad}" '
+            f'SLEW="" VCCAUX_IO="" name="{self.name}"/>'
+        )
+
+
+@dataclass(frozen=True)
+class MigTiming:
+    """
+    Memory timing parameters in ns (trefi in us).
+    """
+
+    tfaw: float
+    tras: float
+    trcd: float
+    trefi: float
+    trfc: float
+    trp: float
+    trrd: float
+    trtp: float
+    twtr: float
+
+    def render(self):
+        # attributes in alphabetical order like the MIG GUI writes them
+        attrs = " ".join(
+            f'{name}="{_fmt_number(getattr(self, name))}"'
+            for name in sorted(self.__dataclass_fields__)
+        )
+        return f"<Parameters {attrs}/>"
+
+
+@dataclass(frozen=True)
+class MigAxiParameters:
+    """
+    AXI4 slave configuration, the MIG uses its native
+    interface when the controller has no AXI parameters.
+    """
+
+    addr_width: int = 27
+    data_width: int = 128
+    id_width: int = 4
+    # TDM, ROUND_ROBIN, RD_PRI_REG, RD_PRI_REG_STARVE_LIMIT or WRITE_PRIORITY
+    rd_wr_arbitration: str = "RD_PRI_REG"
+    narrow_burst: bool = False
+
+    def __post_init__(self):
+        assert self.rd_wr_arbitration in (
+            "TDM",
+            "ROUND_ROBIN",
+            "RD_PRI_REG",
+            "RD_PRI_REG_STARVE_LIMIT",
+            "WRITE_PRIORITY",
+        ), f"invalid arbitration algorithm {self.rd_wr_arbitration}"
+
+
+@dataclass(frozen=True)
+class MigController:
+    """
+    Configuration of a single memory controller. Only the parameters
+    relevant for performance tuning are exposed, all other options
+    use the defaults of the MIG GUI.
+    """
+
+    memory_device: str
+    # memory clock period in ps
+    time_period: int
+    # frequency of the system clock in MHz
+    input_clk_freq: float
+    pins: tuple[MigPin, ...]
+    timing: MigTiming
+    phy_ratio: PhyRatio = PhyRatio.RATIO_4_1
+    ordering: Ordering = Ordering.STRICT
+    bank_machines: int = 4
+    burst_type: BurstType = BurstType.SEQUENTIAL
+    burst_length: int = 8
+    cas_latency: int = 5
+    write_recovery: int = 5
+    data_width: int = 16
+    row_address: int = 13
+    col_address: int = 10
+    bank_address: int = 3
+    address_map: str = "BANK_ROW_COLUMN"
+    mmcm_vco: int = 1200
+    vcc_aux_io: str = "1.8V"
+    rtt: str = "50ohms"
+    output_drive_strength: str = "Fullstrength"
+    axi: MigAxiParameters | None = None
+
+    def __post_init__(self):
+        assert 2 <= self.bank_machines <= 8, "bank_machines must be in range [2, 8]"
+        assert self.burst_length in (4, 8), "burst_length must be 4 or 8"
+        assert self.address_map in (
+            "BANK_ROW_COLUMN",
+            "ROW_BANK_COLUMN",
+            "ROW_COLUMN_BANK",
+        ), f"invalid address map {self.address_map}"
+
+    def ui_frequency(self):
+        """
+        Returns the frequency of the user interface clock in MHz
+        (rounded to 0.1MHz like the MIG GUI displays it).
+        """
+
+        return round(1e6 / self.time_period / self.phy_ratio.ratio(), 1)
+
+    def render(self):
+        if self.axi is None:
+            port_interface = "    <PortInterface>NATIVE</PortInterface>"
+        else:
+            axi = self.axi
+            port_interface = f"""    <PortInterface>AXI</PortInterface>
+    <AXIParameters>
+      <C0_C_RD_WR_ARB_ALGORITHM>{axi.rd_wr_arbitration}</C0_C_RD_WR_ARB_ALGORITHM>
+      <C0_S_AXI_ADDR_WIDTH>{axi.addr_width}</C0_S_AXI_ADDR_WIDTH>
+      <C0_S_AXI_DATA_WIDTH>{axi.data_width}</C0_S_AXI_DATA_WIDTH>
+      <C0_S_AXI_ID_WIDTH>{axi.id_width}</C0_S_AXI_ID_WIDTH>
+      <C0_S_AXI_SUPPORTS_NARROW_BURST>{int(axi.narrow_burst)}</C0_S_AXI_SUPPORTS_NARROW_BURST>
+    </AXIParameters>"""
+
+        # pins are sorted so the output does not depend on their order
+        pins = "\n".join(
+            f"      {pin.render()}" for pin in sorted(self.pins, key=lambda p: p.name)
+        )
+
+        return f"""  <Controller number="0">
+    <MemoryDevice>{self.memory_device}</MemoryDevice>
+    <TimePeriod>{self.time_period}</TimePeriod>
+    <VccAuxIO>{self.vcc_aux_io}</VccAuxIO>
+    <PHYRatio>{self.phy_ratio.config_str()}</PHYRatio>
+    <InputClkFreq>{_fmt_number(self.input_clk_freq)}</InputClkFreq>
+    <UIExtraClocks>0</UIExtraClocks>
+    <MMCM_VCO>{self.mmcm_vco}</MMCM_VCO>
+    <MMCMClkOut0> 1.000</MMCMClkOut0>
+    <MMCMClkOut1>1</MMCMClkOut1>
+    <MMCMClkOut2>1</MMCMClkOut2>
+    <MMCMClkOut3>1</MMCMClkOut3>
+    <MMCMClkOut4>1</MMCMClkOut4>
+    <DataWidth>{self.data_width}</DataWidth>
+    <DeepMemory>1</DeepMemory>
+    <DataMask>1</DataMask>
+    <ECC>Disabled</ECC>
+    <Ordering>{self.ordering.config_str()}</Ordering>
+    <BankMachineCnt>{self.bank_machines}</BankMachineCnt>
+    <CustomPart>FALSE</CustomPart>
+    <NewPartName/>
+    <RowAddress>{self.row_address}</RowAddress>
+    <ColAddress>{self.col_address}</ColAddress>
+    <BankAddress>{self.bank_address}</BankAddress>
+    <UserMemoryAddressMap>{self.address_map}</UserMemoryAddressMap>
+    <PinSelection>
+{pins}
+    </PinSelection>
+    <System_Control>
+      <Pin Bank="Select Bank" PADName="No connect" name="sys_rst"/>
+      <Pin Bank="Select Bank" PADName="No connect" name="init_calib_complete"/>
+      <Pin Bank="Select Bank" PADName="No connect" name="tg_compare_error"/>
+    </System_Control>
+    <TimingParameters>
+      {self.timing.render()}
+    </TimingParameters>
+    <mrBurstLength name="Burst Length">{self.burst_length}</mrBurstLength>
+    <mrBurstType name="Burst Type">{self.burst_type.config_str()}</mrBurstType>
+    <mrCasLatency name="CAS Latency">{self.cas_latency}</mrCasLatency>
+    <mrMode name="Mode">Normal</mrMode>
+    <mrDllReset name="DLL Reset">No</mrDllReset>
+    <mrPdMode name="PD Mode">Fast exit</mrPdMode>
+    <mrWriteRecovery name="Write Recovery">{self.write_recovery}</mrWriteRecovery>
+    <emrDllEnable name="DLL Enable">Enable-Normal</emrDllEnable>
+    <emrOutputDriveStrength name="Output Drive Strength">{self.output_drive_strength}</emrOutputDriveStrength>
+    <emrCSSelection name="Controller Chip Select Pin">Enable</emrCSSelection>
+    <emrCKSelection name="Memory Clock Selection">1</emrCKSelection>
+    <emrRTT name="RTT (nominal) - ODT">{self.rtt}</emrRTT>
+    <emrPosted name="Additive Latency (AL)">0</emrPosted>
+    <emrOCD name="OCD Operation">OCD Exit</emrOCD>
+    <emrDQS name="DQS# Enable">Enable</emrDQS>
+    <emrRDQS name="RDQS Enable">Disable</emrRDQS>
+    <emrOutputs name="Outputs">Enable</emrOutputs>
+{port_interface}
+  </Controller>"""
+
+
+@dataclass(frozen=True)
+class MigProject:
+    """
+    Python model of a MIG `.prj` file for a single DDR2 controller.
+
+    `render` turns the model into the XML content expected by the
+    mig_7series IP. The output only depends on the field values, so an
+    unchanged configuration produces an identical file and the
+    generated IP is reused by the build.
+
+    Use `MigProject.parse` to load a project created by the MIG GUI
+    and `dataclasses.replace` (or `with_controller`) to derive
+    modified configurations.
+    """
+
+    controller: MigController
+    module_name: str = "ddr2_memory"
+    target_fpga: str = "xc7a100t-csg324/-1"
+    fpga_device: str = "7a/xc7a100ti-csg324"
+    system_clock: str = "No Buffer"
+    reference_clock: str = "Use System Clock"
+    sys_reset_polarity: str = "ACTIVE LOW"
+
+    def with_controller(self, **changes):
+        """
+        Returns a copy of this project with the given controller fields replaced.
+        """
+
+        return replace(self, controller=replace(self.controller, **changes))
+
+    def render(self) -> str:
+        return f"""<?xml version="1.0" encoding="UTF-8" standalone="no" ?>
+<Project NoOfControllers="1">
+
+  <ModuleName>{self.module_name}</ModuleName>
+
+  <dci_inouts_inputs>1</dci_inouts_inputs>
+
+  <dci_inputs>1</dci_inputs>
+
+  <Debug_En>OFF</Debug_En>
+
+  <DataDepth_En>1024</DataDepth_En>
+
+  <LowPower_En>ON</LowPower_En>
+
+  <XADC_En>Enabled</XADC_En>
+
+  <TargetFPGA>{self.target_fpga}</TargetFPGA>
+
+  <Version>4.2</Version>
+
+  <SystemClock>{self.system_clock}</SystemClock>
+
+  <ReferenceClock>{self.reference_clock}</ReferenceClock>
+
+  <SysResetPolarity>{self.sys_reset_polarity}</SysResetPolarity>
+
+  <BankSelectionFlag>FALSE</BankSelectionFlag>
+
+  <InternalVref>1</InternalVref>
+
+  <dci_hr_inouts_inputs>50 Ohms</dci_hr_inouts_inputs>
+
+  <dci_cascade>0</dci_cascade>
+
+  <FPGADevice>
+    <selected>{self.fpga_device}</selected>
+  </FPGADevice>
+
+{self.controller.render()}
+
+
+</Project>
+"""
+
+    @staticmethod
+    def parse(prj_file_content: str) -> MigProject:
+        """
+        Creates a `MigProject` from the content of a `.prj` file
+        generated by the MIG GUI. Options not covered by the model
+        are replaced with their defaults.
+        """
+
+        root = ElementTree.fromstring(prj_file_content.lstrip("\ufeff"))
+        assert root.get("NoOfControllers") == "1", "only one controller supported"
+
+        ctrl = root.find("Controller")
+
+        def text(node, tag):
+            return node.findtext(tag).strip()
+
+        def mode_register(tag):
+            return ctrl.find(tag).text.strip()
+
+        pins = tuple(
+            MigPin(pin.get("name"), pin.get("PADName"), pin.get("IOSTANDARD"))
+            for pin in ctrl.find("PinSelection")
+        )
+
+        timing = MigTiming(
+            **{
+                name: float(value)
+                for name, value in ctrl.find("TimingParameters/Parameters").items()
+            }
+        )
+
+        axi = None
+
+        if text(ctrl, "PortInterface") == "AXI":
+            axi_node = ctrl.find("AXIParameters")
+            axi = MigAxiParameters(
+                addr_width=int(text(axi_node, "C0_S_AXI_ADDR_WIDTH")),
+                data_width=int(text(axi_node, "C0_S_AXI_DATA_WIDTH")),
+                id_width=int(text(axi_node, "C0_S_AXI_ID_WIDTH")),
+                rd_wr_arbitration=text(axi_node, "C0_C_RD_WR_ARB_ALGORITHM"),
+                narrow_burst=text(axi_node, "C0_S_AXI_SUPPORTS_NARROW_BURST") == "1",
+            )
+
+        controller = MigController(
+            memory_device=text(ctrl, "MemoryDevice"),
+            time_period=int(text(ctrl, "TimePeriod")),
+            input_clk_freq=float(text(ctrl, "InputClkFreq")),
+            pins=pins,
+            timing=timing,
+            phy_ratio=_from_config_str(PhyRatio, text(ctrl, "PHYRatio")),
+            ordering=_from_config_str(Ordering, text(ctrl, "Ordering")),
+            bank_machines=int(text(ctrl, "BankMachineCnt")),
+            burst_type=_from_config_str(BurstType, mode_register("mrBurstType")),
+            burst_length=int(mode_register("mrBurstLength")),
+            cas_latency=int(mode_register("mrCasLatency")),
+            write_recovery=int(mode_register("mrWriteRecovery")),
+            data_width=int(text(ctrl, "DataWidth")),
+            row_address=int(text(ctrl, "RowAddress")),
+            col_address=int(text(ctrl, "ColAddress")),
+            bank_address=int(text(ctrl, "BankAddress")),
+            address_map=text(ctrl, "UserMemoryAddressMap"),
+            mmcm_vco=int(text(ctrl, "MMCM_VCO")),
+            vcc_aux_io=text(ctrl, "VccAuxIO"),
+            rtt=mode_register("emrRTT"),
+            output_drive_strength=mode_register("emrOutputDriveStrength"),
+            axi=axi,
+        )
+
+        return MigProject(
+            controller=controller,
+            module_name=text(root, "ModuleName"),
+            target_fpga=text(root, "TargetFPGA"),
+            fpga_device=text(root, "FPGADevice/selected"),
+            system_clock=text(root, "SystemClock"),
+            reference_clock=text(root, "ReferenceClock"),
+            sys_reset_polarity=text(root, "SysResetPolarity"),
+        )
+
+
 def mig(
     *,
-    prj_file_content: str,
     properties: dict[str, str],
     ports: dict[str, Port],
     signals: dict[str, Signal],
+    prj_file_content: str | None = None,
+    project: MigProject | None = None,
     module_name="mig_design",
 ):
+    """
+    Instantiates a mig_7series IP configured by either the raw content
+    of a `.prj` file (`prj_file_content`) or a `MigProject`.
+    """
+
     from cohdl_xil._common.vivado_project import get_active_project
 
+    assert (prj_file_content is None) != (
+        project is None
+    ), "exactly one of prj_file_content and project is required"
+
+    if project is not None:
+        prj_file_content = project.render()
+
     prj_file_dep = get_active_project().add_dependency(
         "mig_proj_file.prj", prj_file_content, make_unique=True
     )
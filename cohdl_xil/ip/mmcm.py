@@ -1,12 +1,14 @@
 from __future__ import annotations
 
 import cohdl
-from cohdl import Port, Bit, Signal, Block
+from cohdl import Port, Bit, BitVector, Unsigned, Signal, Block
 from cohdl_xil._common import IpBase
 from cohdl import std
 
 from dataclasses import dataclass
 
+Axi4Light = std.axi.axi4_light.Axi4Light
+
 
 class FloatRange:
     @staticmethod
@@ -65,14 +67,226 @@ class FloatRange:
         return FloatRange(self.lower / other, self.upper / other)
 
 
-class _MmcmImpl:
+@dataclass(frozen=True)
+class _PrimitiveSpec:
+    # prefix of the clk_wiz properties of the primitive
+    name: str
+    max_outputs: int
+    out_range: FloatRange
+    vco_range: FloatRange
+    pfd_range: FloatRange
+    mult_step: float
+    max_mult: int
+    max_div: int
+    max_out_div: int
+    # the MMCM supports fractional dividers
+    # in steps of 1/8 for its first output
+    fractional_out0: bool
+    clkin_period_property: str
+    mult_property: str
+    fine_phase_shift: bool
+
+    def out_div_step(self, nr: int):
+        return 1 / 8 if nr == 0 and self.fractional_out0 else 1
+
+    def possible_out_div(self, nr: int):
+        step = self.out_div_step(nr)
+        return [
+            x * step for x in range(round(1 / step), round(self.max_out_div / step))
+        ]
+
+    def out_div_property(self, nr: int):
+        if nr == 0 and self.fractional_out0:
+            return f"CONFIG.{self.name}_CLKOUT0_DIVIDE_F"
+        return f"CONFIG.{self.name}_CLKOUT{nr}_DIVIDE"
+
+
+# limits of the Artix-7 -1 speed grade (DS181)
+_MMCM = _PrimitiveSpec(
+    name="MMCM",
+    max_outputs=7,
+    out_range=FloatRange(4.687, 800.0),
+    vco_range=FloatRange(600.0, 1200.0),
+    pfd_range=FloatRange(10.0, 450.0),
+    mult_step=1 / 8,
+    max_mult=64,
+    max_div=106,
+    max_out_div=128,
+    fractional_out0=True,
+    clkin_period_property="CONFIG.MMCM_CLKIN1_PERIOD",
+    mult_property="CONFIG.MMCM_CLKFBOUT_MULT_F",
+    fine_phase_shift=True,
+)
+
+_PLL = _PrimitiveSpec(
+    name="PLL",
+    max_outputs=6,
+    out_range=FloatRange(6.25, 800.0),
+    vco_range=FloatRange(800.0, 1600.0),
+    pfd_range=FloatRange(19.0, 450.0),
+    mult_step=1,
+    max_mult=64,
+    max_div=56,
+    max_out_div=128,
+    fractional_out0=False,
+    clkin_period_property="CONFIG.PLL_CLKIN_PERIOD",
+    mult_property="CONFIG.PLL_CLKFBOUT_MULT",
+    fine_phase_shift=False,
+)
+
+
+@dataclass
+class _Solution:
+    f_vco: float
+    mult: float
+    div: int
+    out_div: list[float]
+
+
+def _fmt_div(value: float, step: float):
+    return str(value) if step != 1 else str(round(value))
+
+
+@dataclass(frozen=True)
+class _Shape:
+    # static phase offset in degrees of the output clock
+    phase: float = 0.0
+    duty_cycle: float = 0.5
+
+    def is_default(self):
+        return self.phase == 0.0 and self.duty_cycle == 0.5
+
+
+def _is_multiple(value: float, step: float):
+    return abs(value / step - round(value / step)) < 1e-6
+
+
+def _phase_step(div: float):
+    # static phase shifts are applied in steps of 1/8 VCO period
+    return 45 / div
+
+
+def _duty_step(div: float):
+    return 0.5 / div
+
+
+def _check_shape(div: float, shape: _Shape):
+    """
+    Returns None when an output with divider `div` can produce the
+    phase and duty cycle defined by `shape` or a description
+    of the violated constraint otherwise.
+    """
+
+    if not _is_multiple(shape.phase, _phase_step(div)):
+        return f"phase {shape.phase} is not a multiple of the phase step {_phase_step(div)} degrees"
+
+    if shape.duty_cycle == 0.5:
+        return None
+
+    # fractional dividers only support a duty cycle of 50%
+    if div % 1 != 0 or div == 1:
+        return f"output divider {div} only supports a duty cycle of 0.5"
+
+    if not 0 < shape.duty_cycle < 1 or not _is_multiple(
+        shape.duty_cycle, _duty_step(div)
+    ):
+        return f"duty cycle {shape.duty_cycle} is not a multiple of the duty cycle step {_duty_step(div)}"
+
+    return None
+
+
+def _find_out_div(
+    spec: _PrimitiveSpec,
+    nr: int,
+    f_vco: float,
+    output: FloatRange,
+    shape: _Shape = _Shape(),
+):
+    step = spec.out_div_step(nr)
+    div = round(f_vco / output.midpoint() / step) * step
+
+    for candidate in (div, div - step, div + step):
+        if (
+            1 <= candidate < spec.max_out_div
+            and f_vco / candidate in output
+            and _check_shape(candidate, shape) is None
+        ):
+            return candidate
+
+    return None
+
+
+def _solve(
+    spec: _PrimitiveSpec,
+    freq_in: float,
+    outputs: list[FloatRange],
+    shapes: list[_Shape] | None = None,
+):
+    """
+    Searches multiplier and divider values for the primitive described by `spec`
+    that produce all `outputs` from the input frequency `freq_in` (in MHz).
+    When `shapes` is set, the output dividers must also support
+    the requested phase offsets and duty cycles.
+
+    Returns None when no valid configuration exists.
+    """
+
+    if not 0 < len(outputs) <= spec.max_outputs:
+        return None
+
+    if shapes is None:
+        shapes = [_Shape()] * len(outputs)
+
+    # tolerate floating point rounding for exact frequency requests
+    outputs = [FloatRange(o.lower * (1 - 1e-9), o.upper * (1 + 1e-9)) for o in outputs]
+
+    possible_f_vco = FloatRange.filter_overlapping(
+        [spec.vco_range],
+        *[
+            [o * div for div in spec.possible_out_div(nr)]
+            for nr, o in enumerate(outputs)
+        ],
+    )
+
+    for f_vco_range in possible_f_vco:
+        quot = f_vco_range / freq_in
+
+        for d in range(1, spec.max_div + 1):
+            if freq_in / d not in spec.pfd_range:
+                continue
+
+            m = round(quot.midpoint() * d / spec.mult_step) * spec.mult_step
+
+            if m < 2:
+                continue
+            if m > spec.max_mult:
+                break
+
+            if m / d not in quot:
+                continue
+
+            f_vco = freq_in * m / d
+            out_div = [
+                _find_out_div(spec, nr, f_vco, o, shape)
+                for nr, (o, shape) in enumerate(zip(outputs, shapes))
+            ]
+
+            if None not in out_div:
+                return _Solution(f_vco, m, d, out_div)
+
+    return None
+
+
+class _ClkWizImpl:
     def __init__(
         self,
+        spec: _PrimitiveSpec,
         clk: std.Clock,
         reset: std.Reset,
         locked: Signal[Bit],
         mult: float,
         div: int,
+        axi: Axi4Light | None = None,
     ):
         self.ip = IpBase(
             name="clk_wiz",
@@ -85,6 +299,7 @@ class _MmcmImpl:
         freq_mhz = clk.frequency().megahertz()
         period = 1 / freq_mhz * 1000
 
+        self._spec = spec
         self._outcnt = 0
 
         self._freq_int = freq_mhz * mult / div
@@ -92,38 +307,104 @@ class _MmcmImpl:
         self._div = div
         self._locked = locked
 
+        if spec is _PLL:
+            self.ip.set_property("CONFIG.PRIMITIVE", "PLL")
+
         self.ip.set_property("CONFIG.PRIM_IN_FREQ", str(freq_mhz))
-        self.ip.set_property("CONFIG.MMCM_CLKIN1_PERIOD", str(period))
-        self.ip.set_property("CONFIG.MMCM_CLKFBOUT_MULT_F", str(mult))
-        self.ip.set_property("CONFIG.MMCM_DIVCLK_DIVIDE", str(div))
+        self.ip.set_property(spec.clkin_period_property, str(period))
+        self.ip.set_property(spec.mult_property, _fmt_div(mult, spec.mult_step))
+        self.ip.set_property(f"CONFIG.{spec.name}_DIVCLK_DIVIDE", str(div))
 
         self.ip.add_port(Port.input(Bit, name="clk_in1"), clk.signal())
-        self.ip.add_port(Port.input(Bit, name="reset"), reset.active_high_signal())
         self.ip.add_port(Port.output(Bit, name="locked"), locked)
 
+        if axi is None:
+            self.ip.add_port(Port.input(Bit, name="reset"), reset.active_high_signal())
+        else:
+            # the dynamic reconfiguration interface replaces the reset input,
+            # the primitive is reset together with the AXI interface
+            self.ip.set_property("CONFIG.USE_DYN_RECONFIG", "true")
+            self.ip.set_property("CONFIG.INTERFACE_SELECTION", "Enable_AXI")
+            self._add_axi_ports(axi)
+
+    def _add_axi_ports(self, axi: Axi4Light):
+        addr_width = axi.addr_width()
+
+        for port, signal in [
+            (Port.input(Bit, name="s_axi_aclk"), axi.clk.signal()),
+            (Port.input(Bit, name="s_axi_aresetn"), axi.reset.active_low_signal()),
+            (Port.input(BitVector[addr_width], name="s_axi_awaddr"), axi.wraddr.awaddr),
+            (Port.input(Bit, name="s_axi_awvalid"), axi.wraddr.valid),
+            (Port.output(Bit, name="s_axi_awready"), axi.wraddr.ready),
+            (Port.input(BitVector[32], name="s_axi_wdata"), axi.wrdata.wdata),
+            (Port.input(BitVector[4], name="s_axi_wstrb"), axi.wrdata.wstrb),
+            (Port.input(Bit, name="s_axi_wvalid"), axi.wrdata.valid),
+            (Port.output(Bit, name="s_axi_wready"), axi.wrdata.ready),
+            (Port.output(BitVector[2], name="s_axi_bresp"), axi.wrresp.bresp),
+            (Port.output(Bit, name="s_axi_bvalid"), axi.wrresp.valid),
+            (Port.input(Bit, name="s_axi_bready"), axi.wrresp.ready),
+            (Port.input(BitVector[addr_width], name="s_axi_araddr"), axi.rdaddr.araddr),
+            (Port.input(Bit, name="s_axi_arvalid"), axi.rdaddr.valid),
+            (Port.output(Bit, name="s_axi_arready"), axi.rdaddr.ready),
+            (Port.output(BitVector[32], name="s_axi_rdata"), axi.rddata.rdata),
+            (Port.output(BitVector[2], name="s_axi_rresp"), axi.rddata.rresp),
+            (Port.output(Bit, name="s_axi_rvalid"), axi.rddata.valid),
+            (Port.input(Bit, name="s_axi_rready"), axi.rddata.ready),
+        ]:
+            self.ip.add_port(port, signal)
+
+    def enable_phase_shift(self, shifter: PhaseShifter):
+        self.ip.set_property("CONFIG.USE_DYN_PHASE_SHIFT", "true")
+
+        self.ip.add_port(Port.input(Bit, name="psclk"), shifter._ctx.clk().signal())
+        self.ip.add_port(Port.input(Bit, name="psen"), shifter._psen)
+        self.ip.add_port(Port.input(Bit, name="psincdec"), shifter._psincdec)
+        self.ip.add_port(Port.output(Bit, name="psdone"), shifter._psdone)
+
     def instantiate(self):
         self.ip.instantiate()
 
-    def reserve_output(self, divide, signal=None):
+    def reserve_output(
+        self,
+        divide,
+        signal=None,
+        shape: _Shape = _Shape(),
+        fine_phase_shift=False,
+    ):
         self._outcnt += 1
+        nr = self._outcnt - 1
+        name = self._spec.name
 
         if self._outcnt > 1:
             self.ip.set_property(f"CONFIG.CLKOUT{self._outcnt}_USED", "true")
 
         self.ip.set_property("CONFIG.NUM_OUT_CLKS", str(self._outcnt))
-
-        if self._outcnt == 1:
-            self.ip.set_property("CONFIG.MMCM_CLKOUT0_DIVIDE_F", str(divide))
-        else:
-            self.ip.set_property(
-                f"CONFIG.MMCM_CLKOUT{self._outcnt-1}_DIVIDE", str(divide)
-            )
+        self.ip.set_property(
+            self._spec.out_div_property(nr),
+            _fmt_div(divide, self._spec.out_div_step(nr)),
+        )
 
         freq = self._freq_int / divide
         self.ip.set_property(
             f"CONFIG.CLKOUT{self._outcnt}_REQUESTED_OUT_FREQ", str(freq)
         )
 
+        if not shape.is_default():
+            self.ip.set_property(
+                f"CONFIG.CLKOUT{self._outcnt}_REQUESTED_PHASE", str(shape.phase)
+            )
+            self.ip.set_property(
+                f"CONFIG.CLKOUT{self._outcnt}_REQUESTED_DUTY_CYCLE",
+                str(shape.duty_cycle * 100),
+            )
+            self.ip.set_property(f"CONFIG.{name}_CLKOUT{nr}_PHASE", str(shape.phase))
+            self.ip.set_property(
+                f"CONFIG.{name}_CLKOUT{nr}_DUTY_CYCLE", str(shape.duty_cycle)
+            )
+
+        if fine_phase_shift:
+            self.ip.set_property(f"CONFIG.{name}_CLKOUT{nr}_USE_FINE_PS", "true")
+
         if signal is None:
             signal = Signal[Bit](name=f"mmcm_out_{self._outcnt}")
 
@@ -132,91 +413,484 @@ class _MmcmImpl:
         return std.Clock(signal)
 
 
-class Mmcm:
-    @dataclass
-    class OutputInfo:
-        frequency: FloatRange
-        signal: Signal[Bit]
-        possible_div: list[float]
+@dataclass
+class _OutputInfo:
+    frequency: FloatRange
+    signal: Signal[Bit]
+    shape: _Shape = _Shape()
+    fine_phase_shift: bool = False
 
-        def possible_f_int(self):
-            return [self.frequency * div for div in self.possible_div]
 
-    def _instantiate(self):
-        if len(self._output_info) == 0:
-            print("MMCM not instantiated because no outputs are used")
-            return
+def _solve_outputs(spec: _PrimitiveSpec, freq_in: float, outputs: list[_OutputInfo]):
+    return _solve(
+        spec, freq_in, [o.frequency for o in outputs], [o.shape for o in outputs]
+    )
 
-        freq = self.clk.frequency().megahertz()
 
-        possible_f_int = FloatRange.filter_overlapping(
-            *[o.possible_f_int() for o in self._output_info]
-        )
+def _shape_error_message(
+    spec: _PrimitiveSpec, freq_in: float, outputs: list[_OutputInfo]
+):
+    # check if the frequencies can be reached without the phase and
+    # duty cycle constraints and report the step sizes of that solution
+    solution = _solve(spec, freq_in, [o.frequency for o in outputs])
+
+    if solution is None:
+        return "could not reach requested output frequencies"
+
+    problems = [
+        f"output {nr}: {msg}"
+        for nr, (o, div) in enumerate(zip(outputs, solution.out_div))
+        if (msg := _check_shape(div, o.shape)) is not None
+    ]
+
+    return (
+        f"could not reach requested phases or duty cycles (VCO {solution.f_vco} MHz), "
+        + ", ".join(problems)
+    )
+
 
-        assert len(possible_f_int) != 0, "could not reach requested output frequencies"
+def _instantiate_primitive(
+    spec: _PrimitiveSpec,
+    clk: std.Clock,
+    reset: std.Reset,
+    locked: Signal[Bit],
+    outputs: list[_OutputInfo],
+    axi: Axi4Light | None = None,
+    shifter: PhaseShifter | None = None,
+):
+    freq_in = clk.frequency().megahertz()
+    solution = _solve_outputs(spec, freq_in, outputs)
 
-        def find_m_d():
-            for f_int in possible_f_int:
-                quot = f_int / freq
+    assert solution is not None, _shape_error_message(spec, freq_in, outputs)
 
-                for d in range(1, 107):
-                    m = round(quot.midpoint() * d * 8) / 8
+    impl = _ClkWizImpl(spec, clk, reset, locked, solution.mult, solution.div, axi)
 
-                    if m < 2:
-                        continue
-                    if m > 64:
-                        break
+    for o, div in zip(outputs, solution.out_div):
+        impl.reserve_output(div, o.signal, o.shape, o.fine_phase_shift)
 
-                    if m * d in quot:
-                        return f_int.midpoint(), m, d
-            raise AssertionError("could not reach requested output frequencies")
+    if shifter is not None:
+        shifter._step_ps = 1e6 / (56 * solution.f_vco)
+        impl.enable_phase_shift(shifter)
 
-        f_int, m, d = find_m_d()
+    impl.instantiate()
 
-        mmcm = _MmcmImpl(self.clk, self.reset, self._locked, m, d)
 
-        for o in self._output_info:
-            freq = o.frequency.midpoint()
-            div = round(f_int / freq * 8) / 8
-            mmcm.reserve_output(div, o.signal)
+class PhaseShifter:
+    """
+    Controls the dynamic fine phase shift of all MMCM outputs
+    reserved with `fine_phase_shift=True`.
+    Each step moves the phase by 1/56 of the VCO period.
+    """
 
-        mmcm.instantiate()
+    def __init__(self, ctx: std.SequentialContext):
+        self._ctx = ctx
+        self._step_ps: float | None = None
+
+        self._psen = Signal[Bit](False, name="psen")
+        self._psincdec = Signal[Bit](False, name="psincdec")
+        self._psdone = Signal[Bit](name="psdone")
+
+    def step_size(self):
+        """
+        Returns the phase shift per step in picoseconds.
+        Only available after the MMCM was instantiated.
+        """
+
+        assert self._step_ps is not None, "step size is known after instantiation"
+        return self._step_ps
+
+    async def step(self, increment=True):
+        """
+        Shifts the phase by one step and waits until the MMCM applied it.
+        """
+
+        self._psincdec <<= increment
+        self._psen ^= True
+        await self._psdone
+
+
+class _ClockManager:
+    _spec: _PrimitiveSpec
+
+    OutputInfo = _OutputInfo
+
+    def _instantiate(self):
+        if len(self._output_info) == 0:
+            print(f"{self._spec.name} not instantiated because no outputs are used")
+            return
+
+        assert (self._phase_shifter is not None) == any(
+            o.fine_phase_shift for o in self._output_info
+        ), "phase_shifter() must be used when outputs use fine phase shifts"
+
+        _instantiate_primitive(
+            self._spec,
+            self.clk,
+            self.reset,
+            self._locked,
+            self._output_info,
+            self._reconfig_axi,
+            self._phase_shifter,
+        )
 
     def __init__(self, clk: std.Clock, reset: std.Reset):
         self.clk = clk
         self.reset = reset
-        self._output_info: list[Mmcm.OutputInfo] = []
-        self._cnt = 0
+        self._output_info: list[_OutputInfo] = []
         self._locked = Signal[Bit](name="locked")
+        self._reconfig_axi: Axi4Light | None = None
+        self._phase_shifter: PhaseShifter | None = None
 
         cohdl.on_block_exit(self._instantiate)
 
     def locked(self):
         return self._locked
 
-    def reserve(self, frequency: std.Frequency, allowed_error=0):
+    def phase_shifter(self, ctx: std.SequentialContext):
+        """
+        Returns the `PhaseShifter` used to adjust the phase of outputs
+        reserved with `fine_phase_shift=True`. The phase shift interface
+        is clocked by `ctx`.
+        """
+
+        assert self._spec.fine_phase_shift, "fine phase shift requires an Mmcm"
+
+        if self._phase_shifter is None:
+            self._phase_shifter = PhaseShifter(ctx)
+        else:
+            assert self._phase_shifter._ctx is ctx
+
+        return self._phase_shifter
+
+    def reserve(
+        self,
+        frequency: std.Frequency,
+        allowed_error=0,
+        *,
+        phase: float = 0.0,
+        duty_cycle: float = 0.5,
+        fine_phase_shift=False,
+    ):
+        """
+        Returns a new clock with the given frequency.
+
+        `phase` is a static phase offset of the output in degrees and
+        `duty_cycle` the fraction of the period in which the clock is high.
+        Both are checked against the step sizes of the chosen VCO frequency
+        and output divider. When `fine_phase_shift` is set, the phase of
+        the output can be adjusted at runtime using `phase_shifter`.
+        """
+
         assert isinstance(frequency, std.Frequency)
 
+        spec = self._spec
         frequency_mhz = frequency.megahertz()
 
         assert (
-            4.687 <= frequency_mhz <= 800.000
-        ), f"frequency {frequency_mhz} MHz outside allowed range [4.687 MHz - 800.000 MHz]"
+            not fine_phase_shift or spec.fine_phase_shift
+        ), f"{spec.name} does not support fine phase shifts"
+        assert -360 <= phase <= 360, "phase must be in range [-360, 360]"
+        assert 0 < duty_cycle < 1, "duty cycle must be in range (0, 1)"
 
-        self._cnt += 1
-        assert self._cnt <= 7, "maximum output clock cnt reached"
+        assert (
+            frequency_mhz in spec.out_range
+        ), f"frequency {frequency_mhz} MHz outside allowed range [{spec.out_range.lower} MHz - {spec.out_range.upper} MHz]"
 
-        if self._cnt == 1:
-            possible_div = [x / 8 for x in range(8, 1024)]
-        else:
-            possible_div = [*range(1, 128)]
+        assert (
+            len(self._output_info) < spec.max_outputs
+        ), "maximum output clock cnt reached"
 
         signal = Signal[Bit]()
         self._output_info.append(
-            Mmcm.OutputInfo(
+            _OutputInfo(
                 FloatRange.from_error(frequency_mhz, allowed_error),
                 signal,
-                possible_div,
+                _Shape(phase, duty_cycle),
+                fine_phase_shift,
             )
         )
         return std.Clock(signal, frequency=frequency_mhz * 1e6)
+
+
+class Mmcm(_ClockManager):
+    _spec = _MMCM
+
+
+class MmcmReconfiguration:
+    """
+    Switches the output frequencies of an `Mmcm` at runtime.
+
+    `configurations` is a list of frequency sets, each containing one frequency
+    per output reserved from `mmcm` (in the order of the `reserve` calls).
+    The divider values of all sets are computed when the design is elaborated
+    and written to the dynamic reconfiguration interface of the clock wizard
+    which updates the MMCM through its DRP port.
+    The wizard's AXI4-Lite interface is clocked by `ctx` and its reset
+    also resets the MMCM.
+    """
+
+    _ADDR_STATUS = 0x004
+    _ADDR_CLKFBOUT = 0x200
+    _ADDR_CLKOUT0 = 0x208
+    _CLKOUT_STRIDE = 12
+    _ADDR_LOAD = 0x25C
+
+    def __init__(
+        self,
+        mmcm: Mmcm,
+        ctx: std.SequentialContext,
+        configurations: list[list[std.Frequency]],
+        allowed_error=0,
+    ):
+        assert isinstance(mmcm, Mmcm), "runtime reconfiguration requires an Mmcm"
+        assert mmcm._reconfig_axi is None, "mmcm already has a reconfiguration"
+        assert len(configurations) != 0
+
+        freq_in = mmcm.clk.frequency().megahertz()
+        output_cnt = len(mmcm._output_info)
+
+        self._solutions: list[_Solution] = []
+        self._shapes = [o.shape for o in mmcm._output_info]
+
+        for config in configurations:
+            assert (
+                len(config) == output_cnt
+            ), f"each configuration requires one frequency per output ({output_cnt})"
+
+            solution = _solve(
+                _MMCM,
+                freq_in,
+                [
+                    FloatRange.from_error(freq.megahertz(), allowed_error)
+                    for freq in config
+                ],
+                [o.shape for o in mmcm._output_info],
+            )
+
+            assert (
+                solution is not None
+            ), f"could not reach output frequencies {[f.megahertz() for f in config]}"
+
+            self._solutions.append(solution)
+
+        self.axi = Axi4Light.signal(
+            ctx.clk(),
+            ctx.reset(),
+            addr_width=11,
+            data_width=32,
+            prot_width=None,
+            resp_width=2,
+            strb_width=4,
+        )
+
+        mmcm._reconfig_axi = self.axi
+
+        # constant register values for all configurations
+        # grouped by address, used to select the written data at runtime
+        words = [self.register_words(n) for n in range(len(self._solutions))]
+
+        self._register_table = [
+            (addr, {n: Unsigned[32](w[addr]) for n, w in enumerate(words)})
+            for addr in words[0].keys()
+        ]
+
+    def configuration_cnt(self):
+        return len(self._solutions)
+
+    @staticmethod
+    def _frac_word(value: float, shift: int):
+        # the clock wizard expects fractional parts in multiples of 1/1000
+        return round((value % 1) * 1000) << shift
+
+    def register_words(self, nr: int) -> dict[int, int]:
+        """
+        Returns the register values written for configuration `nr`
+        as a dictionary mapping addresses to data words.
+        """
+
+        solution = self._solutions[nr]
+
+        result = {
+            self._ADDR_CLKFBOUT: solution.div
+            | (int(solution.mult) << 8)
+            | self._frac_word(solution.mult, 16)
+        }
+
+        for out_nr, div in enumerate(solution.out_div):
+            addr = self._ADDR_CLKOUT0 + out_nr * self._CLKOUT_STRIDE
+            result[addr] = int(div) | self._frac_word(div, 8)
+
+            # phase in 1/1000 degrees and duty cycle in 1/1000 percent,
+            # only written when they differ from the defaults
+            shape = self._shapes[out_nr]
+
+            if not shape.is_default():
+                result[addr + 4] = round(shape.phase * 1000) & 0xFFFFFFFF
+                result[addr + 8] = round(shape.duty_cycle * 100_000)
+
+        return result
+
+    async def switch_to(self, nr):
+        """
+        Writes the precomputed register set `nr` into the clock wizard,
+        starts the reconfiguration and waits until the MMCM is locked again.
+        """
+
+        for addr, values in self._register_table:
+            await self.axi.write_word(addr, std.select(nr, values, default=values[0]))
+
+        # LOAD | SADDR, use the written values instead of the defaults
+        await self.axi.write_word(self._ADDR_LOAD, Unsigned[32](0x3))
+
+        # the MMCM is reset during reconfiguration, wait until
+        # the lock is lost and regained
+        while True:
+            lost, lost_resp = await self.axi.read_word(self._ADDR_STATUS)
+
+            if not lost[0]:
+                break
+
+        while True:
+            regained, regained_resp = await self.axi.read_word(self._ADDR_STATUS)
+
+            if regained[0]:
+                break
+
+
+class Pll(_ClockManager):
+    """
+    Same interface as `Mmcm` but uses a PLLE2 primitive.
+    The PLL has a lower jitter and power consumption but only supports
+    integer dividers and up to six outputs.
+    """
+
+    _spec = _PLL
+
+
+class ClockPlanner:
+    """
+    Distributes the requested output clocks over the MMCM and PLL primitives
+    of the device (by default the six MMCMs and six PLLs of the xc7a100t).
+
+    Outputs are added to already used primitives whenever possible.
+    PLLs are preferred over MMCMs and MMCMs are only used for
+    frequencies that cannot be reached with the integer dividers of a PLL.
+    """
+
+    def __init__(
+        self,
+        clk: std.Clock,
+        reset: std.Reset,
+        *,
+        mmcm_count: int = 6,
+        pll_count: int = 6,
+    ):
+        self.clk = clk
+        self.reset = reset
+        self._available = {_PLL.name: pll_count, _MMCM.name: mmcm_count}
+        self._requests: list[_OutputInfo] = []
+        self._locked = Signal[Bit](name="locked")
+
+        cohdl.on_block_exit(self._instantiate)
+
+    def locked(self):
+        """
+        Set when all primitives used by the planner are locked.
+        """
+        return self._locked
+
+    def reserve(
+        self,
+        frequency: std.Frequency,
+        allowed_error=0,
+        *,
+        phase: float = 0.0,
+        duty_cycle: float = 0.5,
+    ):
+        assert isinstance(frequency, std.Frequency)
+
+        frequency_mhz = frequency.megahertz()
+
+        assert (
+            frequency_mhz in _MMCM.out_range
+        ), f"frequency {frequency_mhz} MHz outside allowed range [{_MMCM.out_range.lower} MHz - {_MMCM.out_range.upper} MHz]"
+
+        signal = Signal[Bit]()
+        self._requests.append(
+            _OutputInfo(
+                FloatRange.from_error(frequency_mhz, allowed_error),
+                signal,
+                _Shape(phase, duty_cycle),
+            )
+        )
+        return std.Clock(signal, frequency=frequency_mhz * 1e6)
+
+    def _fits(self, spec: _PrimitiveSpec, outputs: list[_OutputInfo]):
+        freq = self.clk.frequency().megahertz()
+        return _solve_outputs(spec, freq, outputs) is not None
+
+    def _place(self, groups: list[tuple[_PrimitiveSpec, list]], request):
+        # prefer sharing already used primitives
+        for spec in (_PLL, _MMCM):
+            for group_spec, outputs in groups:
+                if group_spec is not spec:
+                    continue
+
+                # try both positions because only the first
+                # output of the MMCM supports fractional dividers
+                for candidate in ([*outputs, request], [request, *outputs]):
+                    if self._fits(spec, candidate):
+                        outputs[:] = candidate
+                        return
+
+        for spec in (_PLL, _MMCM):
+            used = sum(1 for group_spec, _ in groups if group_spec is spec)
+
+            if used < self._available[spec.name] and self._fits(spec, [request]):
+                groups.append((spec, [request]))
+                return
+
+        raise AssertionError(
+            f"no clock resource left to generate {request.frequency.midpoint()} MHz"
+        )
+
+    def plan(self) -> list[tuple[_PrimitiveSpec, list[_OutputInfo]]]:
+        """
+        Returns a list of (primitive, outputs) pairs
+        describing how the requested clocks are generated.
+        """
+
+        groups = []
+
+        for request in self._requests:
+            self._place(groups, request)
+
+        # MMCMs that ended up with only integer dividers
+        # are replaced with PLLs when there are some left
+        for nr, (spec, outputs) in enumerate(groups):
+            pll_used = sum(1 for group_spec, _ in groups if group_spec is _PLL)
+
+            if (
+                spec is _MMCM
+                and pll_used < self._available[_PLL.name]
+                and self._fits(_PLL, outputs)
+            ):
+                groups[nr] = (_PLL, outputs)
+
+        return groups
+
+    def _instantiate(self):
+        if len(self._requests) == 0:
+            print("ClockPlanner not instantiated because no outputs are used")
+            return
+
+        locked_signals = []
+
+        for spec, outputs in self.plan():
+            locked = Signal[Bit](name=f"{spec.name.lower()}_locked")
+            locked_signals.append(locked)
+            _instantiate_primitive(spec, self.clk, self.reset, locked, outputs)
+
+        @std.concurrent
+        def logic():
+            self._locked <<= std.binary_fold(lambda a, b: a & b, locked_signals)
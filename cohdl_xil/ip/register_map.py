@@ -0,0 +1,448 @@
+from __future__ import annotations
+
+import enum
+import json
+from dataclasses import dataclass
+
+import cohdl
+from cohdl import Bit, BitVector, Signal, Null
+from cohdl import std
+from cohdl.std.axi.axi4_light import Axi4Light
+
+# registers are 32 bit words at word aligned offsets
+WORD_WIDTH = 32
+
+
+class Access(enum.Enum):
+    # written by the bus, read by the bus and the design
+    RW = "rw"
+    # driven by the design, read by the bus
+    RO = "ro"
+    # written by the bus, reads return zero
+    WO = "wo"
+    # set by the design, cleared by writing ones
+    W1C = "w1c"
+    # single cycle pulse when a one is written, reads return zero
+    PULSE = "pulse"
+
+    def bus_writable(self):
+        return self in (Access.RW, Access.WO, Access.W1C, Access.PULSE)
+
+    def bus_readable(self):
+        return self in (Access.RW, Access.RO, Access.W1C)
+
+
+@dataclass(frozen=True)
+class Field:
+    name: str
+    lsb: int
+    width: int = 1
+    access: Access = Access.RW
+    reset: int = 0
+    description: str = ""
+
+    def __post_init__(self):
+        assert self.width >= 1, f"field '{self.name}' must have a positive width"
+        assert (
+            0 <= self.lsb and self.lsb + self.width <= WORD_WIDTH
+        ), f"field '{self.name}' exceeds the register width"
+        assert (
+            0 <= self.reset < 2**self.width
+        ), f"reset value of field '{self.name}' does not fit its width"
+
+    def msb(self):
+        return self.lsb + self.width - 1
+
+    def mask(self):
+        return (2**self.width - 1) << self.lsb
+
+    def extract(self, word: int) -> int:
+        return (word >> self.lsb) & (2**self.width - 1)
+
+    def insert(self, word: int, value: int) -> int:
+        assert 0 <= value < 2**self.width, f"value does not fit field '{self.name}'"
+        return (word & ~self.mask()) | (value << self.lsb)
+
+    def as_dict(self):
+        return {
+            "name": self.name,
+            "lsb": self.lsb,
+            "width": self.width,
+            "access": self.access.value,
+            "reset": self.reset,
+            "description": self.description,
+        }
+
+    @staticmethod
+    def from_dict(value: dict):
+        return Field(**{**value, "access": Access(value["access"])})
+
+
+@dataclass(frozen=True)
+class Register:
+    name: str
+    offset: int
+    fields: tuple[Field, ...]
+    description: str = ""
+
+    def __post_init__(self):
+        object.__setattr__(self, "fields", tuple(self.fields))
+
+        assert self.offset % 4 == 0, f"register '{self.name}' is not word aligned"
+
+        used = 0
+        names = set()
+
+        for f in self.fields:
+            assert (
+                used & f.mask() == 0
+            ), f"field '{f.name}' overlaps another field in register '{self.name}'"
+            assert f.name not in names, f"duplicate field '{f.name}' in '{self.name}'"
+            used |= f.mask()
+            names.add(f.name)
+
+    def field(self, name: str) -> Field:
+        for f in self.fields:
+            if f.name == name:
+                return f
+
+        raise AssertionError(f"register '{self.name}' has no field '{name}'")
+
+    def reset(self) -> int:
+        return sum(f.reset << f.lsb for f in self.fields)
+
+    def decode(self, word: int) -> dict[str, int]:
+        return {f.name: f.extract(word) for f in self.fields}
+
+    def encode(self, **values: int) -> int:
+        word = 0
+
+        for name, value in values.items():
+            word = self.field(name).insert(word, value)
+
+        return word
+
+    def as_dict(self):
+        return {
+            "name": self.name,
+            "offset": self.offset,
+            "description": self.description,
+            "fields": [f.as_dict() for f in self.fields],
+        }
+
+    @staticmethod
+    def from_dict(value: dict):
+        return Register(
+            name=value["name"],
+            offset=value["offset"],
+            description=value.get("description", ""),
+            fields=tuple(Field.from_dict(f) for f in value["fields"]),
+        )
+
+
+@dataclass(frozen=True)
+class RegisterMap:
+    """
+    Declarative description of a block of 32 bit registers.
+
+    `RegisterBank` implements the map as an AXI4-Lite slave,
+    `to_markdown` and `to_json` document it and
+    `cohdl_xil.host.register_map.RegisterMapClient` accesses it from the host.
+    """
+
+    name: str
+    registers: tuple[Register, ...]
+    description: str = ""
+
+    def __post_init__(self):
+        object.__setattr__(self, "registers", tuple(self.registers))
+
+        offsets = set()
+        names = set()
+
+        for reg in self.registers:
+            assert reg.offset not in offsets, f"duplicate offset of '{reg.name}'"
+            assert reg.name not in names, f"duplicate register '{reg.name}'"
+            offsets.add(reg.offset)
+            names.add(reg.name)
+
+    def register(self, name: str) -> Register:
+        for reg in self.registers:
+            if reg.name == name:
+                return reg
+
+        raise AssertionError(f"register map '{self.name}' has no register '{name}'")
+
+    def lookup(self, path: str) -> tuple[Register, Field | None]:
+        """
+        Returns the register and field named by `path`
+        ('reg' or 'reg.field').
+        """
+
+        reg_name, _, field_name = path.partition(".")
+        reg = self.register(reg_name)
+        return reg, reg.field(field_name) if field_name else None
+
+    def size(self):
+        """
+        Number of address bytes covered by the map.
+        """
+
+        return max(reg.offset for reg in self.registers) + 4
+
+    def addr_width(self):
+        return max(2, std.ceil_log_2(self.size()))
+
+    def as_dict(self):
+        return {
+            "name": self.name,
+            "description": self.description,
+            "registers": [reg.as_dict() for reg in self.registers],
+        }
+
+    def to_json(self, indent=2) -> str:
+        return json.dumps(self.as_dict(), indent=indent)
+
+    @staticmethod
+    def from_json(text: str) -> RegisterMap:
+        value = json.loads(text)
+        return RegisterMap(
+            name=value["name"],
+            description=value.get("description", ""),
+            registers=tuple(Register.from_dict(reg) for reg in value["registers"]),
+        )
+
+    def to_markdown(self) -> str:
+        lines = [f"# {self.name}", ""]
+
+        if self.description:
+            lines += [self.description, ""]
+
+        lines += ["| offset | register | description |", "|---|---|---|"]
+
+        for reg in sorted(self.registers, key=lambda reg: reg.offset):
+            lines.append(f"| 0x{reg.offset:04x} | {reg.name} | {reg.description} |")
+
+        for reg in sorted(self.registers, key=lambda reg: reg.offset):
+            lines += [
+                "",
+                f"## {reg.name} (0x{reg.offset:04x})",
+                "",
+                f"reset value: 0x{reg.reset():08x}",
+                "",
+                "| bits | field | access | reset | description |",
+                "|---|---|---|---|---|",
+            ]
+
+            for f in sorted(reg.fields, key=lambda f: -f.lsb):
+                bits = f"{f.lsb}" if f.width == 1 else f"{f.msb()}:{f.lsb}"
+                lines.append(
+                    f"| {bits} | {f.name} | {f.access.value} "
+                    f"| 0x{f.reset:x} | {f.description} |"
+                )
+
+        return "\n".join(lines) + "\n"
+
+
+def _const(value: int, width: int):
+    return std.as_bitvector(f"{value:0{width}b}")
+
+
+class RegisterBank:
+    """
+    AXI4-Lite slave implementing `regmap`.
+
+    Every field is represented by a signal available via `bank["reg.field"]`:
+
+    * RW and WO fields are registers written by the bus
+    * RO fields are driven by the design (for example in a concurrent context)
+    * W1C fields are sticky bits, setting `bank.hw_set["reg.field"]`
+      for a clock cycle sets the corresponding bits
+    * PULSE fields are high for one clock cycle after a one is written
+
+    The read data is selected by the word address bits of the map only
+    and registered once, writes respect the byte strobes.
+    Accesses outside of the map are answered with DECERR.
+
+    `axi` is the bus connected to the bank, when it is None a new interface
+    is created (with the address width of the map). Only the low address
+    bits of the bus are decoded, an interconnect is expected to
+    select the bank.
+    """
+
+    def __init__(
+        self,
+        ctx: std.SequentialContext,
+        regmap: RegisterMap,
+        axi: Axi4Light | None = None,
+    ):
+        self.ctx = ctx
+        self.regmap = regmap
+        self._addr_width = regmap.addr_width()
+
+        with std.prefix(regmap.name):
+            n = std.name
+
+            if axi is None:
+                axi = Axi4Light.signal(
+                    ctx.clk(), ctx.reset(), regmap.addr_width(), prefix=n("axi_")
+                )
+
+            assert (
+                axi.data_width() == WORD_WIDTH
+            ), "only 32 bit data buses are supported"
+            assert (
+                axi.addr_width() >= regmap.addr_width()
+            ), "address bus too narrow for the register map"
+
+            self.axi = axi
+
+            self._fields: dict[str, Signal] = {}
+            self.hw_set: dict[str, Signal] = {}
+            # bits cleared by bus writes to W1C fields
+            self._clear: dict[str, Signal] = {}
+
+            for reg in regmap.registers:
+                for f in reg.fields:
+                    path = f"{reg.name}.{f.name}"
+                    name = n(f"{reg.name}_{f.name}")
+                    T = Bit if f.width == 1 else BitVector[f.width]
+                    default = (
+                        bool(f.reset) if f.width == 1 else _const(f.reset, f.width)
+                    )
+
+                    if f.access is Access.PULSE:
+                        self._fields[path] = Signal[T](Null, name=name)
+                    else:
+                        self._fields[path] = Signal[T](default, name=name)
+
+                    if f.access is Access.W1C:
+                        self.hw_set[path] = Signal[T](Null, name=f"{name}_set")
+                        self._clear[path] = Signal[T](Null, name=f"{name}_clear")
+
+            self._impl()
+
+    def __getitem__(self, path: str) -> Signal:
+        return self._fields[path]
+
+    def _word_index(self, addr):
+        # word address within the map
+        return addr.lsb(self._addr_width).msb(rest=2).unsigned
+
+    def _read_parts(self, reg: Register):
+        # readable fields and zero padding, most significant part first
+        parts = []
+        pos = 0
+
+        for f in sorted(reg.fields, key=lambda f: f.lsb):
+            if not f.access.bus_readable():
+                continue
+            if f.lsb != pos:
+                parts.append(std.zeros(f.lsb - pos))
+
+            parts.append(self._fields[f"{reg.name}.{f.name}"])
+            pos = f.lsb + f.width
+
+        if pos != WORD_WIDTH:
+            parts.append(std.zeros(WORD_WIDTH - pos))
+
+        return parts[::-1]
+
+    def _impl(self):
+        axi = self.axi
+        regmap = self.regmap
+        name = regmap.name
+
+        read_parts = [
+            (
+                Signal[BitVector[WORD_WIDTH]](Null, name=f"{name}_{reg.name}_rdata"),
+                self._read_parts(reg),
+            )
+            for reg in regmap.registers
+        ]
+        read_values = {
+            reg.offset // 4: value
+            for reg, (value, _) in zip(regmap.registers, read_parts)
+        }
+        valid_index = {reg.offset // 4: Bit(1) for reg in regmap.registers}
+
+        read_data = Signal[BitVector[WORD_WIDTH]](Null, name=f"{name}_read_data")
+        read_hit = Signal[Bit](False, name=f"{name}_read_hit")
+
+        okay = std.as_bitvector(Axi4Light.RespConstants.OKAY)
+        decerr = std.as_bitvector(Axi4Light.RespConstants.DECERR)
+
+        # bus writable fields by word index as (signal, field) tuples,
+        # W1C fields are represented by their clear signal
+        write_fields = {
+            reg.offset
+            // 4: [
+                (
+                    (
+                        self._clear[f"{reg.name}.{f.name}"]
+                        if f.access is Access.W1C
+                        else self._fields[f"{reg.name}.{f.name}"]
+                    ),
+                    f,
+                )
+                for f in reg.fields
+                if f.access.bus_writable()
+            ]
+            for reg in regmap.registers
+        }
+
+        @std.concurrent
+        def proc_read_values():
+            for value, parts in read_parts:
+                value.next = std.concat(*parts)
+
+        @std.concurrent
+        def proc_read_mux():
+            index = self._word_index(axi.rdaddr.araddr)
+            read_data.next = std.select(index, read_values, default=Null)
+            read_hit.next = std.select(index, valid_index, default=Bit(0))
+
+        @self.ctx
+        async def proc_read():
+            await axi.await_read_request()
+            await axi.send_read_resp(read_data, okay if read_hit else decerr)
+
+        w1c_fields = [
+            f"{reg.name}.{f.name}"
+            for reg in regmap.registers
+            for f in reg.fields
+            if f.access is Access.W1C
+        ]
+
+        def field_slice(value, f: Field):
+            if f.width == 1:
+                return value[f.lsb]
+            return value[f.msb() : f.lsb]
+
+        @self.ctx
+        def proc_w1c():
+            for path in w1c_fields:
+                field = self._fields[path]
+                field <<= (field | self.hw_set[path]) & ~self._clear[path]
+
+        @self.ctx
+        async def proc_write():
+            request = await axi.await_write_request()
+            mask = std.stretch(request.strb, 8)
+            index = self._word_index(request.addr)
+            hit = cohdl.Variable[Bit](False)
+
+            for offset, fields in write_fields.items():
+                if index == offset:
+                    hit @= True
+
+                    for target, f in fields:
+                        data = field_slice(request.data, f)
+                        field_mask = field_slice(mask, f)
+
+                        if f.access is Access.W1C or f.access is Access.PULSE:
+                            target ^= data & field_mask
+                        else:
+                            target <<= (target & ~field_mask) | (data & field_mask)
+
+            await axi.send_write_response(okay if hit else decerr)
@@ -0,0 +1,218 @@
+from __future__ import annotations
+
+from cohdl import Bit, BitVector, Unsigned, Signal, Null, Full
+from cohdl import std
+
+from cohdl_xil.ip.axi_stream import AxiStream, axis_fifo
+from cohdl_xil.ip.fifo import Backend, Implementation
+
+# width of the phase accumulators used to generate the bit timing
+_ACC_WIDTH = 32
+
+
+class Uart:
+    """
+    UART implemented in fabric logic with buffered streaming interfaces.
+
+    The bit timing is generated by a phase accumulator incremented by
+    `baud / f_clk * 2**32` per clock cycle, so any baud rate up to a quarter
+    of the clock frequency can be used without a matching clock divider
+    (the bit length varies by at most one clock cycle).
+    The receiver samples each bit in its center after detecting the start bit.
+
+    Bytes written to `tx_stream` are buffered in a fifo of `tx_depth`
+    entries and sent in order, received bytes are provided by `rx_stream`
+    after passing through a fifo of `rx_depth` entries.
+    Setting a depth to None connects the stream directly to the
+    transmitter/receiver. Received bytes are dropped when `rx_stream` is
+    not ready, this sets the sticky `rx_overflow` flag. Frames with an invalid
+    stop bit are dropped and set `rx_frame_error`.
+
+    Both streams are clocked by `ctx` and have no tlast/tkeep signals.
+    """
+
+    def __init__(
+        self,
+        ctx: std.SequentialContext,
+        rx: Signal[Bit],
+        tx: Signal[Bit],
+        *,
+        baud: int,
+        data_bits: int = 8,
+        stop_bits: int = 1,
+        tx_depth: int | None = 2048,
+        rx_depth: int | None = 2048,
+        backend: Backend = Backend.FIFO_GENERATOR,
+        implementation: Implementation | None = None,
+        allowed_error: float = 0.001,
+    ):
+        freq = ctx.clk().frequency().hertz()
+
+        assert 5 <= data_bits <= 8, "data_bits must be in range [5, 8]"
+        assert stop_bits in (1, 2), "stop_bits must be 1 or 2"
+        assert (
+            4 * baud <= freq
+        ), f"baud rate {baud} too high for a clock frequency of {freq}Hz"
+
+        step = round(baud / freq * 2**_ACC_WIDTH)
+        self.actual_baud = step * freq / 2**_ACC_WIDTH
+
+        assert (
+            abs(self.actual_baud - baud) / baud <= allowed_error
+        ), f"baud rate {baud} not reachable (closest {self.actual_baud})"
+
+        self.ctx = ctx
+        self.baud = baud
+        self.data_bits = data_bits
+        self.stop_bits = stop_bits
+
+        with std.prefix("uart"):
+            n = std.name
+
+            self.rx_overflow = Signal[Bit](False, name=n("rx_overflow"))
+            self.rx_frame_error = Signal[Bit](False, name=n("rx_frame_error"))
+
+            self.tx_stream = AxiStream.signal(
+                ctx.clk(),
+                ctx.reset(),
+                data_bits,
+                has_last=False,
+                has_keep=False,
+                prefix=n("tx_"),
+            )
+
+            tx_source = self.tx_stream
+
+            if tx_depth is not None:
+                tx_source = axis_fifo(
+                    self.tx_stream,
+                    tx_depth,
+                    backend=backend,
+                    implementation=implementation,
+                )
+
+            rx_sink = AxiStream.signal(
+                ctx.clk(),
+                ctx.reset(),
+                data_bits,
+                has_last=False,
+                has_keep=False,
+                prefix=n("rx_"),
+            )
+
+            if rx_depth is None:
+                self.rx_stream = rx_sink
+            else:
+                self.rx_stream = axis_fifo(
+                    rx_sink,
+                    rx_depth,
+                    backend=backend,
+                    implementation=implementation,
+                )
+
+            self._impl_tx(tx, tx_source, step)
+            self._impl_rx(rx, rx_sink, step)
+
+    def _impl_tx(self, tx: Signal[Bit], source: AxiStream, step: int):
+        ctx = self.ctx
+        # start bit, data bits and stop bits
+        frame_len = 1 + self.data_bits + self.stop_bits
+
+        busy = Signal[Bit](False, name="uart_tx_busy")
+        acc = Signal[Unsigned[_ACC_WIDTH]](0, name="uart_tx_acc")
+        remaining = Signal[Unsigned.upto(frame_len)](0, name="uart_tx_remaining")
+        # bits are shifted out starting at the lsb, idle line is high
+        shift = Signal[BitVector[frame_len]](Full, name="uart_tx_shift")
+
+        @std.concurrent
+        def proc_tx_out():
+            tx.next = shift[0]
+            source.ready.next = not busy
+
+        @ctx
+        def proc_tx():
+            if not busy:
+                if source.valid:
+                    busy.next = True
+                    acc.next = 0
+                    remaining.next = frame_len
+                    shift.next = std.ones(self.stop_bits) @ source.data @ std.zeros(1)
+            else:
+                next_acc = acc + step
+                acc.next = next_acc
+
+                # accumulator overflow marks the end of a bit
+                if next_acc < acc:
+                    shift.next = std.ones(1) @ shift.msb(rest=1)
+                    remaining.next = remaining - 1
+
+                    if remaining == 1:
+                        busy.next = False
+
+    def _impl_rx(self, rx: Signal[Bit], sink: AxiStream, step: int):
+        ctx = self.ctx
+        data_bits = self.data_bits
+        # center of the stop bit
+        stop_sample = data_bits + 1
+
+        # synchronize the asynchronous input
+        rx_meta = Signal[Bit](True, name="uart_rx_meta")
+        rx_sync = Signal[Bit](True, name="uart_rx_sync")
+
+        busy = Signal[Bit](False, name="uart_rx_busy")
+        acc = Signal[Unsigned[_ACC_WIDTH]](0, name="uart_rx_acc")
+        cnt = Signal[Unsigned.upto(stop_sample)](0, name="uart_rx_cnt")
+        # bits are shifted in at the msb, the first bit ends up in the lsb
+        shift = Signal[BitVector[data_bits]](Null, name="uart_rx_shift")
+
+        @ctx
+        def proc_rx():
+            rx_meta.next = rx
+            rx_sync.next = rx_meta
+            sink.valid.next = False
+
+            if not busy:
+                if not rx_sync:
+                    # start bit detected, the first overflow of the
+                    # accumulator occurs in the center of the start bit
+                    busy.next = True
+                    acc.next = 2 ** (_ACC_WIDTH - 1)
+                    cnt.next = 0
+            else:
+                next_acc = acc + step
+                acc.next = next_acc
+
+                if next_acc < acc:
+                    cnt.next = cnt + 1
+
+                    if cnt == 0:
+                        # ignore glitches shorter than half a bit
+                        if rx_sync:
+                            busy.next = False
+                    elif cnt == stop_sample:
+                        busy.next = False
+
+                        if not rx_sync:
+                            self.rx_frame_error.next = True
+                        elif sink.ready:
+                            sink.valid.next = True
+                            sink.data.next = shift
+                        else:
+                            self.rx_overflow.next = True
+                    else:
+                        shift.next = rx_sync @ shift.msb(rest=1)
+
+    async def send(self, data):
+        """
+        Waits until `data` is accepted by the transmit stream.
+        """
+
+        await self.tx_stream.send(data)
+
+    async def receive(self):
+        """
+        Waits for a received byte and returns it.
+        """
+
+        data, _, _ = await self.rx_stream.receive()
+        return data
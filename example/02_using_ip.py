@@ -2,7 +2,7 @@ from cohdl import Signal, Unsigned, Bit
 from cohdl import std
 
 from cohdl_xil.boards.trenz import NexysA7
-from cohdl_xil.ip.ila import ila
+from cohdl_xil.ip.ila import ila, Probe, ProbeType
 
 board = NexysA7("build", top_entity_name="ExampleIpEntity")
 
@@ -34,7 +34,7 @@ def architecture():
         cnt_zero.next = cnt == 0
 
     # use an ila ip block to monitor the signals
-    ila(
+    resources = ila(
         # the ila ip block requires a clock signal
         clk,
         dict(
@@ -49,5 +49,17 @@ def architecture():
             # single bit signals are converted to bitvectors
             # internally and forwarded to the ip block
             cnt_zero=cnt_zero,
+            # Probe objects configure probes individually,
+            # trigger only probes use no sample memory
+            sw_trigger=Probe(sw, type=ProbeType.TRIGGER, comparators=2),
         ),
+        # number of samples per capture
+        data_depth=4096,
+        # register stages between the probes and the trigger logic
+        input_pipe_stages=1,
+        # fail the build when the sample memory grows too large
+        max_bram36=8,
     )
+
+    # estimated resource usage of the ila core
+    print(resources)
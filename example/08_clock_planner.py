@@ -0,0 +1,48 @@
+from cohdl import Signal, Unsigned
+
+from cohdl import std
+
+from cohdl_xil.boards.trenz import NexysA7
+from cohdl_xil.ip.mmcm import ClockPlanner
+
+board = NexysA7("build", top_entity_name="ExampleIpEntity")
+
+# this example demonstrates how the ClockPlanner distributes
+# multiple output clocks over the MMCM and PLL primitives of the FPGA
+
+
+@board.architecture
+def architecture():
+    clk = board.clock()
+    reset = std.Reset(board.btn_reset(positive_logic=True))
+
+    # the planner collects all requested frequencies and decides
+    # which clock primitives are used at the end of the architecture.
+    # PLLs are preferred because they have a lower jitter and power
+    # consumption, MMCMs are only used when a frequency cannot be
+    # reached with the integer dividers of a PLL
+    planner = ClockPlanner(clk, reset)
+
+    clocks = [
+        planner.reserve(std.MHz(40)),
+        planner.reserve(std.MHz(65)),
+        planner.reserve(std.MHz(200)),
+        # 25.175 MHz requires the fractional divider of an MMCM
+        planner.reserve(std.MHz(25.175), allowed_error=0.0001),
+    ]
+
+    # increment one counter per output clock
+    counters = [Signal[Unsigned[30]](0) for _ in clocks]
+
+    for clk_out, cnt in zip(clocks, counters):
+
+        @std.sequential(clk_out)
+        def proc_counter(cnt=cnt):
+            cnt.next = cnt + 1
+
+    led = board.leds()
+
+    @std.concurrent
+    def logic():
+        # use msbs to slow down counters
+        led.next = std.concat(*[cnt.msb(4) for cnt in counters])
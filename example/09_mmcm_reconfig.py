@@ -0,0 +1,62 @@
+from cohdl import Signal, Unsigned, Bit, expr
+
+from cohdl import std
+
+from cohdl_xil.boards.trenz import NexysA7
+from cohdl_xil.ip.mmcm import Mmcm, MmcmReconfiguration
+
+board = NexysA7("build", top_entity_name="ExampleIpEntity")
+
+# this example switches the output frequency of a mixed mode
+# clock manager at runtime without loading a new bitstream
+
+
+@board.architecture
+def architecture():
+    ctx = std.SequentialContext(
+        board.clock(), std.Reset(board.btn_reset(positive_logic=True))
+    )
+
+    mmcm = Mmcm(ctx.clk(), ctx.reset())
+
+    # the frequency the mmcm starts with
+    clk_out = mmcm.reserve(std.MHz(25.175), allowed_error=0.0001)
+
+    # define the frequencies available at runtime,
+    # each list contains one entry per reserved output
+    reconfig = MmcmReconfiguration(
+        mmcm,
+        ctx,
+        [
+            [std.MHz(25.175)],
+            [std.MHz(40)],
+            [std.MHz(65)],
+        ],
+        allowed_error=0.0001,
+    )
+
+    sw = board.switches()
+    buttons = board.buttons()
+    led = board.leds()
+
+    cnt = Signal[Unsigned[30]](0)
+    busy = Signal[Bit](False)
+
+    @std.sequential(clk_out)
+    def proc_counter():
+        cnt.next = cnt + 1
+
+    @ctx
+    async def proc_reconfig():
+        # select the new configuration with the switches
+        # and apply it by pressing the center button
+        await buttons.center
+        busy.next = True
+        await reconfig.switch_to(sw.lsb(2).unsigned)
+        busy.next = False
+        await expr(not buttons.center)
+
+    @std.concurrent
+    def logic():
+        led[14:0] <<= cnt.msb(15)
+        led[15] <<= busy
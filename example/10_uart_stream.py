@@ -0,0 +1,36 @@
+from cohdl import std
+
+from cohdl_xil.boards.trenz import NexysA7
+from cohdl_xil.ip.uart import Uart
+
+board = NexysA7("build", top_entity_name="ExampleUartStream")
+
+# this example implements a uart echo design running at 3 Mbaud
+# using the fabric uart and its streaming interfaces
+
+
+@board.architecture
+def architecture():
+    ctx = std.SequentialContext(
+        board.clock(), std.Reset(board.btn_reset(positive_logic=True))
+    )
+
+    # the bit timing is derived from the clock frequency so
+    # baud rates are not restricted to a fixed list
+    uart = Uart(
+        ctx,
+        rx=board.uart_in(),
+        tx=board.uart_out(),
+        baud=3_000_000,
+    )
+
+    # forward all received bytes to the transmitter,
+    # both directions are buffered by 2048 entry fifos
+    uart.rx_stream.connect(uart.tx_stream)
+
+    leds = board.leds()
+
+    @std.concurrent
+    def logic():
+        leds[0] <<= uart.rx_overflow
+        leds[1] <<= uart.rx_frame_error
@@ -0,0 +1,32 @@
+from cohdl import std
+
+from cohdl_xil.boards.trenz import NexysA7
+from cohdl_xil.ip.axi_uartlite import AxiUartlite
+
+board = NexysA7("build", top_entity_name="ExampleUartliteInterrupt")
+
+# this example implements the same uart echo design as 03_uart_axi.py
+# but uses the interrupt output of the axi_uartlite ip core
+# instead of polling its status register
+
+
+@board.architecture
+def architecture():
+    clk = board.clock()
+    reset = std.Reset(board.btn_reset(), active_low=True)
+
+    uart = AxiUartlite(
+        clk,
+        reset,
+        rx=board.uart_in(),
+        tx=board.uart_out(),
+        baud=230400,
+    )
+
+    # streams returns byte streams driven by a process that waits for
+    # interrupts and moves data between the ip core and the streams
+    # in bursts of up to 16 bytes. The received data is buffered
+    # in a 1024 entry fifo.
+    rx, tx = uart.streams(rx_depth=1024)
+
+    rx.connect(tx)
@@ -0,0 +1,39 @@
+from cohdl import std
+
+from cohdl_xil.boards.trenz import NexysA7
+from cohdl_xil.ip.uart import Uart
+from cohdl_xil.ip.framed_link import FramedLink
+
+board = NexysA7("build", top_entity_name="ExampleFramedLink")
+
+# this example echoes CRC checked frames received over the uart,
+# use `python -m cohdl_xil.host.framed_link <port>` to measure
+# the throughput of the link (or `--loopback` to run the host
+# side against a software model of this design)
+
+
+@board.architecture
+def architecture():
+    ctx = std.SequentialContext(
+        board.clock(), std.Reset(board.btn_reset(positive_logic=True))
+    )
+
+    uart = Uart(
+        ctx,
+        rx=board.uart_in(),
+        tx=board.uart_out(),
+        baud=3_000_000,
+    )
+
+    link = FramedLink(ctx, uart.rx_stream, uart.tx_stream)
+
+    # every accepted payload is sent back as a new frame
+    link.rx_payload.connect(link.tx_payload)
+
+    leds = board.leds()
+
+    @std.concurrent
+    def logic():
+        leds[0] <<= uart.rx_overflow
+        leds[1] <<= uart.rx_frame_error
+        leds[2] <<= link.crc_errors != 0
@@ -0,0 +1,60 @@
+from cohdl import std, Signal, BitVector, Null
+
+from cohdl_xil.boards.trenz import NexysA7
+from cohdl_xil.ip.uart import Uart
+from cohdl_xil.ip.axi_debug_bridge import AxiDebugBridge
+
+board = NexysA7("build", top_entity_name="ExampleAxiDebugBridge")
+
+# this example makes a small register bank accessible over the uart,
+# use `cohdl_xil.host.axi_debug_bridge.DebugBridgeClient` to
+# read and write the registers from the host
+#
+#   0x00        leds (read/write)
+#   0x04        switches (read only)
+#   0x40-0x7C   scratch registers (read/write)
+
+
+@board.architecture
+def architecture():
+    ctx = std.SequentialContext(
+        board.clock(), std.Reset(board.btn_reset(positive_logic=True))
+    )
+
+    uart = Uart(ctx, rx=board.uart_in(), tx=board.uart_out(), baud=3_000_000)
+    bridge = AxiDebugBridge(ctx, uart.rx_stream, uart.tx_stream, addr_width=8)
+    axi = bridge.axi
+
+    leds = board.leds()
+    switches = board.switches()
+
+    led_reg = Signal[BitVector[16]](Null, name="led_reg")
+    scratch = Signal[std.Array[BitVector[32], 16]](name="scratch")
+
+    @std.concurrent
+    def logic():
+        leds.next = led_reg
+
+    @ctx
+    async def proc_read():
+        request = await axi.await_read_request()
+        addr = request.addr.unsigned
+
+        if addr == 0x00:
+            await axi.send_read_resp(std.zeros(16) @ led_reg)
+        elif addr == 0x04:
+            await axi.send_read_resp(std.zeros(16) @ switches)
+        else:
+            await axi.send_read_resp(scratch[addr.lsb(6).msb(4).unsigned])
+
+    @ctx
+    async def proc_write():
+        request = await axi.await_write_request()
+        addr = request.addr.unsigned
+
+        if addr == 0x00:
+            led_reg.next = request.data.lsb(16)
+        elif addr[6]:
+            scratch[addr.lsb(6).msb(4).unsigned] <<= request.data
+
+        await axi.send_write_response()
@@ -0,0 +1,90 @@
+import os
+
+from cohdl import std, Signal, Unsigned
+
+from cohdl_xil.boards.trenz import NexysA7
+from cohdl_xil.ip.uart import Uart
+from cohdl_xil.ip.axi_debug_bridge import AxiDebugBridge
+from cohdl_xil.ip.register_map import RegisterMap, RegisterBank, Register, Field, Access
+
+board = NexysA7("build", top_entity_name="ExampleRegisterMap")
+
+# this example generates the AXI4-Lite register bank of a small
+# counter peripheral from a declarative register map
+# and controls it over the uart debug bridge
+#
+# the map is written to build/counter_regs.md and build/counter_regs.json,
+# the json file can be loaded by cohdl_xil.host.register_map.RegisterMapClient
+
+regmap = RegisterMap(
+    name="counter_regs",
+    description="free running counter with leds and switches",
+    registers=[
+        Register(
+            "ctrl",
+            0x00,
+            [
+                Field("enable", 0, access=Access.RW, description="count when set"),
+                Field("clear", 1, access=Access.PULSE, description="clear counter"),
+            ],
+        ),
+        Register(
+            "status",
+            0x04,
+            [
+                Field("overflow", 0, access=Access.W1C, description="counter wrapped"),
+                Field(
+                    "switches", 16, 16, access=Access.RO, description="board switches"
+                ),
+            ],
+        ),
+        Register(
+            "count",
+            0x08,
+            [Field("value", 0, 32, access=Access.RO, description="counter value")],
+        ),
+        Register(
+            "leds",
+            0x0C,
+            [Field("value", 0, 16, reset=0x0001, description="led outputs")],
+        ),
+    ],
+)
+
+os.makedirs("build", exist_ok=True)
+
+with open("build/counter_regs.md", "w") as file:
+    file.write(regmap.to_markdown())
+
+with open("build/counter_regs.json", "w") as file:
+    file.write(regmap.to_json())
+
+
+@board.architecture
+def architecture():
+    ctx = std.SequentialContext(
+        board.clock(), std.Reset(board.btn_reset(positive_logic=True))
+    )
+
+    uart = Uart(ctx, rx=board.uart_in(), tx=board.uart_out(), baud=3_000_000)
+    bridge = AxiDebugBridge(ctx, uart.rx_stream, uart.tx_stream, addr_width=4)
+    regs = RegisterBank(ctx, regmap, bridge.axi)
+
+    leds = board.leds()
+    switches = board.switches()
+
+    counter = Signal[Unsigned[32]](0, name="counter")
+
+    @std.concurrent
+    def logic():
+        leds.next = regs["leds.value"]
+        regs["status.switches"].next = switches
+        regs["count.value"].next = counter.bitvector
+
+    @ctx
+    def proc_counter():
+        if regs["ctrl.clear"]:
+            counter.next = 0
+        elif regs["ctrl.enable"]:
+            counter.next = counter + 1
+            regs.hw_set["status.overflow"] ^= counter == 2**32 - 1
@@ -0,0 +1,66 @@
+from cohdl import std, Signal, Unsigned
+
+from cohdl_xil.boards.trenz import NexysA7
+from cohdl_xil.ip.uart import Uart
+from cohdl_xil.ip.axi_debug_bridge import AxiDebugBridge
+from cohdl_xil.ip.axi_interconnect import AxiInterconnect
+from cohdl_xil.ip.register_map import RegisterMap, RegisterBank, Register, Field, Access
+from cohdl.std.axi.axi4_light import Axi4Light
+
+board = NexysA7("build", top_entity_name="ExampleAxiInterconnect")
+
+# this example connects two masters (the uart debug bridge and a
+# sequential process) to two register banks using an AXI4-Lite interconnect
+#
+#   0x0000      io registers (leds and switches)
+#   0x1000      scratch registers
+
+io_map = RegisterMap(
+    name="io_regs",
+    registers=[
+        Register("leds", 0x0, [Field("value", 0, 16)]),
+        Register("switches", 0x4, [Field("value", 0, 16, access=Access.RO)]),
+        Register("mirror", 0x8, [Field("enable", 0, description="leds = switches")]),
+    ],
+)
+
+scratch_map = RegisterMap(
+    name="scratch_regs",
+    registers=[
+        Register(f"scratch{nr}", 4 * nr, [Field("value", 0, 32)]) for nr in range(8)
+    ],
+)
+
+
+@board.architecture
+def architecture():
+    ctx = std.SequentialContext(
+        board.clock(), std.Reset(board.btn_reset(positive_logic=True))
+    )
+
+    uart = Uart(ctx, rx=board.uart_in(), tx=board.uart_out(), baud=3_000_000)
+    bridge = AxiDebugBridge(ctx, uart.rx_stream, uart.tx_stream, addr_width=16)
+
+    # second master, copies the switches to the leds when enabled
+    mirror = Axi4Light.signal(ctx.clk(), ctx.reset(), 16, prefix="mirror_")
+
+    interconnect = AxiInterconnect(ctx, [bridge.axi, mirror])
+
+    io_regs = RegisterBank(ctx, io_map, interconnect.reserve(0x0000, 16, "io_"))
+    RegisterBank(ctx, scratch_map, interconnect.reserve(0x1000, 32, "scratch_"))
+
+    leds = board.leds()
+    switches = board.switches()
+
+    @std.concurrent
+    def logic():
+        leds.next = io_regs["leds.value"]
+        io_regs["switches.value"].next = switches
+
+    @ctx
+    async def proc_mirror():
+        enable, _enable_resp = await mirror.read_word(0x8)
+
+        if enable[0]:
+            value, _value_resp = await mirror.read_word(0x4)
+            await mirror.write_word(0x0, value)
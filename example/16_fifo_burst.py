@@ -0,0 +1,78 @@
+from cohdl import Signal, Unsigned, Bit
+from cohdl import std
+
+from cohdl_xil.boards.trenz import NexysA7
+from cohdl_xil.ip.fifo import CommonClkFifo, Backend
+
+board = NexysA7("build", top_entity_name="ExampleFifoBurst")
+
+# self checking design for the fifo burst coroutines
+#
+# proc_push writes bursts containing the sequence 1..BURST into the
+# first fifo, proc_forward moves them into the second fifo and
+# proc_check pops them again and compares each word with the
+# expected sequence
+#
+# led[0] : set when a burst did not match the sequence
+# led[1] : set after the first burst was checked
+
+BURST = 16
+
+
+@board.architecture
+def architecture():
+    ctx = std.SequentialContext(
+        board.clock(), std.Reset(board.btn_reset(positive_logic=True))
+    )
+
+    leds = board.leds()
+
+    def make_fifo():
+        # bursts require first word fall through mode (the default)
+        # and data counts or programmable flags
+        return CommonClkFifo(
+            reset=ctx.reset(),
+            clk=ctx.clk(),
+            data_width=16,
+            depth=512,
+            backend=Backend.XPM,
+            data_count=True,
+        )
+
+    fifo_a = make_fifo()
+    fifo_b = make_fifo()
+
+    next_value = Signal[Unsigned[16]](1, name="next_value")
+    expected = Signal[Unsigned[16]](1, name="expected")
+    error = Signal[Bit](False, name="error")
+    checked = Signal[Bit](False, name="checked")
+
+    def source():
+        next_value.next = next_value + 1
+        return next_value
+
+    def check(value):
+        expected.next = expected + 1
+
+        if value.unsigned != expected:
+            error.next = True
+
+    @ctx
+    async def proc_push():
+        await fifo_a.push_burst(BURST, source)
+        next_value.next = 1
+
+    @ctx
+    async def proc_forward():
+        await fifo_a.forward_burst(fifo_b, BURST)
+
+    @ctx
+    async def proc_check():
+        await fifo_b.pop_burst(BURST, check)
+        expected.next = 1
+        checked.next = True
+
+    @std.concurrent
+    def logic():
+        leds[0] <<= error
+        leds[1] <<= checked
@@ -0,0 +1,148 @@
+from cohdl import Signal, Bit, BitVector, Unsigned, Null, std, expr
+
+from cohdl_xil.boards.trenz import NexysA7
+from cohdl_xil.boards.trenz.nexys_a7 import (
+    PipelinedMemoryInterface,
+    SynchronizedMemoryInterface,
+)
+from cohdl_xil.boards.trenz.nexys_a7_ddr2 import (
+    Ddr2TrafficGenerator,
+    Ddr2Arbiter,
+    ArbiterClient,
+)
+from cohdl_xil.ip.mmcm import Mmcm
+from cohdl_xil.ip.axi_uartlite import AxiUartlite
+
+board = NexysA7("build", top_entity_name="Ddr2Benchmark")
+
+# this example measures the performance of a DDR2 access path
+# and sends the results over UART (decode them with decode_report.py)
+
+# the access path used by the traffic generator,
+# "native" uses the DDR2_UserInterface returned by board.ddr2_memory,
+# "pipelined" adds a PipelinedMemoryInterface in front of it,
+# "synchronized" issues requests from the 100MHz board clock domain
+# through a SynchronizedMemoryInterface with fifos,
+# "arbiter" uses the only port of a Ddr2Arbiter and
+# "axi" the AXI4 port of the MIG (board.ddr2_memory_axi)
+ACCESS_PATH = "native"
+TAGS = {"native": 0, "pipelined": 1, "synchronized": 2, "arbiter": 3, "axi": 4}
+
+G = Ddr2TrafficGenerator
+
+# (pattern, read, count, stride) of each run,
+# each read run follows a write run to the same lines so
+# the read data is verified
+RUNS = [
+    (G.SEQUENTIAL, False, 65536, 1),
+    (G.SEQUENTIAL, True, 65536, 1),
+    (G.STRIDED, False, 65536, 64),
+    (G.STRIDED, True, 65536, 64),
+    (G.RANDOM, False, 65536, 1),
+    (G.RANDOM, True, 65536, 1),
+]
+
+
+@board.architecture
+def architecture():
+    clk = board.clock()
+    reset = std.Reset(board.btn_reset(positive_logic=True))
+
+    # the MIG requires a 200MHz system clock
+    mmcm = Mmcm(clk, reset)
+    ctx_system = std.SequentialContext(mmcm.reserve(std.MHz(200)), reset)
+
+    if ACCESS_PATH == "axi":
+        memory = board.ddr2_memory_axi(ctx_system)
+        ctx = memory.ui_ctx
+        calib_complete = memory.init_calib_complete
+    else:
+        interface = board.ddr2_memory(ctx_system)
+        ctx = interface.ui_ctx
+        calib_complete = interface.signals.init_calib_complete
+
+        if ACCESS_PATH == "pipelined":
+            memory = PipelinedMemoryInterface(interface)
+        elif ACCESS_PATH == "synchronized":
+            ctx = std.SequentialContext(clk, reset)
+            memory = SynchronizedMemoryInterface(interface, ctx, use_fifos=True)
+        elif ACCESS_PATH == "arbiter":
+            memory = Ddr2Arbiter(interface, [ArbiterClient()]).ports[0]
+        else:
+            memory = interface
+
+    # the generator, the UART and the benchmark process run in `ctx`,
+    # init_calib_complete is synchronized into it
+    calib_sync = Signal[BitVector[2]](Null, name="calib_sync")
+
+    @ctx
+    def proc_calib_sync():
+        calib_sync.next = calib_sync.lsb(1) @ calib_complete
+
+    generator = Ddr2TrafficGenerator(memory, ctx, tag=TAGS[ACCESS_PATH])
+
+    uart = AxiUartlite(
+        ctx.clk(),
+        ctx.reset(),
+        board.uart_in(),
+        board.uart_out(),
+        baud=115200,
+    )
+
+    leds = board.leds()
+    buttons = board.buttons()
+
+    async def uart_send(byte):
+        # wait while the transmit fifo is full (status register bit 3)
+        while True:
+            status, _ = await uart.axi.read_word(8)
+
+            if not status[3]:
+                break
+
+        await uart.axi.write_word(4, std.leftpad(byte, 32))
+
+    # parameters of the current run, selected from RUNS
+    # so the runs share a single generator.run/send_report call
+    run_nr = Signal[Unsigned.upto(len(RUNS))](0)
+    pattern = Signal[Unsigned[2]]()
+    read = Signal[Bit]()
+    count = Signal[Unsigned[24]]()
+    stride = Signal[Unsigned[23]]()
+
+    def run_table(index, type):
+        # field `index` of all runs as constants of the given type
+        return {nr: type(run[index]) for nr, run in enumerate(RUNS)}
+
+    pattern_table = run_table(0, Unsigned[2])
+    read_table = run_table(1, Bit)
+    count_table = run_table(2, Unsigned[24])
+    stride_table = run_table(3, Unsigned[23])
+
+    @std.concurrent
+    def proc_select_run():
+        pattern.next = std.select(run_nr, pattern_table, default=pattern_table[0])
+        read.next = std.select(run_nr, read_table, default=read_table[0])
+        count.next = std.select(run_nr, count_table, default=count_table[0])
+        stride.next = std.select(run_nr, stride_table, default=stride_table[0])
+
+    @ctx
+    async def proc_benchmark():
+        await calib_sync.msb()
+
+        run_nr.next = 0
+
+        while run_nr != len(RUNS):
+            await generator.run(pattern, read=read, count=count, stride=stride)
+            await generator.send_report(uart_send)
+            run_nr.next = run_nr + 1
+
+        # press the center button to repeat all runs
+        await buttons.center
+        await expr(not buttons.center)
+
+    @std.concurrent
+    def logic():
+        leds[0] <<= calib_sync.msb()
+        leds[1] <<= generator.busy
+        leds[15:2] <<= generator.errors.lsb(14)
@@ -0,0 +1,178 @@
+"""
+Decodes the report frames sent by the DDR2 benchmark design
+(see `Ddr2TrafficGenerator` for the frame format).
+
+Usage:
+
+    python decode_report.py /dev/ttyUSB1        # read from a serial port
+    python decode_report.py --file capture.bin  # decode recorded bytes
+
+Reading from a serial port requires pyserial.
+"""
+
+import argparse
+import struct
+import sys
+
+SYNC = b"\xa5\x5a"
+PATTERNS = {0: "sequential", 1: "strided", 2: "random"}
+TAGS = {0: "native", 1: "pipelined", 2: "synchronized", 3: "arbiter", 4: "axi"}
+LINE_BYTES = 16
+
+# tag, pattern, frequency, accesses, cycles, errors,
+# latency min/max, bin shift, bin count
+HEADER = struct.Struct("<BBIIIIHHBB")
+
+
+def decode_frame(data: bytes):
+    """
+    Decodes a frame starting after the sync bytes. Returns the tuple
+    (report, consumed bytes) or None when `data` is too short.
+    Raises a ValueError when the checksum does not match.
+    """
+
+    if len(data) < HEADER.size:
+        return None
+
+    tag, pattern, freq_khz, accesses, cycles, errors, lat_min, lat_max, shift, bins = (
+        HEADER.unpack_from(data)
+    )
+
+    length = HEADER.size + 4 * bins + 1
+
+    if len(data) < length:
+        return None
+
+    if sum(data[: length - 1]) % 256 != data[length - 1]:
+        raise ValueError("checksum mismatch")
+
+    histogram = struct.unpack_from(f"<{bins}I", data, HEADER.size)
+
+    report = {
+        "path": TAGS.get(tag, str(tag)),
+        "pattern": PATTERNS.get(pattern & 0x7F, str(pattern & 0x7F)),
+        "read": bool(pattern & 0x80),
+        "freq_khz": freq_khz,
+        "accesses": accesses,
+        "cycles": cycles,
+        "errors": errors,
+        "latency_min": lat_min,
+        "latency_max": lat_max,
+        "bin_shift": shift,
+        "histogram": histogram,
+    }
+
+    return report, length
+
+
+def decode_stream(data: bytes):
+    """
+    Returns all complete reports contained in `data` and
+    the remaining undecoded bytes.
+    """
+
+    reports = []
+
+    while True:
+        start = data.find(SYNC)
+
+        if start < 0:
+            # keep a possible partial sync sequence
+            return reports, data[-1:]
+
+        result = None
+
+        try:
+            result = decode_frame(data[start + len(SYNC) :])
+        except ValueError as err:
+            print(f"dropping frame: {err}", file=sys.stderr)
+            data = data[start + 1 :]
+            continue
+
+        if result is None:
+            return reports, data[start:]
+
+        report, length = result
+        reports.append(report)
+        data = data[start + len(SYNC) + length :]
+
+
+def format_report(report):
+    accesses = report["accesses"]
+    cycles = report["cycles"]
+    freq = report["freq_khz"] * 1000
+    direction = "read" if report["read"] else "write"
+
+    lines = [f"{report['path']} {report['pattern']} {direction}"]
+
+    if accesses == 0:
+        lines.append("  no accesses")
+        return "\n".join(lines)
+
+    seconds = cycles / freq
+    bandwidth = accesses * LINE_BYTES / seconds / 1e6
+
+    lines.append(
+        f"  accesses {accesses}, cycles {cycles}, "
+        f"{cycles / accesses:.2f} cycles/access, {bandwidth:.1f} MB/s"
+    )
+    lines.append(
+        f"  latency min {report['latency_min']}, max {report['latency_max']} cycles"
+    )
+
+    if report["read"]:
+        lines.append(f"  errors {report['errors']}")
+
+    width = 1 << report["bin_shift"]
+    histogram = report["histogram"]
+    peak = max(histogram) or 1
+
+    for nr, cnt in enumerate(histogram):
+        lower = nr * width
+        label = (
+            f"{lower:>5}+"
+            if nr == len(histogram) - 1
+            else f"{lower:>5}-{lower + width - 1}"
+        )
+        bar = "#" * round(40 * cnt / peak)
+        lines.append(f"  {label:>12} {cnt:>10} {bar}")
+
+    return "\n".join(lines)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("port", nargs="?", help="serial port of the board")
+    parser.add_argument("--baud", type=int, default=115200)
+    parser.add_argument("--file", help="decode bytes recorded in a file")
+    args = parser.parse_args()
+
+    if args.file is not None:
+        with open(args.file, "rb") as file:
+            reports, _ = decode_stream(file.read())
+
+        for report in reports:
+            print(format_report(report))
+        return
+
+    if args.port is None:
+        parser.error("either a serial port or --file is required")
+
+    try:
+        import serial
+    except ImportError:
+        sys.exit("reading from a serial port requires pyserial")
+
+    buffer = b""
+
+    with serial.Serial(args.port, args.baud, timeout=0.5) as port:
+        while True:
+            buffer += port.read(256)
+            reports, buffer = decode_stream(buffer)
+
+            for report in reports:
+                print(format_report(report), flush=True)
+
+
+if __name__ == "__main__":
+    main()
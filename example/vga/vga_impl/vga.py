@@ -207,7 +207,7 @@ VGA_640_480 = VgaSpec(
         sync=2,
         back=33,
     ),
-    freq=25.175,
+    freq=std.MHz(25.175),
 )
 
 XGA_1024_768 = VgaSpec(
@@ -223,7 +223,7 @@ XGA_1024_768 = VgaSpec(
         sync=6,
         back=29,
     ),
-    freq=65,
+    freq=std.MHz(65),
 )
 
 SVGA_800_600 = VgaSpec(
@@ -239,5 +239,5 @@ SVGA_800_600 = VgaSpec(
         sync=2,
         back=22,
     ),
-    freq=36,
+    freq=std.MHz(36),
 )